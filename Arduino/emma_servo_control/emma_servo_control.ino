@@ -2,13 +2,25 @@
  * Emma Robot Servo Control with PCA9685 PWM Driver
  * Controls 3 servos: Left Arm, Right Arm, and Head
  * Uses PCA9685 PWM servo driver shield for better servo control
- * Receives commands from Python via Serial communication using cvzone
+ * Receives commands from Python via Serial communication (Hardware/servo_protocol.py)
+ *
+ * Two framings are accepted on the same link:
+ *   Binary (v1): 0xA5 | ver<<4|cmd | payload | seq | CRC-8
+ *   ASCII:       '$' followed by 3 values with 3 digits each    (cvzone SerialData format)
+ *
+ * CMD_MOVE sends a target plus a duration; the firmware interpolates locally with
+ * millis() and updates the PWM outputs every SERVO_UPDATE_MS, so the host sends one
+ * frame per motion instead of one per degree.
+ *
+ * Reports (text lines):
+ *   "Moved to: L,R,H seq=N"                    after each change / finished move (ASCII frames omit seq)
+ *   "Status: L,R,H seq=N rx=F crc=E moving=M"  on CMD_STATUS or '?'
+ * Quiet mode (CMD_REPORTING 0, or 'q') turns off "Moved to" lines; 'v' turns them back on.
  */
 
 // --- Libraries ---
 #include <Wire.h>
 #include <Adafruit_PWMServoDriver.h>
-#include <cvzone.h>     // for SerialData (same as your tutorial)
 
 // --- PCA9685 driver on default I2C address 0x40 ---
 Adafruit_PWMServoDriver pwm = Adafruit_PWMServoDriver(0x40);
@@ -18,28 +30,294 @@ Adafruit_PWMServoDriver pwm = Adafruit_PWMServoDriver(0x40);
 #define SERVO_MAX_TICKS 530   // ≈2500 µs
 #define SERVO_FREQ_HZ   50    // standard analog servo
 
+// Serial link (must match SERIAL_BAUDRATE in config.py)
+#define SERIAL_BAUD      115200
+#define PROTOCOL_VERSION 1
+#define SYNC_BYTE        0xA5
+#define CMD_SET_ANGLES   0x1  // payload: L, R, H
+#define CMD_STATUS       0x2  // no payload: report a Status line
+#define CMD_REPORTING    0x3  // payload: 1 = report every move, 0 = quiet
+#define CMD_MOVE         0x4  // payload: L, R, H, duration ms (uint16 little endian), profile
+#define ASCII_DIGITS     3    // cvzone SerialData: 3 values, 3 digits each
+
+// Interpolation (CMD_MOVE)
+#define SERVO_UPDATE_MS      10  // PWM update period while moving
+#define PROFILE_LINEAR       0
+#define PROFILE_MIN_JERK     1
+#define PROFILE_TRAPEZOIDAL  2
+#define TRAPEZOID_ACCEL      0.25f  // fraction of the move spent accelerating (and decelerating)
+
 // Channels on the PCA9685 for L, R, Head:
 const uint8_t CH_LEFT  = 0;
 const uint8_t CH_RIGHT = 1;
 const uint8_t CH_HEAD  = 2;
 
-// Serial data: 3 values, 3 digits each (same as Python)
-SerialData serialData(3, 3);
-int valsRec[3];  // [L, R, H] in degrees 0..180
-
 // Servo position variables
 int leftPos = 180;   // Left servo position (0-180 degrees)
 int rightPos = 0;    // Right servo position (0-180 degrees)
 int headPos = 90;    // Head servo position (0-180 degrees)
 
+// --- Non-blocking frame parser state ---
+enum ParserState { WAIT_SYNC, BINARY_BODY, ASCII_BODY };
+ParserState parserState = WAIT_SYNC;
+uint8_t frameBuf[12];         // ver/cmd, payload, seq, crc
+uint8_t frameLen = 0;
+uint8_t frameExpected = 0;
+char asciiBuf[3 * ASCII_DIGITS];
+uint8_t asciiLen = 0;
+uint32_t crcErrors = 0;
+
+// --- Telemetry ---
+bool reportMoves = true;      // false = quiet mode, only report on request
+uint8_t lastSeq = 0;          // seq of the last angle frame received
+uint32_t framesReceived = 0;  // valid angle and move frames (binary and ASCII)
+
+// --- Active move (CMD_MOVE) ---
+bool moving = false;
+int moveFrom[3];
+int moveTo[3];
+unsigned long moveStartMs = 0;
+unsigned long moveDurationMs = 0;
+uint8_t moveProfile = PROFILE_MIN_JERK;
+unsigned long lastUpdateMs = 0;
+
 static uint16_t angleToTicks(int deg) {
   deg = constrain(deg, 0, 180);
   return map(deg, 0, 180, SERVO_MIN_TICKS, SERVO_MAX_TICKS);
 }
 
+// CRC-8, polynomial 0x07 (same as crc8() in servo_protocol.py)
+static uint8_t crc8(const uint8_t *data, uint8_t len) {
+  uint8_t crc = 0;
+  for (uint8_t i = 0; i < len; i++) {
+    crc ^= data[i];
+    for (uint8_t bit = 0; bit < 8; bit++) {
+      crc = (crc & 0x80) ? (uint8_t)((crc << 1) ^ 0x07) : (uint8_t)(crc << 1);
+    }
+  }
+  return crc;
+}
+
+// Payload size for a command, -1 if unknown
+static int8_t payloadSize(uint8_t cmd) {
+  switch (cmd) {
+    case CMD_SET_ANGLES: return 3;
+    case CMD_STATUS:     return 0;
+    case CMD_REPORTING:  return 1;
+    case CMD_MOVE:       return 6;
+    default:             return -1;
+  }
+}
+
+void reportStatus() {
+  Serial.print("Status: ");
+  Serial.print(leftPos);
+  Serial.print(",");
+  Serial.print(rightPos);
+  Serial.print(",");
+  Serial.print(headPos);
+  Serial.print(" seq=");
+  Serial.print(lastSeq);
+  Serial.print(" rx=");
+  Serial.print(framesReceived);
+  Serial.print(" crc=");
+  Serial.print(crcErrors);
+  Serial.print(" moving=");
+  Serial.println(moving ? 1 : 0);
+}
+
+// Writes the servos; returns true if anything changed
+bool setServos(int l, int r, int h) {
+  if (l == leftPos && r == rightPos && h == headPos) {
+    return false;
+  }
+  leftPos = constrain(l, 0, 180);
+  rightPos = constrain(r, 0, 180);
+  headPos = constrain(h, 0, 180);
+
+  // Write to channels on the PCA9685
+  pwm.setPWM(CH_LEFT,  0, angleToTicks(leftPos));
+  pwm.setPWM(CH_RIGHT, 0, angleToTicks(rightPos));
+  pwm.setPWM(CH_HEAD,  0, angleToTicks(headPos));
+  return true;
+}
+
+void reportMove(bool withSeq) {
+  // Send confirmation (skipped in quiet mode)
+  if (!reportMoves) {
+    return;
+  }
+  Serial.print("Moved to: ");
+  Serial.print(leftPos);
+  Serial.print(",");
+  Serial.print(rightPos);
+  Serial.print(",");
+  if (withSeq) {
+    Serial.print(headPos);
+    Serial.print(" seq=");
+    Serial.println(lastSeq);
+  } else {
+    Serial.println(headPos);
+  }
+}
+
+// Direct angle frame: cancels any move in progress. Returns true if the servos moved
+bool applyAngles(int l, int r, int h) {
+  framesReceived++;
+  moving = false;
+  return setServos(l, r, h);
+}
+
+// Normalized progress (0..1) for normalized time s (0..1); same shapes as Hardware/trajectory.py
+float profileProgress(uint8_t profile, float s) {
+  switch (profile) {
+    case PROFILE_LINEAR:
+      return s;
+    case PROFILE_TRAPEZOIDAL: {
+      const float a = TRAPEZOID_ACCEL;
+      const float peak = 1.0f / (1.0f - a);
+      if (s < a) return 0.5f * peak * s * s / a;
+      if (s > 1.0f - a) { float r = 1.0f - s; return 1.0f - 0.5f * peak * r * r / a; }
+      return peak * (s - 0.5f * a);
+    }
+    default:  // PROFILE_MIN_JERK
+      return s * s * s * (10.0f - 15.0f * s + 6.0f * s * s);
+  }
+}
+
+void startMove(int l, int r, int h, unsigned long durationMs, uint8_t profile) {
+  framesReceived++;
+  moveFrom[0] = leftPos;  moveFrom[1] = rightPos;  moveFrom[2] = headPos;
+  moveTo[0] = constrain(l, 0, 180);
+  moveTo[1] = constrain(r, 0, 180);
+  moveTo[2] = constrain(h, 0, 180);
+  moveDurationMs = durationMs;
+  moveProfile = profile;
+  moveStartMs = millis();
+  lastUpdateMs = moveStartMs - SERVO_UPDATE_MS;  // update right away
+  moving = true;
+}
+
+// Advances the active move; called every loop, writes the PWM at most every SERVO_UPDATE_MS
+void updateMove() {
+  if (!moving) {
+    return;
+  }
+  unsigned long now = millis();
+  if (now - lastUpdateMs < SERVO_UPDATE_MS) {
+    return;
+  }
+  lastUpdateMs = now;
+  unsigned long elapsed = now - moveStartMs;
+  bool done = elapsed >= moveDurationMs;
+  float progress = done ? 1.0f : profileProgress(moveProfile, (float)elapsed / moveDurationMs);
+  int pos[3];
+  for (uint8_t i = 0; i < 3; i++) {
+    pos[i] = moveFrom[i] + (int)lround((moveTo[i] - moveFrom[i]) * progress);
+  }
+  setServos(pos[0], pos[1], pos[2]);
+  if (done) {
+    moving = false;
+    reportMove(true);
+  }
+}
+
+void handleBinaryFrame() {
+  uint8_t cmd = frameBuf[0] & 0x0F;
+  uint8_t seq = frameBuf[frameExpected - 2];
+  switch (cmd) {
+    case CMD_SET_ANGLES:
+      lastSeq = seq;
+      if (applyAngles(frameBuf[1], frameBuf[2], frameBuf[3])) {
+        reportMove(true);
+      }
+      break;
+    case CMD_STATUS:
+      reportStatus();
+      break;
+    case CMD_REPORTING:
+      reportMoves = frameBuf[1] != 0;
+      break;
+    case CMD_MOVE:
+      lastSeq = seq;
+      startMove(frameBuf[1], frameBuf[2], frameBuf[3],
+                (unsigned long)frameBuf[4] | ((unsigned long)frameBuf[5] << 8), frameBuf[6]);
+      break;
+  }
+}
+
+void handleAsciiFrame() {
+  int vals[3];
+  for (uint8_t i = 0; i < 3; i++) {
+    vals[i] = 0;
+    for (uint8_t d = 0; d < ASCII_DIGITS; d++) {
+      vals[i] = vals[i] * 10 + (asciiBuf[i * ASCII_DIGITS + d] - '0');
+    }
+  }
+  if (applyAngles(vals[0], vals[1], vals[2])) {
+    reportMove(false);
+  }
+}
+
+// Feed one received byte to the parser; never blocks
+void parseByte(uint8_t b) {
+  switch (parserState) {
+    case WAIT_SYNC:
+      if (b == SYNC_BYTE) {
+        parserState = BINARY_BODY;
+        frameLen = 0;
+      } else if (b == '$') {
+        parserState = ASCII_BODY;
+        asciiLen = 0;
+      } else if (b == '?') {
+        reportStatus();
+      } else if (b == 'q') {
+        reportMoves = false;
+      } else if (b == 'v') {
+        reportMoves = true;
+      }
+      break;
+
+    case BINARY_BODY:
+      frameBuf[frameLen++] = b;
+      if (frameLen == 1) {
+        int8_t size = payloadSize(b & 0x0F);
+        if ((b >> 4) != PROTOCOL_VERSION || size < 0) {
+          // Not a frame we understand: resync on this byte
+          parserState = WAIT_SYNC;
+          parseByte(b);
+          return;
+        }
+        frameExpected = 1 + size + 1 + 1;  // ver/cmd + payload + seq + crc
+      } else if (frameLen == frameExpected) {
+        if (crc8(frameBuf, frameExpected - 1) == frameBuf[frameExpected - 1]) {
+          handleBinaryFrame();
+        } else {
+          crcErrors++;
+        }
+        parserState = WAIT_SYNC;
+      }
+      break;
+
+    case ASCII_BODY:
+      if (b < '0' || b > '9') {
+        // Incomplete ASCII frame: resync on this byte
+        parserState = WAIT_SYNC;
+        parseByte(b);
+        return;
+      }
+      asciiBuf[asciiLen++] = b;
+      if (asciiLen == 3 * ASCII_DIGITS) {
+        handleAsciiFrame();
+        parserState = WAIT_SYNC;
+      }
+      break;
+  }
+}
+
 void setup() {
   // Initialize Serial communication first
-  Serial.begin(9600);
+  Serial.begin(SERIAL_BAUD);
   delay(1000);  // Wait for serial to initialize
   
   // Initialize PWM and I2C
@@ -47,9 +325,6 @@ void setup() {
   pwm.begin();
   pwm.setPWMFreq(SERVO_FREQ_HZ);
 
-  // Initialize cvzone serial communication
-  serialData.begin();
-  
   // Set initial positions
   pwm.setPWM(CH_LEFT,  0, angleToTicks(leftPos));
   pwm.setPWM(CH_RIGHT, 0, angleToTicks(rightPos));
@@ -59,40 +334,23 @@ void setup() {
   delay(1000);
   
   Serial.println("Emma Robot Servo Control Ready with PCA9685");
-  Serial.println("Baud rate: 9600");
+  Serial.print("Baud rate: ");
+  Serial.println(SERIAL_BAUD);
+  Serial.print("Protocol: binary v");
+  Serial.print(PROTOCOL_VERSION);
+  Serial.println(" + ASCII (cvzone)");
   Serial.println("Channels: P1=Left, P2=Right, P3=Head");
   Serial.println("Initial positions: Left=180, Right=0, Head=90");
 }
 
 void loop() {
-  // Receive data from Python
-  serialData.Get(valsRec);
-  
-  // Update servo positions if new data received
-  if (valsRec[0] != leftPos || valsRec[1] != rightPos || valsRec[2] != headPos) {
-    leftPos = valsRec[0];
-    rightPos = valsRec[1];
-    headPos = valsRec[2];
-    
-    // Write to channels 1, 2, 3 on the PCA9685 (P1, P2, P3)
-    pwm.setPWM(CH_LEFT,  0, angleToTicks(leftPos));
-    pwm.setPWM(CH_RIGHT, 0, angleToTicks(rightPos));
-    pwm.setPWM(CH_HEAD,  0, angleToTicks(headPos));
-    
-    // Send confirmation
-    Serial.print("Moved to: ");
-    Serial.print(leftPos);
-    Serial.print(",");
-    Serial.print(rightPos);
-    Serial.print(",");
-    Serial.println(headPos);
+  // Drain whatever arrived since the last pass; no delay, so frames are handled as fast as they come
+  while (Serial.available() > 0) {
+    parseByte(Serial.read());
   }
-  
-  // Small delay to prevent overwhelming the system
-  delay(10);
+  updateMove();
 }
 
-
 // //One servo motor code
 // #include <Wire.h>
 // #include <Adafruit_PWMServoDriver.h>
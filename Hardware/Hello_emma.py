@@ -12,7 +12,7 @@ from time import sleep  # Import sleep to add delays between actions
 # Create a Serial object with three digits precision for sending servo angles
 # This works with cvzone SerialData format (3 values, 3 digits each)
 # Use explicit port to ensure reliable connection
-arduino = SerialObject(digits=3, portNo='/dev/cu.usbmodem2101')
+arduino = SerialObject(digits=3, portNo='/dev/cu.usbmodem2101', baudRate=115200)
 
 # Initialize the last known positions for the three servos: Left (LServo), Right (RServo), Head (HServo)
 # LServo starts at 180 degrees, RServo at 0 degrees, and HServo at 90 degrees
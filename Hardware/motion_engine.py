@@ -0,0 +1,159 @@
+"""
+Non-blocking Motion Engine
+Runs servo movements on their own thread so gestures can overlap with network
+calls and speech instead of blocking the main loop.
+
+Movements are queued and executed in order. Every call returns a Future that
+can be awaited when the caller needs the motion to be finished. Each move is a
+synchronized, time-based trajectory (see trajectory.py), either streamed frame by
+frame or, with firmware-side interpolation, sent as a single target + duration frame.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from Hardware.trajectory import PROFILES, default_duration, plan_trajectory, play_trajectory
+
+_STOP = object()  # queue sentinel
+
+
+class MotionEngine:
+    """
+    Owns the servo link and the current servo positions.
+
+    Target lists are [LServo, RServo, HServo]; an entry of None keeps that servo
+    where it is when the move starts executing, so queued gestures always start
+    from the real position instead of a stale snapshot.
+    """
+
+    def __init__(self, send, initial_positions, rate_hz=50, max_speed=180, profile="minimum_jerk",
+                 send_move=None):
+        """
+        Args:
+            send (callable): Sends one frame of angles to the Arduino, e.g. arduino.sendData.
+            initial_positions (list): Starting angles [LServo, RServo, HServo].
+            rate_hz (float): Frames sent per second while moving.
+            max_speed (float): Average speed (degrees per second) for moves without a duration.
+            profile (str): Default velocity profile ("linear", "trapezoidal", "minimum_jerk").
+            send_move (callable): Optional (target, duration, profile) -> None that lets the
+                firmware interpolate, e.g. arduino.sendMove. One frame per move instead of
+                rate_hz frames per second.
+        """
+        self._send = send
+        self._send_move = send_move
+        self._active_move = None  # (start, target, started_at, duration, profile) for send_move
+        self._positions = list(initial_positions)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self.rate_hz = rate_hz
+        self.max_speed = max_speed
+        self.profile = profile
+        self._thread = threading.Thread(target=self._run, name="motion-engine", daemon=True)
+        self._thread.start()
+
+    @property
+    def positions(self):
+        """Copy of the current servo angles (estimated while the firmware interpolates)."""
+        with self._lock:
+            if self._active_move is None:
+                return list(self._positions)
+            start, target, started_at, duration, profile = self._active_move
+        progress = PROFILES[profile](min(1.0, (time.monotonic() - started_at) / duration))
+        return [int(round(a + (b - a) * progress)) for a, b in zip(start, target)]
+
+    def move(self, target_positions, duration=None, profile=None):
+        """
+        Queues a smooth move to the target positions.
+
+        :param target_positions: List of target angles [LServo, RServo, HServo] (None keeps an axis)
+        :param duration: Motion time in seconds (default: largest delta at max_speed)
+        :param profile: Velocity profile name (default: the engine's profile)
+        :return: Future resolved with the final positions once the move is done
+        """
+        return self.submit(self._move_now, target_positions, duration, profile or self.profile)
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Queues any callable on the motion thread (e.g. a whole gesture).
+
+        Moves issued from inside `fn` run immediately, in order, on the motion thread.
+
+        :return: Future resolved with the callable's return value
+        """
+        future = Future()
+        if threading.current_thread() is self._thread:
+            self._execute(future, fn, args, kwargs)
+        else:
+            self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def cancel_pending(self):
+        """Drops queued motions that have not started yet; the current one finishes."""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is _STOP:
+                self._queue.put(_STOP)
+                return
+            item[0].cancel()
+
+    def wait_idle(self, timeout=None):
+        """Blocks until every motion queued so far has finished."""
+        self.submit(lambda: None).result(timeout)
+
+    def stop(self):
+        """Finishes queued motions, then stops the motion thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            future, fn, args, kwargs = item
+            if future.set_running_or_notify_cancel():
+                self._execute(future, fn, args, kwargs)
+
+    def _execute(self, future, fn, args, kwargs):
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            print(f"⚠️ Motion failed: {e}")
+            future.set_exception(e)
+
+    def _move_now(self, target_positions, duration, profile):
+        start = self.positions
+        target = [start[i] if target_positions[i] is None else target_positions[i] for i in range(3)]
+        if duration is None:
+            duration = default_duration(start, target, self.max_speed)
+
+        if self._send_move is not None:
+            if target != start and duration > 0:
+                # One frame; the firmware interpolates and we just wait out the duration
+                self._send_move(target, duration, profile)
+                with self._lock:
+                    self._active_move = (start, target, time.monotonic(), duration, profile)
+                time.sleep(duration)
+                with self._lock:
+                    self._active_move = None
+            elif target != start:
+                self._send(target)
+        else:
+            # All axes follow the same profile and arrive together
+            frames = plan_trajectory(start, target, duration, self.rate_hz, profile)
+            play_trajectory(frames, self._send_frame, self.rate_hz)
+
+        with self._lock:
+            self._positions = target
+        return list(target)
+
+    def _send_frame(self, positions):
+        # Send the calculated positions to the Arduino
+        self._send(positions)
+        with self._lock:
+            self._positions = list(positions)
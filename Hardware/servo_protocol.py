@@ -0,0 +1,492 @@
+"""
+Servo Serial Protocol
+Host side of the link to emma_servo_control.ino.
+
+Two framings are supported on the same link:
+
+Binary (default, version 1) - 7 bytes per frame:
+
+    +------+-----------+------+------+------+-----+-------+
+    | 0xA5 | ver | cmd |  L   |  R   |  H   | seq | CRC-8 |
+    +------+-----------+------+------+------+-----+-------+
+
+    - ver/cmd: protocol version in the high nibble, command in the low nibble
+    - L, R, H: servo angles in degrees (0..180), one byte each
+    - seq: sequence number, wraps at 256
+    - CRC-8 (poly 0x07) over everything between the sync byte and the CRC
+
+CMD_MOVE frames carry a target plus a duration and profile; the firmware then
+interpolates on its own, so one frame replaces a whole stream of SET_ANGLES frames.
+
+ASCII (compatibility) - the cvzone SerialData format: "$" followed by each
+angle as zero-padded digits, e.g. "$180000090".
+
+The firmware answers with text lines, parsed by the transport's telemetry reader:
+
+    Moved to: L,R,H [seq=N]                     after each change / finished move, unless quiet
+    Status: L,R,H seq=N rx=F crc=E moving=M     on CMD_STATUS (ASCII: '?')
+    Emma Robot Servo Control Ready ...          after a (re)start
+
+Quiet mode is switched with CMD_REPORTING (ASCII: 'q' = quiet, 'v' = verbose).
+Opening the port resets most Arduinos and the bootloader drops what arrives
+meanwhile, so the transport sends the setting again when the Ready line arrives.
+"""
+
+import re
+import struct
+import threading
+import time
+from collections import deque
+
+PROTOCOL_VERSION = 1
+SYNC_BYTE = 0xA5
+
+# Commands (low nibble of the ver/cmd byte) and their payload sizes in bytes
+CMD_SET_ANGLES = 0x1
+CMD_STATUS = 0x2      # ask for a Status line
+CMD_REPORTING = 0x3   # 1 = report every move, 0 = quiet (only report on request)
+CMD_MOVE = 0x4        # L, R, H, duration in ms (uint16 little endian), profile
+PAYLOAD_SIZES = {
+    CMD_SET_ANGLES: 3,
+    CMD_STATUS: 0,
+    CMD_REPORTING: 1,
+    CMD_MOVE: 6,
+}
+
+# Velocity profile ids for CMD_MOVE (same shapes as trajectory.PROFILES)
+MOVE_PROFILES = {
+    "linear": 0,
+    "minimum_jerk": 1,
+    "trapezoidal": 2,
+}
+
+# Telemetry lines sent back by the firmware
+_MOVED_LINE = re.compile(r"Moved to: (\d+),(\d+),(\d+)(?: seq=(\d+))?")
+_STATUS_LINE = re.compile(r"Status: (\d+),(\d+),(\d+) seq=(\d+) rx=(\d+) crc=(\d+)")
+_READY_LINE = re.compile(r"\bReady\b")
+
+
+# ------------------- Framing -------------------
+
+def crc8(data):
+    """
+    CRC-8 with polynomial 0x07 (same table-free loop as the firmware).
+
+    Args:
+        data (bytes): Bytes to checksum.
+
+    Returns:
+        int: Checksum 0..255.
+    """
+    crc = 0
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+    return crc
+
+
+def encode_frame(cmd, payload, seq):
+    """
+    Builds one binary frame.
+
+    Args:
+        cmd (int): Command number.
+        payload (bytes): Command payload (length must match PAYLOAD_SIZES).
+        seq (int): Sequence number (taken modulo 256).
+
+    Returns:
+        bytes: Complete frame including sync byte and CRC.
+    """
+    if len(payload) != PAYLOAD_SIZES[cmd]:
+        raise ValueError(f"Command {cmd} expects {PAYLOAD_SIZES[cmd]} payload bytes, got {len(payload)}")
+    body = bytes([(PROTOCOL_VERSION << 4) | cmd]) + bytes(payload) + bytes([seq & 0xFF])
+    return bytes([SYNC_BYTE]) + body + bytes([crc8(body)])
+
+
+def encode_angles(angles, seq):
+    """
+    Builds a SET_ANGLES frame.
+
+    Args:
+        angles (list): Angles [LServo, RServo, HServo]; clamped to 0..180.
+        seq (int): Sequence number.
+
+    Returns:
+        bytes: 7-byte frame.
+    """
+    return encode_frame(CMD_SET_ANGLES, bytes(max(0, min(180, int(a))) for a in angles), seq)
+
+
+def encode_move(angles, duration, profile, seq):
+    """
+    Builds a CMD_MOVE frame (firmware-side interpolation).
+
+    Args:
+        angles (list): Target angles [LServo, RServo, HServo]; clamped to 0..180.
+        duration (float): Motion time in seconds (clamped to 0..65.535).
+        profile (str): "linear", "trapezoidal" or "minimum_jerk".
+        seq (int): Sequence number.
+
+    Returns:
+        bytes: 10-byte frame.
+    """
+    duration_ms = max(0, min(0xFFFF, int(round(duration * 1000))))
+    payload = bytes(max(0, min(180, int(a))) for a in angles)
+    payload += struct.pack("<H", duration_ms) + bytes([MOVE_PROFILES[profile]])
+    return encode_frame(CMD_MOVE, payload, seq)
+
+
+def encode_ascii(angles, digits=3):
+    """
+    Builds a cvzone-compatible ASCII frame.
+
+    Args:
+        angles (list): Angles [LServo, RServo, HServo].
+        digits (int): Digits per value.
+
+    Returns:
+        bytes: e.g. b"$180000090".
+    """
+    return ("$" + "".join(str(int(a)).zfill(digits) for a in angles)).encode()
+
+
+class FrameParser:
+    """
+    Incremental binary frame parser (mirror of the firmware's parser).
+
+    Bytes can arrive in any split; corrupted frames are dropped and the parser
+    resynchronizes on the next sync byte.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.crc_errors = 0
+
+    def feed(self, data):
+        """
+        Adds received bytes.
+
+        Args:
+            data (bytes): Bytes from the link.
+
+        Returns:
+            list: Decoded frames as (cmd, payload, seq) tuples.
+        """
+        self._buffer.extend(data)
+        frames = []
+        while True:
+            start = self._buffer.find(SYNC_BYTE)
+            if start < 0:
+                self._buffer.clear()
+                return frames
+            del self._buffer[:start]
+            if len(self._buffer) < 2:
+                return frames
+            version, cmd = self._buffer[1] >> 4, self._buffer[1] & 0x0F
+            if version != PROTOCOL_VERSION or cmd not in PAYLOAD_SIZES:
+                del self._buffer[0]
+                continue
+            size = 1 + 1 + PAYLOAD_SIZES[cmd] + 1 + 1
+            if len(self._buffer) < size:
+                return frames
+            body = bytes(self._buffer[1:size - 1])
+            if crc8(body) != self._buffer[size - 1]:
+                self.crc_errors += 1
+                del self._buffer[0]
+                continue
+            frames.append((cmd, body[1:-1], body[-1]))
+            del self._buffer[:size]
+
+
+# ------------------- Transports -------------------
+
+class SerialTransport:
+    """
+    Common part of the servo transports.
+
+    - Drops frames identical to the previous one (nothing would move).
+    - Runs a background reader thread that parses the firmware's acknowledgements
+      into the latest known hardware state and link statistics.
+    """
+
+    def __init__(self, port, baudrate=115200, timeout=0.1, serial_port=None, start_reader=True):
+        """
+        Args:
+            port (str): Serial port, e.g. "/dev/cu.usbmodem2101".
+            baudrate (int): Must match SERIAL_BAUD in the firmware.
+            timeout (float): Read timeout in seconds (how often the reader checks for shutdown).
+            serial_port: Already-open serial-like object (used instead of opening `port`).
+            start_reader (bool): Start the telemetry reader thread.
+        """
+        if serial_port is None:
+            import serial
+            serial_port = serial.Serial(port, baudrate, timeout=timeout)
+        self.ser = serial_port
+        self.seq = 0
+        self.last_sent = None
+        self.hardware_positions = None  # last angles reported by the firmware
+        self.frames_sent = 0
+        self.frames_deduplicated = 0
+        self.frames_acked = 0
+        self.bytes_sent = 0
+        self.crc_errors = 0             # reported by the firmware
+        self.last_ack_latency = None    # seconds
+        self._ack_latency_total = 0.0
+        self._ack_latency_count = 0
+        self._pending = deque(maxlen=256)  # (seq, sent_at) of frames not acked yet
+        self._status_requested_at = None
+        self.status_interval = None     # seconds between automatic status requests (quiet mode)
+        self.reporting = None           # last set_reporting() value, sent again after a firmware reset
+        self.firmware_resets = 0
+        self._started_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._reader = None
+        if start_reader:
+            self._reader = threading.Thread(target=self._read_loop, name="servo-telemetry", daemon=True)
+            self._reader.start()
+
+    def sendData(self, angles):
+        """
+        Sends one frame of servo angles (skipped if identical to the previous frame).
+
+        Args:
+            angles (list): Angles [LServo, RServo, HServo].
+
+        Returns:
+            bool: True if a frame was written.
+        """
+        angles = [int(a) for a in angles]
+        with self._lock:
+            if angles == self.last_sent:
+                self.frames_deduplicated += 1
+                return False
+            frame = self._encode(angles, self.seq)
+            self._pending.append((self.seq, time.monotonic()))
+            self.last_sent = angles
+            self.seq = (self.seq + 1) & 0xFF
+            self.frames_sent += 1
+            self.bytes_sent += len(frame)
+        self.ser.write(frame)
+        self._maybe_request_status()
+        return True
+
+    def sendMove(self, angles, duration, profile="minimum_jerk"):
+        """
+        Sends one target + duration frame; the firmware interpolates the motion itself.
+
+        Args:
+            angles (list): Target angles [LServo, RServo, HServo].
+            duration (float): Motion time in seconds.
+            profile (str): "linear", "trapezoidal" or "minimum_jerk".
+        """
+        angles = [int(a) for a in angles]
+        with self._lock:
+            frame = self._encode_move(angles, duration, profile, self.seq)
+            self._pending.append((self.seq, time.monotonic()))
+            self.last_sent = angles  # where the servos will be once the move is done
+            self.seq = (self.seq + 1) & 0xFF
+            self.frames_sent += 1
+            self.bytes_sent += len(frame)
+        self.ser.write(frame)
+        self._maybe_request_status()
+
+    def _maybe_request_status(self):
+        if self.status_interval is not None:
+            requested_at = self._status_requested_at
+            if requested_at is None or time.monotonic() - requested_at >= self.status_interval:
+                self.request_status()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Link counters (frames sent/deduplicated/acked, bytes per second,
+            ack latency in ms, firmware CRC errors, last reported positions).
+        """
+        with self._lock:
+            elapsed = max(time.monotonic() - self._started_at, 1e-9)
+            average = self._ack_latency_total / self._ack_latency_count if self._ack_latency_count else None
+            return {
+                "frames_sent": self.frames_sent,
+                "frames_deduplicated": self.frames_deduplicated,
+                "frames_acked": self.frames_acked,
+                "bytes_per_second": self.bytes_sent / elapsed,
+                "ack_latency_ms": None if self.last_ack_latency is None else self.last_ack_latency * 1000,
+                "avg_ack_latency_ms": None if average is None else average * 1000,
+                "crc_errors": self.crc_errors,
+                "firmware_resets": self.firmware_resets,
+                "hardware_positions": self.hardware_positions,
+            }
+
+    def close(self):
+        """Stops the reader thread and closes the serial port."""
+        self._stop_event.set()
+        if self._reader is not None:
+            self._reader.join()
+        self.ser.close()
+
+    def handle_line(self, line):
+        """
+        Parses one telemetry line from the firmware (called by the reader thread).
+
+        Args:
+            line (str): Line without the line ending.
+        """
+        now = time.monotonic()
+        moved = _MOVED_LINE.match(line)
+        status = _STATUS_LINE.match(line) if moved is None else None
+        match = moved or status
+        if match is None:
+            if _READY_LINE.search(line):
+                # The firmware (re)started with its defaults; the earlier setting may have been lost
+                with self._lock:
+                    self.firmware_resets += 1
+                    reporting = self.reporting
+                if reporting is not None:
+                    self.ser.write(self._reporting_request(reporting))
+            return
+        with self._lock:
+            self.hardware_positions = [int(match.group(i)) for i in (1, 2, 3)]
+            if status is not None:
+                # The link is FIFO: a status reply acknowledges everything sent before the request
+                self.crc_errors = int(status.group(6))
+                self._ack(now, sent_before=self._status_requested_at)
+            elif moved.group(4) is not None:
+                self._ack(now, seq=int(moved.group(4)))
+            else:
+                self._ack(now)
+
+    def _ack(self, now, seq=None, sent_before=None):
+        # Pops acknowledged frames: up to `seq`, everything sent before `sent_before`,
+        # or (ASCII acks without a seq) just the oldest frame
+        if seq is not None and all(pending_seq != seq for pending_seq, _ in self._pending):
+            return
+        latency = None
+        while self._pending:
+            pending_seq, sent_at = self._pending[0]
+            if sent_before is not None and sent_at > sent_before:
+                break
+            self._pending.popleft()
+            self.frames_acked += 1
+            latency = now - sent_at
+            if sent_before is None and (seq is None or pending_seq == seq):
+                break
+        if latency is not None:
+            self.last_ack_latency = latency
+            self._ack_latency_total += latency
+            self._ack_latency_count += 1
+
+    def request_status(self):
+        """Asks the firmware for a Status line (acknowledges every frame received so far)."""
+        with self._lock:
+            self._status_requested_at = time.monotonic()
+        self.ser.write(self._status_request())
+
+    def set_reporting(self, verbose):
+        """
+        Switches the firmware between reporting every move and quiet mode.
+
+        Args:
+            verbose (bool): False = quiet, the firmware only reports on request_status().
+        """
+        with self._lock:
+            self.reporting = verbose
+        self.ser.write(self._reporting_request(verbose))
+
+    def _read_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                raw = self.ser.readline()
+            except Exception:
+                if self._stop_event.is_set():
+                    return
+                time.sleep(0.1)
+                continue
+            if raw:
+                self.handle_line(raw.decode("utf-8", errors="ignore").strip())
+
+    def _encode(self, angles, seq):
+        raise NotImplementedError
+
+    def _encode_move(self, angles, duration, profile, seq):
+        raise NotImplementedError(f"{type(self).__name__} does not support firmware-side moves")
+
+    def _status_request(self):
+        raise NotImplementedError
+
+    def _reporting_request(self, verbose):
+        raise NotImplementedError
+
+
+class BinarySerialTransport(SerialTransport):
+    """
+    Sends binary frames over pyserial. Drop-in replacement for cvzone's SerialObject.
+    """
+
+    def _encode(self, angles, seq):
+        return encode_angles(angles, seq)
+
+    def _encode_move(self, angles, duration, profile, seq):
+        return encode_move(angles, duration, profile, seq)
+
+    def _status_request(self):
+        return encode_frame(CMD_STATUS, b"", self.seq)
+
+    def _reporting_request(self, verbose):
+        return encode_frame(CMD_REPORTING, bytes([1 if verbose else 0]), self.seq)
+
+
+class AsciiSerialTransport(SerialTransport):
+    """
+    Sends cvzone-format ASCII frames, for firmware or tools that expect SerialData.
+    """
+
+    def __init__(self, port, baudrate=115200, digits=3, **kwargs):
+        """
+        Args:
+            port (str): Serial port.
+            baudrate (int): Must match SERIAL_BAUD in the firmware.
+            digits (int): Digits per value (cvzone `digits`).
+            **kwargs: Passed to SerialTransport.
+        """
+        self.digits = digits
+        super().__init__(port, baudrate, **kwargs)
+
+    def _encode(self, angles, seq):
+        return encode_ascii(angles, self.digits)
+
+    def _status_request(self):
+        return b"?"
+
+    def _reporting_request(self, verbose):
+        return b"v" if verbose else b"q"
+
+
+def open_servo_transport(port, protocol="binary", baudrate=115200, digits=3, quiet=False, status_interval=0.5):
+    """
+    Opens the servo link with the configured framing.
+
+    Args:
+        port (str): Serial port.
+        protocol (str): "binary" or "ascii".
+        baudrate (int): Serial baud rate.
+        digits (int): Digits per value in ASCII mode.
+        quiet (bool): Put the firmware in quiet mode and poll its status instead of
+            receiving an acknowledgement for every move.
+        status_interval (float): Seconds between status requests in quiet mode.
+
+    Returns:
+        BinarySerialTransport or AsciiSerialTransport: Object with sendData()/stats()/close().
+    """
+    if protocol == "binary":
+        transport = BinarySerialTransport(port, baudrate)
+    elif protocol == "ascii":
+        transport = AsciiSerialTransport(port, baudrate, digits)
+    else:
+        raise ValueError(f"Unknown servo protocol: {protocol!r} (use 'binary' or 'ascii')")
+    if quiet:
+        # Sent again when the firmware's Ready line arrives (the port open may reset the board)
+        transport.set_reporting(False)
+        transport.status_interval = status_interval
+    return transport
@@ -0,0 +1,194 @@
+"""
+Simulated Servo Firmware
+A Python model of emma_servo_control.ino behind a pyserial-like interface
+(write / readline / close), so the host side can be tested without an Arduino:
+
+    firmware = SimulatedFirmware()
+    arduino = BinarySerialTransport(None, serial_port=firmware)
+
+It parses the same binary and ASCII frames, interpolates CMD_MOVE targets on its
+own clock, and answers with the same text lines as the real firmware.
+"""
+
+import struct
+import threading
+import time
+from collections import deque
+
+from Hardware.servo_protocol import (
+    CMD_MOVE, CMD_REPORTING, CMD_SET_ANGLES, CMD_STATUS, MOVE_PROFILES,
+    PAYLOAD_SIZES, PROTOCOL_VERSION, SYNC_BYTE, crc8,
+)
+from Hardware.trajectory import PROFILES
+
+ASCII_DIGITS = 3
+_PROFILE_NAMES = {number: name for name, number in MOVE_PROFILES.items()}
+
+
+class SimulatedFirmware:
+    """
+    Servo controller model. Time only matters for CMD_MOVE, which is advanced
+    every `update_interval` seconds whenever the port is written or read.
+    """
+
+    def __init__(self, initial_positions=(180, 0, 90), update_interval=0.010, clock=time.monotonic):
+        """
+        Args:
+            initial_positions (tuple): Power-on angles [LServo, RServo, HServo].
+            update_interval (float): PWM update period while moving (SERVO_UPDATE_MS).
+            clock (callable): Monotonic clock in seconds.
+        """
+        self.positions = list(initial_positions)
+        self.update_interval = update_interval
+        self.clock = clock
+        self.report_moves = True
+        self.last_seq = 0
+        self.frames_received = 0
+        self.crc_errors = 0
+        self.bytes_received = 0
+        self.pwm_writes = 0
+        self.history = []  # (time, positions) for every PWM update
+        self._move = None  # (from, to, start, duration, profile)
+        self._last_update = None
+        self._state = "sync"
+        self._frame = bytearray()
+        self._lines = deque()
+        self._lock = threading.RLock()
+
+    # ------------------- Serial port interface -------------------
+
+    def write(self, data):
+        """Receives bytes from the host."""
+        with self._lock:
+            self.tick()
+            self.bytes_received += len(data)
+            for byte in data:
+                self._parse_byte(byte)
+        return len(data)
+
+    def readline(self):
+        """Returns the next report line (b"" after a short wait if there is none)."""
+        with self._lock:
+            self.tick()
+            if self._lines:
+                return self._lines.popleft()
+        time.sleep(0.005)
+        return b""
+
+    def close(self):
+        pass
+
+    # ------------------- Firmware model -------------------
+
+    @property
+    def moving(self):
+        """True while a CMD_MOVE is being interpolated."""
+        return self._move is not None
+
+    def tick(self):
+        """Advances the active move (updateMove() in the sketch)."""
+        with self._lock:
+            if self._move is None:
+                return
+            now = self.clock()
+            if self._last_update is not None and now - self._last_update < self.update_interval:
+                return
+            self._last_update = now
+            start_pos, target, started, duration, profile = self._move
+            elapsed = now - started
+            done = elapsed >= duration
+            progress = 1.0 if done else PROFILES[profile](elapsed / duration)
+            self._set_servos([int(round(a + (b - a) * progress)) for a, b in zip(start_pos, target)])
+            if done:
+                self._move = None
+                self._report_move(with_seq=True)
+
+    def _set_servos(self, angles):
+        angles = [max(0, min(180, a)) for a in angles]
+        if angles == self.positions:
+            return False
+        self.positions = angles
+        self.pwm_writes += 1
+        self.history.append((self.clock(), list(angles)))
+        return True
+
+    def _apply_angles(self, angles):
+        self.frames_received += 1
+        self._move = None
+        return self._set_servos(list(angles))
+
+    def _start_move(self, angles, duration_ms, profile):
+        self.frames_received += 1
+        self._move = (list(self.positions), [max(0, min(180, a)) for a in angles],
+                      self.clock(), duration_ms / 1000.0, _PROFILE_NAMES.get(profile, "minimum_jerk"))
+        self._last_update = None
+        self.tick()
+
+    def _report_move(self, with_seq):
+        if not self.report_moves:
+            return
+        line = "Moved to: {},{},{}".format(*self.positions)
+        if with_seq:
+            line += f" seq={self.last_seq}"
+        self._lines.append((line + "\r\n").encode())
+
+    def _report_status(self):
+        line = "Status: {},{},{}".format(*self.positions)
+        line += f" seq={self.last_seq} rx={self.frames_received} crc={self.crc_errors} moving={int(self.moving)}"
+        self._lines.append((line + "\r\n").encode())
+
+    def _handle_binary_frame(self, body):
+        cmd, payload, seq = body[0] & 0x0F, body[1:-1], body[-1]
+        if cmd == CMD_SET_ANGLES:
+            self.last_seq = seq
+            if self._apply_angles(payload):
+                self._report_move(with_seq=True)
+        elif cmd == CMD_STATUS:
+            self._report_status()
+        elif cmd == CMD_REPORTING:
+            self.report_moves = payload[0] != 0
+        elif cmd == CMD_MOVE:
+            self.last_seq = seq
+            duration_ms, = struct.unpack("<H", bytes(payload[3:5]))
+            self._start_move(list(payload[:3]), duration_ms, payload[5])
+
+    def _parse_byte(self, byte):
+        # Same state machine as parseByte() in the sketch
+        if self._state == "sync":
+            if byte == SYNC_BYTE:
+                self._state, self._frame = "binary", bytearray()
+            elif byte == ord("$"):
+                self._state, self._frame = "ascii", bytearray()
+            elif byte == ord("?"):
+                self._report_status()
+            elif byte == ord("q"):
+                self.report_moves = False
+            elif byte == ord("v"):
+                self.report_moves = True
+        elif self._state == "binary":
+            self._frame.append(byte)
+            if len(self._frame) == 1:
+                if byte >> 4 != PROTOCOL_VERSION or (byte & 0x0F) not in PAYLOAD_SIZES:
+                    self._state = "sync"
+                    self._parse_byte(byte)
+                return
+            size = 1 + PAYLOAD_SIZES[self._frame[0] & 0x0F] + 1 + 1
+            if len(self._frame) == size:
+                body = bytes(self._frame[:-1])
+                if crc8(body) == self._frame[-1]:
+                    self._handle_binary_frame(body)
+                else:
+                    self.crc_errors += 1
+                self._state = "sync"
+        else:
+            if not ord("0") <= byte <= ord("9"):
+                self._state = "sync"
+                self._parse_byte(byte)
+                return
+            self._frame.append(byte)
+            if len(self._frame) == 3 * ASCII_DIGITS:
+                digits = self._frame.decode()
+                angles = [int(digits[i:i + ASCII_DIGITS]) for i in range(0, len(digits), ASCII_DIGITS)]
+                if self._apply_angles(angles):
+                    self._report_move(with_seq=False)
+                self._state = "sync"
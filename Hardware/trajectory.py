@@ -0,0 +1,123 @@
+"""
+Time-based Trajectory Planner
+Plans synchronized multi-axis servo motions from a target and a duration.
+
+All axes start and finish together, following the same velocity profile, and
+frames are sent at a fixed rate on a monotonic deadline schedule. The number of
+frames depends on rate x duration, not on how many degrees the servos travel.
+"""
+
+import time
+
+
+# ------------------- Velocity Profiles -------------------
+# Each profile maps normalized time s in [0, 1] to normalized progress in [0, 1].
+
+def linear(s):
+    """Constant speed."""
+    return s
+
+
+def trapezoidal(s, accel_fraction=0.25):
+    """Constant acceleration, cruise, constant deceleration."""
+    a = accel_fraction
+    peak = 1.0 / (1.0 - a)  # cruise speed so the area under the speed curve is 1
+    if s < a:
+        return 0.5 * peak * s * s / a
+    if s > 1.0 - a:
+        r = 1.0 - s
+        return 1.0 - 0.5 * peak * r * r / a
+    return peak * (s - 0.5 * a)
+
+
+def minimum_jerk(s):
+    """Smooth start and stop (zero speed and acceleration at both ends)."""
+    return s * s * s * (10.0 - 15.0 * s + 6.0 * s * s)
+
+
+PROFILES = {
+    "linear": linear,
+    "trapezoidal": trapezoidal,
+    "minimum_jerk": minimum_jerk,
+}
+
+
+# ------------------- Planning -------------------
+
+def plan_trajectory(start, target, duration, rate_hz, profile="minimum_jerk"):
+    """
+    Plans a synchronized motion for all axes.
+
+    Args:
+        start (list): Current angles [LServo, RServo, HServo].
+        target (list): Target angles [LServo, RServo, HServo].
+        duration (float): Motion time in seconds.
+        rate_hz (float): Frame rate in frames per second.
+        profile (str): "linear", "trapezoidal" or "minimum_jerk".
+
+    Returns:
+        list: Frames of integer angles; frame k is due at k / rate_hz seconds
+        after the start, and the last frame is exactly the target.
+    """
+    shape = PROFILES[profile]
+    if list(start) == list(target):
+        return []
+    count = max(1, int(round(duration * rate_hz)))
+    frames = []
+    for k in range(1, count + 1):
+        progress = shape(k / count)
+        frames.append([int(round(a + (b - a) * progress)) for a, b in zip(start, target)])
+    return frames
+
+
+def default_duration(start, target, max_speed):
+    """
+    Duration that keeps the largest move at `max_speed` degrees per second on average.
+
+    Args:
+        start (list): Current angles.
+        target (list): Target angles.
+        max_speed (float): Average speed in degrees per second.
+
+    Returns:
+        float: Duration in seconds.
+    """
+    return max(abs(b - a) for a, b in zip(start, target)) / float(max_speed)
+
+
+# ------------------- Playback -------------------
+
+def play_trajectory(frames, send, rate_hz, cancel_event=None, clock=time.monotonic, sleep=time.sleep):
+    """
+    Sends frames on a fixed-rate deadline schedule.
+
+    Deadlines are computed from the start time, so sleep jitter does not add up
+    over the motion. Frames that are already a full period late are skipped
+    (the final frame is always sent), keeping the motion on time.
+
+    Args:
+        frames (list): Frames from plan_trajectory.
+        send (callable): Sends one frame, e.g. arduino.sendData.
+        rate_hz (float): Frame rate in frames per second.
+        cancel_event (threading.Event): Optional event that stops the motion early.
+        clock (callable): Monotonic clock in seconds.
+        sleep (callable): Sleep function in seconds.
+
+    Returns:
+        list: The last frame sent (None if nothing was sent).
+    """
+    period = 1.0 / rate_hz
+    t0 = clock()
+    last_sent = None
+    for k, frame in enumerate(frames, start=1):
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        deadline = t0 + k * period
+        now = clock()
+        if now < deadline:
+            sleep(deadline - now)
+        elif now - deadline > period and k < len(frames):
+            continue  # late: skip ahead instead of falling further behind
+        send(frame)
+        last_sent = frame
+    return last_sent
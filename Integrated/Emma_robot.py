@@ -2,16 +2,10 @@
 
 # ------------------- Import Libraries -------------------
 import vosk
-import pyaudio
 import json
-import pygame
-import google.generativeai as genai
-from openai import OpenAI
-import io
 import threading
 import signal
-from cvzone.SerialModule import SerialObject
-from time import sleep
+import time
 import sys
 import os
 # import keyboard  # type: ignore
@@ -19,6 +13,25 @@ import os
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import *
+from Software.audio_streaming import StreamingPlayer, stream_openai_speech
+from Software.speech_pipeline import SpeechPipeline, stream_gemini_text
+from Software.mic_capture import MicrophoneCapture
+from Software.llm_clients import ClientPool
+from Software.tts_cache import TTSCache, openai_synthesizer
+from Software.audio_playback import PlaybackEngine
+from Software.barge_in import BargeInMonitor
+from Software.vad import VoiceActivityDetector
+from Software.endpointing import Endpointer
+from Software.two_tier_recognizer import TwoTierRecognizer
+from Software.command_recognizer import CommandRecognizer
+from Software.intent_router import default_router
+from Software.offline_tts import OfflineTTS
+from Software.conversation import ConversationSession
+from Software.latency_supervisor import LatencySupervisor
+from Software.llm_dispatcher import HedgedDispatcher, gemini_backend, openai_chat_backend
+from Software.speculative_llm import PrefetchedStream, SpeculativeDispatcher, background_call
+from Hardware.motion_engine import MotionEngine
+from Hardware.servo_protocol import open_servo_transport
 
 # # ------------------- Initializations -------------------
 
@@ -105,44 +118,142 @@ from config import *
 
 # ------------------- Servo Movements
 
-# Create a Serial object with three digits precision for sending servo angles
-# This works with cvzone SerialData format (3 values, 3 digits each)
+# Open the servo link: compact binary frames with CRC by default,
+# or the cvzone SerialData ASCII format (3 values, 3 digits each) with SERVO_PROTOCOL = "ascii"
 # Use explicit port to ensure reliable connection
-arduino = SerialObject(digits=SERVO_DIGITS, portNo=ARDUINO_PORT)
+# In quiet mode the firmware only reports when asked, instead of acknowledging every frame
+arduino = open_servo_transport(ARDUINO_PORT, SERVO_PROTOCOL, SERIAL_BAUDRATE, digits=SERVO_DIGITS,
+                               quiet=SERVO_QUIET_MODE, status_interval=SERVO_STATUS_INTERVAL)
 
-# Initialize the last known positions for the three servos: Left (LServo), Right (RServo), Head (HServo)
+# Servo moves run on the motion engine's own thread, so gestures overlap with speech and API calls.
+# It also tracks the last known positions for Left (LServo), Right (RServo) and Head (HServo):
 # LServo starts at 180 degrees, RServo at 0 degrees, and HServo at 90 degrees
-last_positions = [DEFAULT_LEFT_SERVO_POS, DEFAULT_RIGHT_SERVO_POS, DEFAULT_HEAD_SERVO_POS]
+# With firmware interpolation (binary protocol only) each move is a single target + duration frame
+use_firmware_interpolation = SERVO_FIRMWARE_INTERPOLATION and SERVO_PROTOCOL == "binary"
+motion = MotionEngine(arduino.sendData,
+                      [DEFAULT_LEFT_SERVO_POS, DEFAULT_RIGHT_SERVO_POS, DEFAULT_HEAD_SERVO_POS],
+                      rate_hz=SERVO_FRAME_RATE_HZ, max_speed=SERVO_MAX_SPEED, profile=SERVO_MOTION_PROFILE,
+                      send_move=arduino.sendMove if use_firmware_interpolation else None)
 
 # ------------------- AI speech integration portion
-# Initialize Pygame mixer
-pygame.mixer.init()
+# One output device for the whole session; prompts are decoded once and play on their own channels
+audio_output = PlaybackEngine()
+audio_output.load_effect(LISTEN_SOUND_PATH, LISTEN_SOUND_PATH)
 
-# Initialize VOSK model
-model = vosk.Model(VOSK_MODEL_PATH)
-recognizer = vosk.KaldiRecognizer(model, VOSK_SAMPLE_RATE)
+# Decides when the user has finished talking; short commands are finalized sooner
+endpointer = Endpointer(ENDPOINT_TRAILING_SILENCE_MS, ENDPOINT_MAX_UTTERANCE_MS, adaptive=ENDPOINT_ADAPTIVE,
+                        short_command_silence_ms=ENDPOINT_SHORT_COMMAND_SILENCE_MS,
+                        short_commands=ENDPOINT_SHORT_COMMANDS)
 
-# Configure Gemini API with your API key
-genai.configure(api_key=GEMINI_API_KEY)
+EXIT_KEYWORDS = {"stop", "quit", "goodbye", "exit", "bye"}
+
+# Initialize VOSK: a small always-on keyword model, and the large model only for the conversation
+two_tier = None
+if VOSK_TWO_TIER:
+    if os.path.isdir(VOSK_SMALL_MODEL_PATH):
+        two_tier = TwoTierRecognizer(VOSK_SMALL_MODEL_PATH, VOSK_MODEL_PATH, VOSK_SAMPLE_RATE,
+                                     VOSK_WAKE_WORDS, sorted(EXIT_KEYWORDS),
+                                     unload_after_s=VOSK_LARGE_MODEL_UNLOAD_S,
+                                     configure=endpointer.configure_recognizer, vosk_module=vosk)
+    else:
+        print(f"⚠️ {VOSK_SMALL_MODEL_PATH} not found, using {VOSK_MODEL_PATH} for everything")
+if two_tier is None:
+    model = vosk.Model(VOSK_MODEL_PATH)
+    recognizer = vosk.KaldiRecognizer(model, VOSK_SAMPLE_RATE)
+    endpointer.configure_recognizer(recognizer)
+
+
+# Short commands ("look left", "goodbye") are recognized locally with a grammar and never reach Gemini
+if two_tier is not None:
+    command_model = two_tier.small_model
+elif os.path.isdir(VOSK_SMALL_MODEL_PATH):
+    command_model = vosk.Model(VOSK_SMALL_MODEL_PATH)
+else:
+    command_model = None  # whole dictation transcripts are matched against the command table instead
+commands = CommandRecognizer(command_model, VOSK_SAMPLE_RATE, configure=endpointer.configure_recognizer,
+                             vosk_module=vosk)
+
+
+def dictation_recognizer():
+    """Returns the recognizer for the conversation (loads the large model on first use)."""
+    return two_tier.dictation() if two_tier is not None else recognizer
+
+# Keep the microphone open for the whole session; each listen reads from its ring buffer
+mic_capture = MicrophoneCapture(VOSK_SAMPLE_RATE, AUDIO_CHANNELS, AUDIO_CHUNK_SIZE, MIC_BUFFER_SECONDS)
+mic_capture.start()
+
+# Only audio around speech is passed to Vosk, so the decoder idles while nobody talks
+vad = VoiceActivityDetector(VOSK_SAMPLE_RATE, energy_ratio=VAD_ENERGY_RATIO, hangover_ms=VAD_HANGOVER_MS,
+                            pre_roll_ms=VAD_PRE_ROLL_MS) if VAD_ENABLED else None
+
+
+# Long-lived API clients: Gemini models and OpenAI connections are reused across turns
+clients = ClientPool(gemini_api_key=GEMINI_API_KEY, openai_api_key=OPENAI_API_KEY)
 
 # Configure OpenAI Text-to-Speech API (ChatGPT Quality)
-client = OpenAI(api_key=OPENAI_API_KEY)
+client = clients.openai
 print(f"Using OpenAI TTS with voice: {OPENAI_TTS_VOICE}")
 
+# Earlier turns are sent with each question; older ones are folded into a short summary
+conversation = ConversationSession(clients.gemini_model(GEMINI_MODEL), token_budget=CONVERSATION_TOKEN_BUDGET,
+                                   summary_words=CONVERSATION_SUMMARY_WORDS) if CONVERSATION_MEMORY else None
+
+# Open the API connections in the background so the first question is not slower
+if LLM_PREWARM:
+    clients.prewarm(GEMINI_MODEL)
+
+# Streaming player keeps one output device open and starts speaking while audio downloads
+streaming_player = StreamingPlayer(prefill_ms=OPENAI_TTS_STREAM_PREFILL_MS) if OPENAI_TTS_STREAMING else None
+
+# While Emma talks, the microphone capture is watched for the user's voice so they can interrupt her
+emma_is_playing = lambda: audio_output.speaking or (streaming_player is not None and streaming_player.playing)
+barge_in = BargeInMonitor(mic_capture, emma_is_playing, calibration_ms=BARGE_IN_CALIBRATION_MS,
+                          threshold_ratio=BARGE_IN_THRESHOLD_RATIO, min_rms=BARGE_IN_MIN_RMS,
+                          min_speech_ms=BARGE_IN_MIN_SPEECH_MS) if BARGE_IN_ENABLED else None
+
+# Simple questions (time, date, name, "repeat that") are answered locally instead of by Gemini
+last_response = ""  # what Emma said last, for "repeat that"
+last_sentences = None  # the same, sentence by sentence, when it was spoken by the pipeline
+router = default_router(last_response=lambda: last_response or None) if LOCAL_INTENTS_ENABLED else None
+
+# Local answers that are not in the TTS cache (the time, the date, "repeat that") are spoken
+# with the offline pyttsx3 voice: no network request, and one-off strings never fill the cache
+offline_tts = None
+if router is not None:
+    try:
+        offline_tts = OfflineTTS(voice=OFFLINE_TTS_VOICE)
+    except Exception as e:
+        print(f"⚠️ Offline voice not available ({e}), local answers use OpenAI TTS without caching")
+
+# Synthesized phrases are kept on disk; greetings and fixed local answers are pre-warmed
+# so they play without a network request
+tts_cache = TTSCache(TTS_CACHE_DIR, TTS_CACHE_MAX_MB * 1024 * 1024) if TTS_CACHE_ENABLED else None
+prewarm_phrases = list(TTS_PREWARM_PHRASES) + [LLM_UNAVAILABLE_REPLY]
+prewarm_phrases += router.static_responses() if router is not None else []
+if tts_cache is not None and prewarm_phrases:
+    prewarm_format = "pcm" if streaming_player is not None else "mp3"
+    tts_cache.prewarm(prewarm_phrases, "openai", OPENAI_TTS_MODEL, OPENAI_TTS_VOICE,
+                      openai_synthesizer(client, OPENAI_TTS_MODEL, OPENAI_TTS_VOICE, prewarm_format),
+                      audio_format=prewarm_format)
+
 
 # ------------------- Utility Functions -------------------
 
-def play_sound(file_path):
+def play_sound(file_path, wait=True):
     """
-    Plays an audio file using pygame.
+    Plays a sound effect on its own mixer channel.
 
     Args:
-        file_path (str): Path to the audio file.
+        file_path (str): Path to the audio file (decoded once, then reused).
+        wait (bool): Block until the sound finished.
+
+    Returns:
+        PlaybackHandle: Signalled when the sound ends.
     """
-    pygame.mixer.music.load(file_path)
-    pygame.mixer.music.play()
-    while pygame.mixer.music.get_busy():  # Wait for audio to finish playing
-        pygame.time.Clock().tick(5)
+    handle = audio_output.play_effect(file_path)
+    if wait:
+        handle.wait()
+    return handle
 
 # Play a startup sound once when the program begins
 try:
@@ -152,70 +263,143 @@ except Exception:
 
 # ------------------- Speech-to-Text Function -------------------
 
-def listen_with_vosk():
+def listen_with_vosk(start_pos=None, recognizer=None, timeout=None, speculate=True, use_commands=True):
     """
-    Captures audio from the microphone and converts it to text using VOSK.
+    Reads audio from the shared microphone capture and converts it to text using VOSK.
+
+    Args:
+        start_pos (int): Mic position to start from (where the user barged in).
+        recognizer: Vosk recognizer to use (defaults to the dictation recognizer).
+        timeout (float): Give up if nobody starts talking within this many seconds.
+        speculate (bool): Let the speculator start Gemini from partial results.
+        use_commands (bool): Also decode the audio with the command grammar.
 
     Returns:
-        str: Transcribed text from speech.
-    """
-    mic = pyaudio.PyAudio()  # Initialize microphone
-    stream = mic.open(
-        format=pyaudio.paInt16,
-        channels=AUDIO_CHANNELS,
-        rate=VOSK_SAMPLE_RATE,
-        input=True,
-        frames_per_buffer=AUDIO_CHUNK_SIZE,
-        start=False
-    )
-    stream.start_stream()
+        tuple: (text, intent). `intent` is the local command that was spoken, or
+        None for anything else. Both are None on timeout.
+    """
+    speculate = speculate and speculator is not None
+    # Start slightly in the past so the first syllables are not lost
+    reader = mic_capture.reader(pre_roll_ms=MIC_PRE_ROLL_MS, start_pos=start_pos)
+    if recognizer is None:
+        # May wait for the large model to load; the reader keeps what is said meanwhile
+        recognizer = dictation_recognizer()
+    if vad is not None:
+        vad.reset()
+    if speculate:
+        speculator.reset()
+    endpointer.start()
+    deadline = time.monotonic() + timeout if timeout is not None else None
     print("Listening ...")
 
+    partial = ""
     while True:
-        if EXIT_NOW.is_set():
-            try:
-                if stream.is_active():
-                    stream.stop_stream()
-            except Exception:
-                pass
-            try:
-                stream.close()
-            except Exception:
-                pass
-            try:
-                mic.terminate()
-            except Exception:
-                pass
-            raise SystemExit(0)
-        try:
-            data = stream.read(AUDIO_CHUNK_SIZE, exception_on_overflow=False)
-        except Exception:
-            continue
+        data = reader.read(timeout=0.5 if deadline is not None else None)
+        if deadline is not None and time.monotonic() > deadline and not partial and (vad is None or vad.utterance_ms == 0):
+            if use_commands:
+                commands.reset()
+            return None, None
         if len(data) == 0:  # Skip if no audio data
             continue
 
-        if recognizer.AcceptWaveform(data):  # Recognize speech
+        segment_ended = False
+        if vad is not None:
+            data, segment_ended = vad.process(data)  # b"" while nobody is talking
+
+        if data and use_commands:
+            commands.accept(data)
+        if data and recognizer.AcceptWaveform(data):  # Recognize speech
             result = recognizer.Result()  # Get result from recognizer
-            text = json.loads(result)["text"]  # Extract text
-            print("You said: " + text)
-            # Clean up audio resources before returning
-            try:
-                if stream.is_active():
-                    stream.stop_stream()
-            except Exception:
-                pass
-            try:
-                stream.close()
-            except Exception:
-                pass
-            try:
-                mic.terminate()
-            except Exception:
-                pass
-            return text
+        else:
+            if data:
+                partial = json.loads(recognizer.PartialResult())["partial"]
+                if speculate:
+                    # Starts Gemini early once the partial transcript stops changing
+                    speculator.observe(partial)
+            if vad is None:
+                continue
+            # Endpoint on our own silence timeout, before Vosk's endpointer fires
+            if not (endpointer.update(vad.trailing_silence_ms, vad.utterance_ms, partial)
+                    or (segment_ended and not partial.strip())):
+                continue
+            result = recognizer.FinalResult()
+            if not json.loads(result)["text"]:
+                # A cough or a bump, keep listening
+                partial = ""
+                vad.reset()
+                endpointer.start()
+                if use_commands:
+                    commands.reset()
+                continue
+        endpointer.finalized()
+        text = json.loads(result)["text"]  # Extract text
+        print("You said: " + text)
+        intent = commands.finalize(text)[0] if use_commands else None
+        return text, intent
 
 # ------------------- AI Text Generation Function -------------------
 
+def generate_text(text):
+    """
+    Sends input text to the Gemini API without printing (safe to run speculatively).
+
+    Args:
+        text (str): Input text for the API.
+
+    Returns:
+        str: Generated response text from Gemini API.
+    """
+    if dispatcher is not None:
+        return dispatcher.ask(text)
+    if conversation is not None:
+        return conversation.send(text)
+    # Reuse the session's genAI model
+    model = clients.gemini_model(GEMINI_MODEL)
+    return model.generate_content(text).text
+
+
+def stream_gemini(text):
+    """
+    Streams a Gemini answer (with the conversation history when enabled).
+
+    Args:
+        text (str): Input text for the API.
+
+    Returns:
+        iterator: Text pieces in the order they arrive.
+    """
+    if conversation is not None:
+        return conversation.stream(text)
+    return stream_gemini_text(clients.gemini_model(GEMINI_MODEL), text)
+
+
+def stream_text(text):
+    """
+    Streams the answer, hedged across Gemini and OpenAI chat when enabled.
+
+    Args:
+        text (str): Input text for the API.
+
+    Returns:
+        iterator: Text pieces in the order they arrive.
+    """
+    if dispatcher is not None:
+        return dispatcher.stream(text)
+    return stream_gemini(text)
+
+
+# Gemini answers first; OpenAI chat is asked as well when Gemini is slow, fails or hangs
+dispatcher = None
+if LLM_HEDGING:
+    llm_backends = [("gemini", gemini_backend(stream_gemini))]
+    if OPENAI_CHAT_MODEL:
+        llm_backends.append(("openai", openai_chat_backend(
+            client, OPENAI_CHAT_MODEL, history=conversation.history if conversation is not None else None,
+            timeout=LLM_DEADLINE_S)))
+    dispatcher = HedgedDispatcher(llm_backends, hedge_percentile=LLM_HEDGE_PERCENTILE,
+                                  max_hedge_s=LLM_HEDGE_MAX_S, first_output_deadline_s=LLM_DEADLINE_S)
+
+
 def gemini_api(text):
     """
     Sends input text to the Gemini API and retrieves the generated response.
@@ -226,26 +410,70 @@ def gemini_api(text):
     Returns:
         str: Generated response text from Gemini API.
     """
-    # Initialize a genAI model
-    model = genai.GenerativeModel(model_name=GEMINI_MODEL)
+    if speculator is not None:
+        # Reuses the request started from the partial transcript when it matches
+        handle, _, _ = speculator.finalize(text)
+        wait_for_answer = handle.result
+    else:
+        # Generate a response based on the input text
+        wait_for_answer = lambda: generate_text(text)
+    if latency_supervisor is not None:
+        # Emma says a filler and looks thoughtful if the answer takes too long
+        response_text = latency_supervisor.call(wait_for_answer)
+    else:
+        response_text = wait_for_answer()
+    print(response_text)  # Print the response
+    return response_text
+
+
+def start_speech_pipeline(text):
+    """
+    Starts streaming a Gemini answer and synthesizing it sentence by sentence.
+
+    Args:
+        text (str): Input text for the API.
 
-    # Generate a response based on the input text
-    response = model.generate_content(text)
-    print(response.text)  # Print the response
-    return response.text
+    Returns:
+        SpeechPipeline: Running pipeline; call play_all() to speak the answer.
+    """
+    if speculator is not None:
+        text_chunks, _, _ = speculator.finalize(text)
+    else:
+        text_chunks = stream_text(text)
+    if latency_supervisor is not None:
+        # Emma says a filler and looks thoughtful until the first words arrive
+        text_chunks = latency_supervisor.wrap_stream(text_chunks)
+    pipeline = SpeechPipeline(openai_text_to_speech, play_audio)
+    pipeline.start(text_chunks)
+    return pipeline
+
+
+# Opt-in: Gemini requests start from stable partial transcripts (see speculative_llm.py)
+speculator = None
+if LLM_SPECULATIVE:
+    if LLM_SENTENCE_PIPELINE:
+        start_request = lambda text: PrefetchedStream(lambda: stream_text(text))
+    else:
+        start_request = background_call(generate_text)
+    speculator = SpeculativeDispatcher(start_request, stable_frames=LLM_SPECULATIVE_STABLE_FRAMES,
+                                       min_words=LLM_SPECULATIVE_MIN_WORDS)
 
 # ------------------- Text-to-Speech Function -------------------
 
-def openai_text_to_speech(text):
+def openai_text_to_speech(text, use_cache=True):
     """
     Converts input text to speech using OpenAI's Text-to-Speech API (ChatGPT Quality).
 
     Args:
         text (str): Text to convert to speech.
+        use_cache (bool): Look up and store the audio in the TTS cache.
 
     Returns:
-        bytes: Binary audio content generated by the API.
+        bytes: Binary audio content generated by the API (or the TTS cache).
     """
+    if tts_cache is not None and use_cache:
+        return tts_cache.get_or_create("openai", OPENAI_TTS_MODEL, OPENAI_TTS_VOICE, text,
+                                       openai_synthesizer(client, OPENAI_TTS_MODEL, OPENAI_TTS_VOICE))
     # Generate speech
     response = client.audio.speech.create(
         model=OPENAI_TTS_MODEL,
@@ -258,72 +486,138 @@ def openai_text_to_speech(text):
 
 def play_audio(audio_bytes):
     """
-    Plays audio content using pygame.
+    Plays audio content on the speech channel and waits until it ends (or is stopped).
 
     Args:
         audio_bytes (bytes): Binary audio content to play.
     """
-    pygame.mixer.init()
-    pygame.mixer.music.load(io.BytesIO(audio_bytes))  # Load audio from bytes
-    pygame.mixer.music.play()
-    while pygame.mixer.music.get_busy():  # Wait for playback to finish
-        pygame.time.Clock().tick(10)
+    audio_output.play(audio_bytes).wait()
 
-def text_to_speech(text):
+def text_to_speech(text, cancel_event=None, use_cache=True):
     """
     Converts input text to speech and plays it.
 
     Args:
         text (str): Text to convert to speech.
+        cancel_event (threading.Event): Optional event that stops streamed playback early.
+        use_cache (bool): Look up and store the audio in the TTS cache.
     """
     print(f"Emma says: {text}")
-    audio_content = openai_text_to_speech(text)
-    play_audio(audio_content)
+    if streaming_player is not None:
+        # Playback starts with the first audio chunks instead of after the full download
+        stream_openai_speech(client, text, OPENAI_TTS_MODEL, OPENAI_TTS_VOICE, streaming_player,
+                             cancel_event=cancel_event, cache=tts_cache if use_cache else None)
+        return
+    audio_content = openai_text_to_speech(text, use_cache)
+    if cancel_event is None or not cancel_event.is_set():
+        play_audio(audio_content)
 
 
-# ------------------- Movement Functions -------------------
+def cached_speech(text, audio_format):
+    """
+    Returns:
+        bytes: OpenAI audio for text already in the TTS cache, or None.
+    """
+    if tts_cache is None:
+        return None
+    return tts_cache.get(TTSCache.key("openai", OPENAI_TTS_MODEL, OPENAI_TTS_VOICE, text, audio_format))
 
-# Function to smoothly move servos to target positions
-def move_servo(target_positions, delay=SERVO_DELAY):
+
+def speak_local_answer(text, cancel_event, sentences=None):
     """
-    Moves the servos smoothly to the target positions.
+    Speaks an answer from the intent router without asking OpenAI when possible:
+    cached audio if Emma said exactly this before (fixed answers are pre-warmed),
+    else the offline pyttsx3 voice. Nothing is added to the TTS cache.
 
-    :param target_positions: List of target angles [LServo, RServo, HServo]
-    :param delay: Time delay (in seconds) between each incremental step
+    Args:
+        text (str): Answer to speak.
+        cancel_event (threading.Event): Stops playback early (barge-in).
+        sentences (list): The answer as the speech pipeline spoke it, whose
+            sentences were cached one by one (for "repeat that").
     """
-    global last_positions  # Use the global variable to track servo positions
-    # Calculate the maximum number of steps required for the largest position difference
-    max_steps = max(abs(target_positions[i] - last_positions[i]) for i in range(3))
+    if sentences:
+        clips = [cached_speech(sentence, "mp3") for sentence in sentences]
+    else:
+        clips = [cached_speech(text, "pcm" if streaming_player is not None else "mp3")]
+    if all(clip is not None for clip in clips):
+        print(f"Emma says: {text}")
+        if streaming_player is not None and not sentences:
+            streaming_player.play(clips, cancel_event=cancel_event)
+            return
+        for clip in clips:
+            if cancel_event.is_set():
+                break
+            play_audio(clip)
+        return
+    if offline_tts is not None:
+        try:
+            print(f"Emma says: {text}")
+            offline_tts.speak(text, audio_output, timeout=OFFLINE_TTS_TIMEOUT_S, cancel_event=cancel_event)
+            return
+        except Exception as e:
+            print(f"⚠️ Offline voice failed ({e}), using OpenAI TTS")
+    text_to_speech(text, cancel_event, use_cache=False)
 
-    # Incrementally move each servo to its target position over multiple steps
-    for step in range(max_steps):
-        # Calculate the current position of each servo at this step
-        current_positions = [
-            last_positions[i] + (step + 1) * (target_positions[i] - last_positions[i]) // max_steps
-            if abs(target_positions[i] - last_positions[i]) > step else last_positions[i]
-            for i in range(3)
-        ]
-        # Send the calculated positions to the Arduino
-        arduino.sendData(current_positions)
-        # Introduce a small delay to ensure smooth motion
-        sleep(delay)
 
-    # Update the last known positions to the target positions
-    last_positions = target_positions[:]
+def speak_interruptible(speak, pipeline=None):
+    """
+    Runs speak(cancel_event) while watching the microphone for the user talking over Emma.
+
+    Args:
+        speak (callable): cancel_event -> None, plays the answer.
+        pipeline (SpeechPipeline): Pipeline whose pending sentences are dropped on barge-in.
+
+    Returns:
+        int: Mic position where the user started talking, or None if Emma finished.
+    """
+    cancel_event = threading.Event()
+    if barge_in is None:
+        speak(cancel_event)
+        return None
+
+    def interrupt():
+        print("👂 User started talking, stopping speech")
+        cancel_event.set()
+        if pipeline is not None:
+            pipeline.cancel()
+        audio_output.stop()
+
+    barge_in.start(interrupt)
+    try:
+        speak(cancel_event)
+    finally:
+        resume_pos = barge_in.stop()
+    return resume_pos
+
+
+# ------------------- Movement Functions -------------------
+
+# Function to smoothly move servos to target positions
+def move_servo(target_positions, duration=None, profile=None):
+    """
+    Queues a smooth move of the servos to the target positions and returns immediately.
+
+    All servos start and arrive together; frames are sent at SERVO_FRAME_RATE_HZ.
+
+    :param target_positions: List of target angles [LServo, RServo, HServo] (None keeps a servo where it is)
+    :param duration: Motion time in seconds (default: largest move at SERVO_MAX_SPEED)
+    :param profile: "linear", "trapezoidal" or "minimum_jerk" (default: SERVO_MOTION_PROFILE)
+    :return: Future resolved once the servos reached the target
+    """
+    return motion.move(target_positions, duration, profile)
 
 
 def hello_gesture():
     """
     Makes Emma wave hello by moving the right servo back and forth.
     """
-    global last_positions
     # Move right arm to start waving
-    move_servo([last_positions[0], 180, last_positions[2]])
+    move_servo([None, 180, None])
     for _ in range(HELLO_WAVE_COUNT):  # Perform the waving motion
-        move_servo([last_positions[0], 150, last_positions[2]])  # Move arm slightly down
-        move_servo([last_positions[0], 180, last_positions[2]])  # Move arm back up
+        move_servo([None, 150, None])  # Move arm slightly down
+        move_servo([None, 180, None])  # Move arm back up
     # Reset arm to original position
-    move_servo([last_positions[0], 0, last_positions[2]])
+    return move_servo([None, 0, None])
 
 
 # New: Left-hand goodbye gesture (distinct from right-hand hello)
@@ -331,48 +625,112 @@ def goodbye_gesture():
     """
     Waves goodbye using the left servo (opposite hand from hello).
     """
-    global last_positions
     # Raise left arm to start waving (left up is near 0)
-    move_servo([0, last_positions[1], last_positions[2]])
+    move_servo([0, None, None])
     for _ in range(HELLO_WAVE_COUNT):  # reuse wave count for symmetry
-        move_servo([30, last_positions[1], last_positions[2]])  # slight down
-        move_servo([0, last_positions[1], last_positions[2]])   # back up
+        move_servo([30, None, None])  # slight down
+        move_servo([0, None, None])   # back up
     # Reset left arm to original position (default 180)
-    move_servo([DEFAULT_LEFT_SERVO_POS, last_positions[1], last_positions[2]])
+    return move_servo([DEFAULT_LEFT_SERVO_POS, None, None])
 
 
 # New: speaking hand control (use left hand for speaking)
 def raise_speaking_hand():
     """Raise the left arm while speaking."""
-    global last_positions
-    move_servo([0, last_positions[1], last_positions[2]])
+    return move_servo([0, None, None])
 
 
 def lower_speaking_hand():
     """Lower the left arm when listening/idle."""
-    global last_positions
-    move_servo([DEFAULT_LEFT_SERVO_POS, last_positions[1], last_positions[2]])
+    return move_servo([DEFAULT_LEFT_SERVO_POS, None, None])
 
 
 # New: head positioning helpers
 def set_head(angle_deg):
     """Move only the head to the specified angle."""
-    global last_positions
-    move_servo([last_positions[0], last_positions[1], angle_deg])
+    return move_servo([None, None, angle_deg])
 
 
 def set_head_listening():
     """Head turned to 45° while listening."""
-    set_head(45)
+    return set_head(45)
 
 
 def set_head_speaking():
     """Head straight (90°) while speaking."""
-    set_head(90)
+    return set_head(90)
+
+
+def thinking_gesture(stop_event):
+    """
+    Tilts the head slowly from side to side until stop_event is set, then looks straight ahead.
+
+    Args:
+        stop_event (threading.Event): Set when the answer is ready.
+    """
+    while not stop_event.is_set():
+        for angle in (70, 110):
+            move_servo([None, None, angle], duration=0.6).result()
+            if stop_event.is_set():
+                break
+    set_head_speaking()
+
+
+# Filler phrases are synthesized once (and kept in the TTS cache) so they play instantly
+filler_audio = {}
+
+
+def load_fillers():
+    """Synthesizes the filler phrases in the background."""
+    for phrase in LLM_FILLER_PHRASES:
+        try:
+            filler_audio[phrase] = openai_text_to_speech(phrase)
+        except Exception as e:
+            print(f"⚠️ Could not prepare filler '{phrase}': {e}")
+
+
+def play_filler(phrase):
+    """
+    Starts a filler phrase without waiting for it.
+
+    Returns:
+        PlaybackHandle: Playing filler, or None if its audio is not ready yet.
+    """
+    audio = filler_audio.get(phrase)
+    if audio is None:
+        return None
+    print(f"Emma says: {phrase}")
+    return audio_output.play(audio)
+
+
+# Watches how long Gemini takes to start answering
+latency_supervisor = None
+if LLM_LATENCY_BUDGET_S is not None:
+    latency_supervisor = LatencySupervisor(LLM_LATENCY_BUDGET_S, play_filler=play_filler,
+                                           start_gesture=thinking_gesture if LLM_THINKING_GESTURE else None,
+                                           fillers=LLM_FILLER_PHRASES)
+    threading.Thread(target=load_fillers, daemon=True).start()
 
 # ------------------- Main Loop -------------------
 
-EXIT_KEYWORDS = {"stop", "quit", "goodbye", "exit", "bye"}
+def wait_for_wake_word():
+    """
+    Listens with the small keyword model until a wake word or exit phrase is heard.
+    The large model starts loading as soon as Emma is woken up.
+
+    Returns:
+        str: The keyword that was heard.
+    """
+    print("💤 Waiting for a wake word...")
+    while True:
+        text, _ = listen_with_vosk(recognizer=two_tier.spotter, speculate=False, use_commands=False)
+        keyword = two_tier.spot(text)
+        if keyword in EXIT_KEYWORDS and commands.match(text) != "goodbye":
+            continue  # only a whole-utterance exit command ends the program
+        if keyword is not None:
+            if keyword not in EXIT_KEYWORDS:
+                two_tier.preload()
+            return keyword
 
 # # Background stdin watcher: type 'q' (or 'quit'/'exit') + Enter to quit immediately
 # def _stdin_quit_watcher():
@@ -396,61 +754,163 @@ EXIT_KEYWORDS = {"stop", "quit", "goodbye", "exit", "bye"}
 # _stdin_thread = threading.Thread(target=_stdin_quit_watcher, daemon=True)
 # _stdin_thread.start()
 
+# Local commands that only move Emma (hello and goodbye also speak, see below)
+COMMAND_ACTIONS = {
+    "wave": hello_gesture,
+    "raise_hand": raise_speaking_hand,
+    "lower_hand": lower_speaking_hand,
+    "look_left": lambda: set_head(HEAD_LOOK_LEFT_POS),
+    "look_right": lambda: set_head(HEAD_LOOK_RIGHT_POS),
+    "look_ahead": set_head_speaking,
+}
+
+# Set when the user interrupts Emma, so the next listen starts where they began talking
+resume_pos = None
+# With two-tier recognition, Emma only uses the large model after a wake word
+awake = two_tier is None
+# After a motion command Emma keeps the pose instead of going back to the listening pose
+hold_pose = False
+
 while True:
     # if EXIT_NOW.is_set():
     #     break
 
-    # Move Emma to casual gesture (head to 45° for listening)
-    move_servo([DEFAULT_LEFT_SERVO_POS, DEFAULT_RIGHT_SERVO_POS, 45], delay=SERVO_DELAY)
+    if not hold_pose:
+        # Move Emma to casual gesture (head to 45° for listening)
+        move_servo([DEFAULT_LEFT_SERVO_POS, DEFAULT_RIGHT_SERVO_POS, 45])
 
-    # Listen for speech input
-    # Ensure speaking hand is lowered and head is in listening pose (45°)
-    lower_speaking_hand()
-    set_head_listening()
+        # Listen for speech input
+        # Ensure speaking hand is lowered and head is in listening pose (45°)
+        lower_speaking_hand()
+        set_head_listening()
+    hold_pose = False
     # if EXIT_NOW.is_set():
     #     break
-    text = listen_with_vosk()
+    if awake:
+        text, intent = listen_with_vosk(start_pos=resume_pos, timeout=CONVERSATION_TIMEOUT_S if two_tier else None)
+        if text is None:
+            # Nobody talked for a while: back to the keyword model
+            awake = False
+            two_tier.release()
+            if conversation is not None:
+                conversation.reset()  # the next wake word starts a new conversation
+            continue
+    else:
+        text = wait_for_wake_word()
+        intent = commands.match(text) or "hello"
+        awake = True
+    resume_pos = None
 
-    # Exit if stop keywords are spoken
-    if any(k in text.lower() for k in EXIT_KEYWORDS):
+    if intent is not None and speculator is not None:
+        speculator.discard()  # a command, not a question
+
+    # Exit if a stop command is spoken
+    if intent == "goodbye":
         print("Exit phrase detected. Shutting down...")
         try:
-            # Play a goodbye gesture with the left hand
-            goodbye_gesture()
+            # Play a goodbye gesture with the left hand while saying goodbye
+            gesture = goodbye_gesture()
             text_to_speech("Goodbye!")
+            gesture.result()
         except Exception:
             pass
         # EXIT_NOW.set()
         break
 
     # Waves if "hello Emma"
-    if "hello" in text.lower() or "emma" in text.lower():
+    if intent == "hello":
         print("Triggering Hello Gesture...")
+        # Gestures are queued on the motion thread; speech starts while Emma waves
         hello_gesture()
 
         response_text = "Hello! How can I assist you today?"
         # Raise speaking hand while talking
         raise_speaking_hand()
         set_head_speaking()
-        text_to_speech(response_text)
+        resume_pos = speak_interruptible(lambda cancel: text_to_speech(response_text, cancel))
+        last_response, last_sentences = response_text, None
         # Lower after speaking
         lower_speaking_hand()
         set_head_listening()
 
+    # Motion commands run locally, without asking Gemini
+    elif intent in COMMAND_ACTIONS:
+        print(f"🤖 Command: {intent}")
+        COMMAND_ACTIONS[intent]()
+        hold_pose = True
+
     # Normal conversation
     else:
         print(f"Processing input: {text}")
-        ai_response = gemini_api(text)
-        # Raise speaking hand while talking
-        raise_speaking_hand()
-        set_head_speaking()
-        text_to_speech(ai_response)
+        local_intent, local_answer = router.route(text) if router is not None else (None, None)
+        answered = True
+        if local_answer is not None:
+            # Answered on the robot (from the TTS cache or the offline voice): no Gemini request
+            print(f"⚡ Answered locally ({local_intent}): {local_answer}")
+            if speculator is not None:
+                speculator.discard()
+            raise_speaking_hand()
+            set_head_speaking()
+            repeated = last_sentences if local_intent == "repeat" else None
+            resume_pos = speak_interruptible(lambda cancel: speak_local_answer(local_answer, cancel, repeated))
+            if local_intent != "repeat":
+                last_response, last_sentences = local_answer, None
+        else:
+            try:
+                if LLM_SENTENCE_PIPELINE:
+                    # Gemini keeps generating while the first sentences are synthesized and played
+                    pipeline = start_speech_pipeline(text)
+                    raise_speaking_hand()
+                    set_head_speaking()
+                    resume_pos = speak_interruptible(lambda cancel: pipeline.play_all(), pipeline)
+                    last_sentences = list(pipeline.played)  # not the sentences synthesized ahead of a barge-in
+                    last_response = " ".join(last_sentences)
+                else:
+                    # Raise speaking hand while Gemini is thinking
+                    raise_speaking_hand()
+                    set_head_speaking()
+                    ai_response = gemini_api(text)
+                    resume_pos = speak_interruptible(lambda cancel: text_to_speech(ai_response, cancel))
+                    last_response, last_sentences = ai_response, None
+            except Exception as e:
+                # No answer from any backend (or it broke off): apologize and keep listening
+                print(f"⚠️ No answer: {e}")
+                text_to_speech(LLM_UNAVAILABLE_REPLY)
+                last_response, last_sentences = LLM_UNAVAILABLE_REPLY, None
+                answered = False
+        if conversation is not None and answered:
+            # What Emma actually said (up to a barge-in) becomes part of the conversation
+            conversation.record(text, last_response)
         # Lower after speaking
         lower_speaking_hand()
         set_head_listening()
 
 # # Perform graceful shutdown when exiting
 # graceful_shutdown()
+motion.stop()
+print(f"Servo link: {arduino.stats()}")
+if vad is not None:
+    print(f"Voice activity: {vad.stats()}")
+print(f"Endpointing: {endpointer.stats()}")
+print(f"Local commands: {commands.stats()}")
+if router is not None:
+    print(f"Local answers: {router.stats()}")
+if offline_tts is not None:
+    print(f"Offline voice: {offline_tts.stats()}")
+    offline_tts.close()
+if conversation is not None:
+    print(f"Conversation: {conversation.stats()}")
+if dispatcher is not None:
+    print(f"LLM backends: {dispatcher.stats()}")
+if latency_supervisor is not None:
+    print(f"Answer latency: {latency_supervisor.stats()}")
+if two_tier is not None:
+    print(f"Speech models: {two_tier.stats()}")
+    two_tier.close()
+if speculator is not None:
+    print(f"Speculative LLM: {speculator.stats()}")
+arduino.close()
+audio_output.close()
 print("Emma Robot exited cleanly.")
 
 
@@ -13,13 +13,15 @@ import pyaudio
 import json
 import pygame
 import google.generativeai as genai
-import pyttsx3
 import sys
 import os
 
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import *
+from Software.audio_playback import PlaybackEngine
+from Software.offline_tts import OfflineTTS
 
 
 # ------------------- Initializations -------------------
@@ -27,6 +29,11 @@ from config import *
 # Initialize Pygame mixer
 pygame.mixer.init()
 
+# Decode the cue sounds once; they are played asynchronously on their own channels
+listen_cue = pygame.mixer.Sound(LISTEN_SOUND_PATH)
+convert_cue = pygame.mixer.Sound(CONVERT_SOUND_PATH)
+CUE_MARGIN = 0.1  # extra seconds muted after a cue (output latency, room echo)
+
 # Initialize VOSK model
 model = vosk.Model(VOSK_MODEL_PATH)
 recognizer = vosk.KaldiRecognizer(model, VOSK_SAMPLE_RATE)
@@ -34,41 +41,29 @@ recognizer = vosk.KaldiRecognizer(model, VOSK_SAMPLE_RATE)
 # Configure Gemini API with your API key
 genai.configure(api_key=GEMINI_API_KEY)
 
-# Initialize offline Text-to-Speech engine
-tts_engine = pyttsx3.init()
-tts_engine.setProperty('rate', 170)
-tts_engine.setProperty('volume', 1.0)
-
-# Set voice to English (prefer female voice if available)
-voices = tts_engine.getProperty('voices')
-english_voices = [v for v in voices if 'en' in v.id.lower() or 'english' in v.name.lower()]
-if english_voices:
-    # Prefer female English voice, fallback to any English voice
-    female_english = [v for v in english_voices if 'female' in v.name.lower() or 'woman' in v.name.lower()]
-    if female_english:
-        tts_engine.setProperty('voice', female_english[0].id)
-        print(f"Using English female voice: {female_english[0].name}")
-    else:
-        tts_engine.setProperty('voice', english_voices[0].id)
-        print(f"Using English voice: {english_voices[0].name}")
-else:
-    print("No English voices found, using default voice")
+# Initialize offline Text-to-Speech: one pyttsx3 engine in a worker process (English voice,
+# female if available) that renders audio for the shared mixer instead of blocking in runAndWait()
+tts = OfflineTTS(rate=170, volume=1.0, voice=OFFLINE_TTS_VOICE)
+audio_output = PlaybackEngine(mixer=pygame.mixer)
 
 
 
 # ------------------- Utility Functions -------------------
 
-def play_sound(file_path):
+def play_cue(cue):
     """
-    Plays an audio file using pygame.
+    Starts a preloaded cue without waiting for it.
 
     Args:
-        file_path (str): Path to the audio file.
+        cue (pygame.mixer.Sound): Decoded cue sound.
+
+    Returns:
+        int: Bytes of microphone audio to silence while the cue is audible.
     """
-    pygame.mixer.music.load(file_path)
-    pygame.mixer.music.play()
-    while pygame.mixer.music.get_busy():  # Wait for audio to finish playing
-        pygame.time.Clock().tick(5)
+    cue.play()
+    bytes_per_second = VOSK_SAMPLE_RATE * 2 * AUDIO_CHANNELS  # paInt16
+    mute = int((cue.get_length() + CUE_MARGIN) * bytes_per_second)
+    return mute - mute % (2 * AUDIO_CHANNELS)
 
 # ------------------- Speech-to-Text Function -------------------
 
@@ -85,18 +80,26 @@ def listen_with_vosk():
     )
     stream.start_stream()
     print("Listening ...")
-    play_sound(LISTEN_SOUND_PATH)  # Play listening sound
+    mute_bytes = play_cue(listen_cue)  # Play listening sound while already capturing
 
     while True:
         data = stream.read(AUDIO_CHUNK_SIZE)
         if len(data) == 0:  # Skip if no audio data
             continue
+        if mute_bytes > 0:
+            # Silence the cue so the recognizer does not hear it
+            muted = min(mute_bytes, len(data))
+            data = bytes(muted) + data[muted:]
+            mute_bytes -= muted
 
         if recognizer.AcceptWaveform(data):  # Recognize speech
-            play_sound(CONVERT_SOUND_PATH)  # Play conversion sound
+            play_cue(convert_cue)  # Play conversion sound without delaying the result
             result = recognizer.Result()  # Get result from recognizer
             text = json.loads(result)["text"]  # Extract text
             print("You said: " + text)
+            stream.stop_stream()
+            stream.close()
+            mic.terminate()
             return text
 
 # ------------------- AI Text Generation Function -------------------
@@ -129,8 +132,8 @@ def text_to_speech(text):
         text (str): Text to convert to speech.
     """
     print(f"Emma says: {text}")
-    tts_engine.say(text)
-    tts_engine.runAndWait()
+    # The next sentence is rendered while the current one plays
+    tts.speak(text, audio_output, timeout=OFFLINE_TTS_TIMEOUT_S)
 
 # ------------------- Main Loop -------------------
 
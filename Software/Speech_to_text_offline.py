@@ -20,6 +20,14 @@ model = vosk.Model("../Resources/vosk-model-en-us-0.22")
 # Create recognizer object for the model (sample rate 16000 Hz)
 recognizer = vosk.KaldiRecognizer(model, 16000)
 
+# Frames per microphone read (same as AUDIO_CHUNK_SIZE in config). Vosk can only
+# end an utterance between reads, so big reads add up to a read's worth of delay.
+CHUNK_SIZE = 2048
+
+# End an utterance after 0.5 s of silence (Vosk's endpointer, vosk >= 0.3.45)
+if hasattr(recognizer, "SetEndpointerDelays"):
+    recognizer.SetEndpointerDelays(5.0, 0.5, 15.0)
+
 def play_sound(file_path):
     """
     Plays an audio file and waits until it finishes.
@@ -42,7 +50,7 @@ def listen_with_vosk():
         channels=1,              # Mono audio
         rate=16000,               # Sample rate (Hz)
         input=True,               # Use as input (microphone)
-        frames_per_buffer=8192    # Buffer size
+        frames_per_buffer=CHUNK_SIZE  # Buffer size
     )
     stream.start_stream()
 
@@ -50,7 +58,7 @@ def listen_with_vosk():
     play_sound("../Resources/listen.mp3")  # Play "listening" sound
 
     while True:
-        data = stream.read(8192)  # Read audio from mic
+        data = stream.read(CHUNK_SIZE)  # Read audio from mic
         if len(data) == 0:        # Skip if no data
             continue
 
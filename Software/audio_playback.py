@@ -0,0 +1,200 @@
+"""
+Audio playback engine for Emma Robot
+Keeps one pygame mixer open for the whole session and plays speech and sound
+effects on separate channels. Callers get a handle that is signalled when the
+audio ends, instead of polling pygame.mixer.music.get_busy() in a loop:
+
+    audio = PlaybackEngine()
+    audio.load_effect("listen", LISTEN_SOUND_PATH)
+    audio.play_effect("listen")              # does not block
+    audio.play(mp3_bytes).wait()             # blocks until Emma stops talking
+"""
+
+import io
+import threading
+
+# OpenAI TTS "pcm" format, so raw PCM can be played without resampling
+DEFAULT_FREQUENCY = 24000
+DEFAULT_CHANNELS = 1
+
+
+# ------------------- Playback Handle -------------------
+
+class PlaybackHandle:
+    """
+    Completion signal for one sound. `wait()` returns when it finished or was
+    cancelled; `cancel()` stops it mid-way.
+    """
+
+    def __init__(self, length):
+        """
+        Args:
+            length (float): Duration of the sound in seconds.
+        """
+        self.length = length
+        self.cancelled = False
+        self._done = threading.Event()
+        self._cancel = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def wait(self, timeout=None):
+        """
+        Blocks until playback ended.
+
+        Returns:
+            bool: True if playback ended, False on timeout.
+        """
+        return self._done.wait(timeout)
+
+    def done(self):
+        """True once playback ended (finished or cancelled)."""
+        return self._done.is_set()
+
+    def cancel(self):
+        """Stops playback; waiters are released right away."""
+        self._cancel.set()
+
+    def add_done_callback(self, fn):
+        """Calls fn(handle) when playback ends (immediately if it already has)."""
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def _finish(self, cancelled):
+        with self._lock:
+            self.cancelled = cancelled
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            try:
+                fn(self)
+            except Exception as e:
+                print(f"⚠️ Playback callback failed: {e}")
+
+
+# ------------------- Playback Engine -------------------
+
+class PlaybackEngine:
+    """
+    One persistent output device. Speech uses a reserved channel (a new
+    utterance interrupts the previous one); effects use the remaining channels
+    and can overlap with speech.
+    """
+
+    def __init__(self, frequency=DEFAULT_FREQUENCY, channels=DEFAULT_CHANNELS, num_channels=8, mixer=None):
+        """
+        Args:
+            frequency (int): Output sample rate (also the rate of raw PCM passed to play()).
+            channels (int): Output channels (1 = mono).
+            num_channels (int): Mixer channels; one is reserved for speech.
+            mixer (module): pygame.mixer compatible module (default: pygame.mixer).
+        """
+        if mixer is None:
+            import pygame
+            mixer = pygame.mixer
+        self._mixer = mixer
+        if not mixer.get_init():
+            mixer.init(frequency=frequency, size=-16, channels=channels)
+        mixer.set_num_channels(num_channels)
+        mixer.set_reserved(1)
+        self._speech_channel = mixer.Channel(0)
+        self._speech = None
+        self._effects = {}
+        self._owners = {}  # channel -> handle of the sound last started on it
+        self._lock = threading.Lock()
+
+    # ------------------- Speech -------------------
+
+    def play(self, audio, audio_format="mp3"):
+        """
+        Starts playing speech and returns immediately.
+
+        Args:
+            audio (bytes): Encoded audio (mp3/ogg/wav) or raw 16-bit PCM in the
+                mixer's format when audio_format is "pcm".
+            audio_format (str): "pcm" or the name of a compressed format.
+
+        Returns:
+            PlaybackHandle: Signalled when the utterance ends.
+        """
+        if audio_format == "pcm":
+            sound = self._mixer.Sound(buffer=audio)
+        else:
+            sound = self._mixer.Sound(file=io.BytesIO(audio))
+        with self._lock:
+            if self._speech is not None:
+                self._speech.cancel()
+            handle = self._start(sound, self._speech_channel)
+            self._speech = handle
+        return handle
+
+    def stop(self):
+        """Cancels the current utterance (e.g. when the user interrupts Emma)."""
+        with self._lock:
+            speech = self._speech
+        if speech is not None:
+            speech.cancel()
+
+    @property
+    def speaking(self):
+        """True while an utterance is playing."""
+        with self._lock:
+            return self._speech is not None and not self._speech.done()
+
+    # ------------------- Sound Effects -------------------
+
+    def load_effect(self, name, file_path):
+        """Decodes a sound file once so later plays start without disk access."""
+        self._effects[name] = self._mixer.Sound(file_path)
+
+    def play_effect(self, name):
+        """
+        Plays a preloaded effect on a free channel, overlapping with speech.
+
+        Args:
+            name (str): Name given to `load_effect` (a file path is loaded on first use).
+
+        Returns:
+            PlaybackHandle: Signalled when the effect ends.
+        """
+        if name not in self._effects:
+            self.load_effect(name, name)
+        with self._lock:
+            channel = self._mixer.find_channel(True)
+            return self._start(self._effects[name], channel)
+
+    # ------------------- Internals -------------------
+
+    def _start(self, sound, channel):
+        # Called with the lock held, so ownership changes hands together with the channel
+        handle = PlaybackHandle(sound.get_length())
+        channel.play(sound)
+        self._owners[channel] = handle
+        threading.Thread(target=self._watch, args=(handle, channel), daemon=True).start()
+        return handle
+
+    def _owns(self, handle, channel):
+        with self._lock:
+            return self._owners.get(channel) is handle
+
+    def _watch(self, handle, channel):
+        # Sleep for the sound's length (woken early by cancel), then confirm the channel is done
+        cancelled = handle._cancel.wait(handle.length)
+        while not cancelled and channel.get_busy() and self._owns(handle, channel):
+            cancelled = handle._cancel.wait(0.005)
+        with self._lock:
+            # Only stop the channel if no newer sound was started on it meanwhile
+            if self._owners.get(channel) is handle:
+                if cancelled:
+                    channel.stop()
+                del self._owners[channel]
+        handle._finish(cancelled)
+
+    def close(self):
+        """Stops everything and releases the output device."""
+        self.stop()
+        self._mixer.stop()
+        self._mixer.quit()
@@ -0,0 +1,237 @@
+"""
+Streaming audio playback for Emma Robot
+Starts playing OpenAI TTS audio as soon as the first chunks arrive instead of
+waiting for the whole file to download.
+
+OpenAI's "pcm" response format is raw 24 kHz, 16-bit, mono audio, so chunks can
+be written straight to the output device without decoding.
+"""
+
+import threading
+import time
+
+# OpenAI TTS "pcm" format
+OPENAI_PCM_SAMPLE_RATE = 24000
+OPENAI_PCM_SAMPLE_WIDTH = 2  # bytes per sample (16-bit)
+
+
+# ------------------- Jitter Buffer -------------------
+
+class JitterBuffer:
+    """
+    Thread-safe byte FIFO between the network download and the audio device.
+
+    Playback is held back (silence is returned) until `prefill_bytes` are
+    buffered. If the network falls behind and the buffer runs dry, it goes
+    back to buffering instead of stuttering on every late chunk.
+    """
+
+    def __init__(self, prefill_bytes):
+        """
+        Args:
+            prefill_bytes (int): Bytes to buffer before (re)starting playback.
+        """
+        self.prefill_bytes = prefill_bytes
+        self.underruns = 0
+        self.first_audio_at = None  # time.monotonic() of the first real audio read
+        self._data = bytearray()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._buffering = True
+
+    def write(self, data):
+        """Append downloaded audio."""
+        with self._lock:
+            self._data.extend(data)
+
+    def close(self):
+        """Mark the end of the stream; remaining data is still played."""
+        with self._lock:
+            self._closed = True
+
+    def clear(self):
+        """Drop everything buffered and end the stream (used to cancel playback)."""
+        with self._lock:
+            self._data.clear()
+            self._closed = True
+
+    def read(self, size):
+        """
+        Returns exactly `size` bytes for the audio device.
+
+        Args:
+            size (int): Number of bytes requested by the device.
+
+        Returns:
+            bytes: Audio (padded with silence while buffering), or None once the
+            stream is closed and fully drained.
+        """
+        with self._lock:
+            if self._closed and not self._data:
+                return None
+            if self._buffering:
+                if len(self._data) < self.prefill_bytes and not self._closed:
+                    return bytes(size)
+                self._buffering = False
+
+            chunk = bytes(self._data[:size])
+            del self._data[:size]
+            if self.first_audio_at is None:
+                self.first_audio_at = time.monotonic()
+            if len(chunk) < size:
+                if not self._closed:
+                    # Network fell behind: refill before continuing
+                    self.underruns += 1
+                    self._buffering = True
+                chunk += bytes(size - len(chunk))
+            return chunk
+
+
+# ------------------- Streaming Player -------------------
+
+class StreamingPlayer:
+    """
+    Plays a stream of raw PCM chunks through one persistent PyAudio device.
+    """
+
+    def __init__(self, sample_rate=OPENAI_PCM_SAMPLE_RATE, channels=1,
+                 prefill_ms=200, frames_per_buffer=1024):
+        """
+        Args:
+            sample_rate (int): Sample rate of the incoming PCM audio.
+            channels (int): Number of interleaved channels.
+            prefill_ms (int): Audio to buffer before playback starts.
+            frames_per_buffer (int): Frames requested per device callback.
+        """
+        import pyaudio
+
+        self._pyaudio = pyaudio
+        self._pa = pyaudio.PyAudio()
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self.bytes_per_frame = OPENAI_PCM_SAMPLE_WIDTH * channels
+        self.prefill_bytes = int(sample_rate * prefill_ms / 1000) * self.bytes_per_frame
+        self._buffer = None  # jitter buffer of the stream being played
+
+    @property
+    def playing(self):
+        """True while audio (not prefill silence) is coming out of the device."""
+        buffer = self._buffer
+        return buffer is not None and buffer.first_audio_at is not None
+
+    def play(self, chunks, cancel_event=None):
+        """
+        Plays PCM chunks as they arrive and blocks until playback finishes.
+
+        Args:
+            chunks (iterable of bytes): Audio chunks, e.g. from a streaming HTTP response.
+            cancel_event (threading.Event): Optional event that stops playback early.
+
+        Returns:
+            dict: Playback stats (time to first chunk/audio in seconds, underruns, bytes).
+        """
+        pyaudio = self._pyaudio
+        started = time.monotonic()
+        buffer = JitterBuffer(self.prefill_bytes)
+        self._buffer = buffer
+        finished = threading.Event()
+
+        def callback(in_data, frame_count, time_info, status):
+            data = buffer.read(frame_count * self.bytes_per_frame)
+            if data is None:
+                finished.set()
+                return bytes(frame_count * self.bytes_per_frame), pyaudio.paComplete
+            return data, pyaudio.paContinue
+
+        stream = self._pa.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            output=True,
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=callback
+        )
+        first_chunk_at = None
+        total_bytes = 0
+        try:
+            for chunk in chunks:
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+                if first_chunk_at is None:
+                    first_chunk_at = time.monotonic()
+                total_bytes += len(chunk)
+                buffer.write(chunk)
+            buffer.close()
+
+            while not finished.wait(0.05):
+                if cancel_event is not None and cancel_event.is_set():
+                    buffer.clear()
+        finally:
+            self._buffer = None
+            try:
+                stream.stop_stream()
+            except Exception:
+                pass
+            stream.close()
+
+        return {
+            "time_to_first_chunk": None if first_chunk_at is None else first_chunk_at - started,
+            "time_to_first_audio": None if buffer.first_audio_at is None else buffer.first_audio_at - started,
+            "underruns": buffer.underruns,
+            "bytes": total_bytes,
+        }
+
+    def close(self):
+        """Releases the audio device."""
+        self._pa.terminate()
+
+
+# ------------------- OpenAI Streaming TTS -------------------
+
+def stream_openai_speech(client, text, model, voice, player, chunk_size=4096, cancel_event=None, cache=None):
+    """
+    Synthesizes speech with OpenAI and plays it while it is still downloading.
+
+    With a TTSCache, cached phrases play without a network request and newly
+    streamed audio is stored once it has been downloaded completely.
+
+    Args:
+        client (OpenAI): OpenAI client.
+        text (str): Text to speak.
+        model (str): TTS model name.
+        voice (str): TTS voice name.
+        player (StreamingPlayer): Player configured for 24 kHz mono PCM.
+        chunk_size (int): Bytes per network read.
+        cancel_event (threading.Event): Optional event that stops playback early.
+        cache (TTSCache): Optional audio cache.
+
+    Returns:
+        dict: Playback stats from `StreamingPlayer.play`.
+    """
+    key = None
+    if cache is not None:
+        key = cache.key("openai", model, voice, text, "pcm")
+        audio = cache.get(key)
+        if audio is not None:
+            return player.play([audio], cancel_event=cancel_event)
+
+    with client.audio.speech.with_streaming_response.create(
+        model=model,
+        voice=voice,
+        input=text,
+        response_format="pcm"
+    ) as response:
+        if key is None:
+            return player.play(response.iter_bytes(chunk_size), cancel_event=cancel_event)
+
+        downloaded = []
+
+        def tee():
+            for chunk in response.iter_bytes(chunk_size):
+                downloaded.append(chunk)
+                yield chunk
+            # Only reached when the whole response was read (not on cancel)
+            cache.put(key, b"".join(downloaded))
+
+        return player.play(tee(), cancel_event=cancel_event)
@@ -0,0 +1,371 @@
+"""
+Speech and language backend registry for Emma Robot
+Every speech-to-text, text-to-speech or LLM implementation is registered under
+a kind ("stt", "tts", "llm") and a name. Backends are loaded the first time
+they are used, so an unused engine never imports its library or loads its
+model, and each one keeps rolling latency and error statistics.
+
+A policy picks the backend for each call. `LatencyPolicy` keeps the preferred
+backend while its recent latency percentile and error rate are within target
+and switches to the next one in preference order when they are not (e.g.
+pyttsx3 when OpenAI TTS gets slow). A demoted backend is tried again after a
+while, so the preferred one comes back when it recovers.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+# ------------------- Backend -------------------
+
+class Backend:
+    """
+    One registered implementation with lazy loading and rolling stats.
+    """
+
+    def __init__(self, kind, name, run, load=None, window=50):
+        """
+        Args:
+            kind (str): Backend kind, e.g. "tts".
+            name (str): Backend name, e.g. "openai".
+            run (callable): Does the work; returns (result, latency_s), where
+                latency_s is what the user waited for (e.g. time to first audio),
+                or None to use the duration of the call.
+            load (callable): Called once before the first run (imports, models).
+            window (int): Number of recent calls kept in the stats.
+        """
+        self.kind = kind
+        self.name = name
+        self._run = run
+        self._load = load
+        self._loaded = load is None
+        self._load_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)  # latency in s, or None for an error
+        self.load_error = None
+        # Stats
+        self.calls = 0
+        self.errors = 0
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def load(self):
+        """
+        Loads the backend if needed.
+
+        Raises:
+            Exception: Whatever the loader raised (the backend is not retried).
+        """
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            if self.load_error is not None:
+                raise self.load_error
+            try:
+                self._load()
+            except Exception as e:
+                self.load_error = e
+                raise
+            self._loaded = True
+
+    def run(self, *args, **kwargs):
+        """
+        Loads the backend if needed, runs it and records latency or failure.
+
+        Returns:
+            The backend's result.
+        """
+        try:
+            self.load()
+            started = time.monotonic()
+            result, latency = self._run(*args, **kwargs)
+        except Exception:
+            self.record(None)
+            raise
+        self.record(time.monotonic() - started if latency is None else latency)
+        return result
+
+    def record(self, latency_s):
+        """
+        Records one call.
+
+        Args:
+            latency_s (float): Latency in seconds, or None for a failed call.
+        """
+        with self._lock:
+            self.calls += 1
+            if latency_s is None:
+                self.errors += 1
+            self._outcomes.append(latency_s)
+
+    def reset_stats(self):
+        """Forgets the rolling window (the counters are kept)."""
+        with self._lock:
+            self._outcomes.clear()
+
+    def samples(self):
+        """
+        Returns:
+            int: Calls in the rolling window.
+        """
+        with self._lock:
+            return len(self._outcomes)
+
+    def percentile(self, percentile):
+        """
+        Args:
+            percentile (float): 0 to 100.
+
+        Returns:
+            float: Latency percentile of the successful calls in the window in
+            seconds, or None without any.
+        """
+        with self._lock:
+            latencies = sorted(latency for latency in self._outcomes if latency is not None)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile / 100))]
+
+    def error_rate(self):
+        """
+        Returns:
+            float: Share of failed calls in the window.
+        """
+        with self._lock:
+            outcomes = list(self._outcomes)
+        return sum(latency is None for latency in outcomes) / len(outcomes) if outcomes else 0.0
+
+    def stats(self):
+        """
+        Returns:
+            dict: Calls, errors, loaded flag, and error rate and median/p95
+            latency (ms) over the rolling window.
+        """
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "loaded": self._loaded,
+            "error_rate": self.error_rate(),
+            "p50_ms": None if p50 is None else 1000 * p50,
+            "p95_ms": None if p95 is None else 1000 * p95,
+        }
+
+
+# ------------------- Policies -------------------
+
+class FixedPolicy:
+    """
+    Always uses the first registered backend (no switching).
+    """
+
+    def order(self, backends):
+        """
+        Args:
+            backends (list): Usable backends in preference order.
+
+        Returns:
+            list: Backends to try, best first.
+        """
+        return backends[:1]
+
+
+class LatencyPolicy:
+    """
+    Uses the most preferred backend that meets a latency target.
+    """
+
+    def __init__(self, target_s, percentile=95, max_error_rate=0.2, min_samples=3,
+                 retry_after_s=120.0, clock=time.monotonic):
+        """
+        Args:
+            target_s (float): Latency the chosen backend's percentile must stay under.
+            percentile (float): Latency percentile compared to the target.
+            max_error_rate (float): Highest acceptable share of failed calls.
+            min_samples (int): Calls needed before a backend can be judged.
+            retry_after_s (float): A demoted backend is given a fresh window after
+                this long.
+            clock (callable): Monotonic clock in seconds.
+        """
+        self.target_s = target_s
+        self.percentile = percentile
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.retry_after_s = retry_after_s
+        self.clock = clock
+        self._demoted = {}  # backend name -> time of demotion
+
+    def healthy(self, backend):
+        """
+        Returns:
+            bool: True while the backend meets the target (or is not judged yet).
+        """
+        if backend.samples() < self.min_samples:
+            return True
+        if backend.error_rate() > self.max_error_rate:
+            return False
+        latency = backend.percentile(self.percentile)
+        return latency is None or latency <= self.target_s
+
+    def order(self, backends):
+        """
+        Args:
+            backends (list): Usable backends in preference order.
+
+        Returns:
+            list: Healthy backends in preference order, then the others from
+            fastest to slowest (used when everything misses the target).
+        """
+        now = self.clock()
+        healthy, degraded = [], []
+        for backend in backends:
+            demoted_at = self._demoted.get(backend.name)
+            if demoted_at is not None and now - demoted_at >= self.retry_after_s:
+                # Give it another chance with a fresh window
+                del self._demoted[backend.name]
+                backend.reset_stats()
+            if self.healthy(backend):
+                healthy.append(backend)
+            else:
+                self._demoted.setdefault(backend.name, now)
+                degraded.append(backend)
+        degraded.sort(key=lambda backend: (backend.error_rate() > self.max_error_rate,
+                                           backend.percentile(self.percentile) or 0.0))
+        return healthy + degraded
+
+
+# ------------------- Registry -------------------
+
+class BackendRegistry:
+    """
+    Backends by kind, each kind with its own selection policy.
+    """
+
+    def __init__(self):
+        self._backends = {}  # kind -> [Backend] in preference order
+        self._policies = {}
+        self._active = {}
+        self._lock = threading.Lock()
+        # Stats
+        self.switches = {}
+
+    def register(self, kind, name, run, load=None, window=50):
+        """
+        Adds a backend after the ones already registered for its kind.
+
+        Args:
+            kind, name, run, load, window: As in `Backend`.
+
+        Returns:
+            Backend: The registered backend.
+        """
+        backend = Backend(kind, name, run, load=load, window=window)
+        with self._lock:
+            self._backends.setdefault(kind, []).append(backend)
+            self.switches.setdefault(kind, 0)
+        return backend
+
+    def set_policy(self, kind, policy):
+        """
+        Args:
+            kind (str): Backend kind.
+            policy: Object with order(backends) -> backends to try, best first.
+        """
+        self._policies[kind] = policy
+
+    def backends(self, kind):
+        """
+        Returns:
+            list: Backends of a kind in preference order.
+        """
+        with self._lock:
+            return list(self._backends.get(kind, []))
+
+    def get(self, kind, name):
+        """
+        Returns:
+            Backend: The backend registered under kind and name, or None.
+        """
+        return next((backend for backend in self.backends(kind) if backend.name == name), None)
+
+    def candidates(self, kind):
+        """
+        Returns:
+            list: Backends the policy wants tried, best first (ones that failed
+            to load are left out).
+        """
+        usable = [backend for backend in self.backends(kind) if backend.load_error is None]
+        return self._policies.get(kind, FixedPolicy()).order(usable)
+
+    def select(self, kind):
+        """
+        Returns:
+            Backend: The backend the next call of this kind will use first.
+
+        Raises:
+            LookupError: No usable backend of this kind.
+        """
+        candidates = self.candidates(kind)
+        if not candidates:
+            raise LookupError(f"no usable {kind} backend")
+        chosen = candidates[0]
+        with self._lock:
+            previous = self._active.get(kind)
+            self._active[kind] = chosen
+            if previous is not None and previous is not chosen:
+                self.switches[kind] += 1
+                switched = previous
+            else:
+                switched = None
+        if switched is not None:
+            p95 = switched.percentile(95)
+            detail = f"p95 {p95:.2f}s, " if p95 is not None else ""
+            print(f"🔀 {kind}: switching from {switched.name} to {chosen.name}"
+                  f" ({detail}{switched.error_rate():.0%} errors)")
+        return chosen
+
+    def call(self, kind, *args, **kwargs):
+        """
+        Runs the selected backend, falling back to the policy's next choices if it fails.
+
+        Returns:
+            The backend's result.
+
+        Raises:
+            LookupError: No usable backend of this kind.
+            Exception: The last backend's error when all of them failed.
+        """
+        first = self.select(kind)
+        candidates = [first] + [backend for backend in self.candidates(kind) if backend is not first]
+        error = None
+        for backend in candidates:
+            try:
+                return backend.run(*args, **kwargs)
+            except Exception as e:
+                print(f"⚠️ {kind} backend {backend.name} failed: {e}")
+                error = e
+        raise error
+
+    def stats(self):
+        """
+        Returns:
+            dict: Per kind, the active backend, number of switches and each
+            backend's stats.
+        """
+        with self._lock:
+            kinds = {kind: list(backends) for kind, backends in self._backends.items()}
+            active = dict(self._active)
+            switches = dict(self.switches)
+        return {
+            kind: {
+                "active": active[kind].name if kind in active else None,
+                "switches": switches.get(kind, 0),
+                "backends": {backend.name: backend.stats() for backend in backends},
+            }
+            for kind, backends in kinds.items()
+        }
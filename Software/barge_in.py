@@ -0,0 +1,195 @@
+"""
+Barge-in detection for Emma Robot
+While Emma talks, the always-on microphone capture keeps running. This module
+watches it for the user's voice and interrupts playback as soon as they start
+talking, so a long answer can be cut short like in a normal conversation.
+
+Emma's own voice also reaches the microphone. It is gated out with an energy
+threshold calibrated against the playback level: the loudest echo measured in
+the first audible moments of playback (silent leading frames are skipped),
+times a safety ratio. The echo estimate keeps following the playback as a
+slowly decaying maximum, so a reply that gets louder later does not make Emma
+interrupt herself. Only audio captured while something is actually playing is
+analysed (not while the answer is still being generated).
+"""
+
+import math
+import sys
+import threading
+from array import array
+
+SAMPLE_WIDTH = 2  # bytes per sample (paInt16)
+
+
+def frame_rms(pcm):
+    """
+    Args:
+        pcm (bytes): 16-bit little-endian mono audio.
+
+    Returns:
+        float: Root-mean-square level (0 to 32768).
+    """
+    samples = array("h", pcm[:len(pcm) - len(pcm) % SAMPLE_WIDTH])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+# ------------------- Barge-in Monitor -------------------
+
+class BargeInMonitor:
+    """
+    Voice-activity watch on the microphone while Emma is speaking.
+
+    Usage per utterance:
+        monitor.start(on_barge_in)   # on_barge_in() stops playback
+        ... play speech ...
+        start_pos = monitor.stop()   # mic position where the user started, or None
+    """
+
+    def __init__(self, capture, is_playing=None, frame_ms=20, calibration_ms=300, threshold_ratio=2.0,
+                 min_rms=500, min_speech_ms=200, pre_roll_ms=200, max_calibration_ms=1500, echo_half_life_ms=1000):
+        """
+        Args:
+            capture (MicrophoneCapture): Shared, always-on microphone capture.
+            is_playing (callable): Returns True while Emma's audio is audible (default: always).
+            frame_ms (int): Analysis frame length.
+            calibration_ms (int): Audible playback time used to measure Emma's echo level.
+            threshold_ratio (float): How much louder than the echo the user must be.
+            min_rms (float): Lowest detection threshold.
+            min_speech_ms (int): Voice needed before interrupting (ignores clicks and bumps).
+            pre_roll_ms (int): Audio kept before the detected speech onset.
+            max_calibration_ms (int): Calibrate with what was heard by then, even if
+                the playback stayed quiet.
+            echo_half_life_ms (int): How fast the running echo estimate decays.
+        """
+        self.capture = capture
+        self.is_playing = is_playing or (lambda: True)
+        self.frame_bytes = int(capture.rate * frame_ms / 1000) * capture.bytes_per_frame
+        self.calibration_frames = max(1, calibration_ms // frame_ms)
+        self.max_calibration_frames = max(self.calibration_frames, max_calibration_ms // frame_ms)
+        self.echo_decay = 0.5 ** (frame_ms / echo_half_life_ms)
+        self.threshold_ratio = threshold_ratio
+        self.min_rms = min_rms
+        self.speech_frames = max(1, min_speech_ms // frame_ms)
+        self.pre_roll_bytes = int(capture.rate * pre_roll_ms / 1000) * capture.bytes_per_frame
+        self.triggered = threading.Event()
+        self.speech_start_pos = None
+        self.threshold = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._reset_state()
+
+    def start(self, on_barge_in):
+        """
+        Starts watching the microphone from now on.
+
+        Args:
+            on_barge_in (callable): Called once (on the monitor thread) when the user talks.
+        """
+        self.stop()
+        self.triggered.clear()
+        self._stop_event.clear()
+        self.speech_start_pos = None
+        self.threshold = None
+        self._reset_state()
+        reader = self.capture.reader()
+        self._thread = threading.Thread(target=self._run, args=(reader, on_barge_in), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops watching.
+
+        Returns:
+            int: Absolute mic position to resume listening from, or None if the
+            user did not interrupt.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.speech_start_pos if self.triggered.is_set() else None
+
+    def process(self, frame_pos, frame, playing=True):
+        """
+        Feeds one analysis frame.
+
+        Args:
+            frame_pos (int): Absolute mic position of the frame.
+            frame (bytes): `frame_bytes` of audio.
+            playing (bool): Whether Emma's audio was playing when the frame was read.
+
+        Returns:
+            bool: True when barge-in is detected on this frame.
+        """
+        if not playing:
+            self._run_start, self._voiced, self._gap = None, 0, 0
+            return False
+        level = frame_rms(frame)
+        if self.threshold is None:
+            # Calibrate on the first audible frames of playback (TTS audio often starts
+            # with silence): loudest echo x ratio
+            self._calibration_seen += 1
+            if level * self.threshold_ratio >= self.min_rms:
+                self._echo_levels.append(level)
+            if (len(self._echo_levels) >= self.calibration_frames
+                    or self._calibration_seen >= self.max_calibration_frames):
+                self._echo = max(self._echo_levels, default=0.0)
+                self._update_threshold()
+            return False
+
+        if level < self.threshold and self._run_start is None:
+            # Not the user: follow Emma's echo as a decaying running maximum
+            self._echo = max(level, self._echo * self.echo_decay)
+            self._update_threshold()
+
+        if level >= self.threshold:
+            if self._run_start is None:
+                self._run_start = frame_pos
+            self._voiced += 1
+            self._gap = 0
+            if self._voiced >= self.speech_frames:
+                self.speech_start_pos = max(self.capture.ring.oldest_pos, self._run_start - self.pre_roll_bytes)
+                return True
+        elif self._run_start is not None:
+            # Allow one quiet frame inside a word
+            self._gap += 1
+            if self._gap > 1:
+                self._run_start, self._voiced, self._gap = None, 0, 0
+        return False
+
+    def _update_threshold(self):
+        self.threshold = max(self.min_rms, self._echo * self.threshold_ratio)
+
+    def _reset_state(self):
+        self._echo_levels = []
+        self._calibration_seen = 0
+        self._echo = 0.0
+        self._run_start = None
+        self._voiced = 0
+        self._gap = 0
+
+    def _run(self, reader, on_barge_in):
+        pending = b""
+        pending_pos = reader.pos
+        while not self._stop_event.is_set():
+            data = reader.read(timeout=0.05)
+            if not data:
+                continue
+            if not pending:
+                pending_pos = reader.pos - len(data)
+            pending += data
+            playing = self.is_playing()
+            while len(pending) >= self.frame_bytes:
+                frame, pending = pending[:self.frame_bytes], pending[self.frame_bytes:]
+                frame_pos, pending_pos = pending_pos, pending_pos + self.frame_bytes
+                if self.process(frame_pos, frame, playing):
+                    self.triggered.set()
+                    try:
+                        on_barge_in()
+                    except Exception as e:
+                        print(f"⚠️ Barge-in handler failed: {e}")
+                    return
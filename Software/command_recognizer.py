@@ -0,0 +1,125 @@
+"""
+Local voice commands for Emma Robot
+Short commands ("hello emma", "goodbye", "look left", "raise your hand") are
+recognized by a Vosk recognizer restricted to a grammar of command phrases and
+mapped to intents through a table, so they run immediately without a Gemini
+round trip.
+
+A command only matches when the whole utterance is one of its phrases; anything
+else the grammar cannot explain comes out as "[unk]" and the utterance goes to
+the normal dictation path. This avoids false matches like "bye" in "maybe".
+"""
+
+import json
+
+from Software.transcripts import normalize_transcript
+
+UNKNOWN_WORD = "[unk]"  # Vosk grammar entry that absorbs everything else
+
+# Intent -> phrases that trigger it
+DEFAULT_COMMANDS = {
+    "hello": ["hello", "hello emma", "hi emma", "hey emma", "emma"],
+    "goodbye": ["goodbye", "goodbye emma", "bye", "bye emma", "stop", "quit", "exit"],
+    "wave": ["wave", "wave at me", "wave your hand"],
+    "raise_hand": ["raise your hand", "raise your arm", "hands up"],
+    "lower_hand": ["lower your hand", "lower your arm", "put your hand down", "hands down"],
+    "look_left": ["look left", "turn left", "look to the left"],
+    "look_right": ["look right", "turn right", "look to the right"],
+    "look_ahead": ["look ahead", "look straight", "look at me"],
+}
+
+
+class CommandRecognizer:
+    """
+    Grammar-constrained command recognizer plus the phrase -> intent table.
+    Feed it the same audio as the dictation recognizer with `accept()` and ask
+    `finalize()` for the intent when the utterance ends.
+    """
+
+    def __init__(self, model, sample_rate, commands=None, configure=None, vosk_module=None):
+        """
+        Args:
+            model: Vosk model supporting runtime grammars (a small model), or None
+                to only match dictation transcripts against the table.
+            sample_rate (int): Audio sample rate in Hz.
+            commands (dict): Intent -> list of phrases (default: DEFAULT_COMMANDS).
+            configure (callable): Called with the new recognizer (e.g. endpointer delays).
+            vosk_module: The `vosk` module (imported lazily when None).
+        """
+        self.intents = {}
+        for intent, phrases in (commands or DEFAULT_COMMANDS).items():
+            for phrase in phrases:
+                self.intents[normalize_transcript(phrase)] = intent
+        self.recognizer = None
+        if model is not None:
+            if vosk_module is None:
+                import vosk as vosk_module
+            self.recognizer = vosk_module.KaldiRecognizer(model, sample_rate, self.grammar())
+            if configure is not None:
+                configure(self.recognizer)
+        self._results = []
+        # Stats
+        self.utterances = 0
+        self.matches = {}
+
+    def grammar(self):
+        """
+        Returns:
+            str: JSON grammar with every command phrase and the unknown-word filler.
+        """
+        return json.dumps(list(self.intents) + [UNKNOWN_WORD])
+
+    def match(self, text):
+        """
+        Maps a transcript to an intent.
+
+        Args:
+            text (str): Grammar or dictation transcript.
+
+        Returns:
+            str: The intent, or None unless the whole transcript is a command phrase.
+        """
+        if UNKNOWN_WORD in text:
+            return None
+        return self.intents.get(normalize_transcript(text))
+
+    def accept(self, data):
+        """Decodes a chunk of audio (same chunks as the dictation recognizer)."""
+        if self.recognizer is not None and self.recognizer.AcceptWaveform(data):
+            self._results.append(json.loads(self.recognizer.Result())["text"])
+
+    def reset(self):
+        """Drops the current utterance."""
+        if self.recognizer is not None:
+            self.recognizer.Reset()
+        self._results = []
+
+    def finalize(self, transcript=""):
+        """
+        Ends the utterance and returns its intent.
+
+        Args:
+            transcript (str): Dictation transcript, used when there is no grammar
+                recognizer.
+
+        Returns:
+            tuple: (intent, text). `intent` is None when the utterance is not a command.
+        """
+        if self.recognizer is not None:
+            self._results.append(json.loads(self.recognizer.FinalResult())["text"])
+            text = " ".join(result for result in self._results if result)
+        else:
+            text = transcript
+        self._results = []
+        intent = self.match(text)
+        self.utterances += 1
+        if intent is not None:
+            self.matches[intent] = self.matches.get(intent, 0) + 1
+        return intent, text
+
+    def stats(self):
+        """
+        Returns:
+            dict: Utterances seen and how often each intent was recognized.
+        """
+        return {"utterances": self.utterances, "matches": dict(self.matches)}
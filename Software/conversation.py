@@ -0,0 +1,231 @@
+"""
+Conversation memory for Emma Robot
+Gives Gemini the earlier turns of the conversation without letting the prompt
+grow with every turn. Recent turns are sent verbatim while they fit in a token
+budget; older turns are folded into a running summary, one batch at a time, on
+a background thread after the answer was spoken. The prompt size therefore
+stays roughly constant over a long session.
+
+Requests are built from the history as it was when they started and only
+`record()` changes it, so speculative requests that are thrown away never end
+up in the memory.
+"""
+
+import threading
+
+SUMMARY_ACK = "Understood, I remember that."
+
+
+def estimate_tokens(text):
+    """
+    Rough token count (about four characters per token for English).
+
+    Args:
+        text (str): Any text.
+
+    Returns:
+        int: Estimated tokens.
+    """
+    return (len(text) + 3) // 4
+
+
+class ConversationSession:
+    """
+    Rolling, token-budgeted chat history around a Gemini model.
+    """
+
+    def __init__(self, model, token_budget=1500, summary_words=80, min_recent_turns=1,
+                 summarize=None, count_tokens=estimate_tokens, background=True):
+        """
+        Args:
+            model (genai.GenerativeModel): Gemini model used for the chat.
+            token_budget (int): Max tokens of summary plus verbatim turns sent with
+                each question.
+            summary_words (int): Target length of the running summary.
+            min_recent_turns (int): Turns always kept verbatim.
+            summarize (callable): (summary, turns, max_words) -> new summary. Defaults
+                to asking `model`.
+            count_tokens (callable): text -> tokens.
+            background (bool): Summarize on a background thread.
+        """
+        self.model = model
+        self.token_budget = token_budget
+        self.summary_words = summary_words
+        self.min_recent_turns = min_recent_turns
+        self.summarize = summarize or self._summarize_with_model
+        self.count_tokens = count_tokens
+        self.background = background
+        self._lock = threading.Lock()
+        self._summarizer = None
+        self._generation = 0
+        self.reset()
+
+    def reset(self):
+        """Forgets the whole conversation (a summary still running is discarded)."""
+        with self._lock:
+            self._generation += 1  # a running summary must not write into the new conversation
+            self._summarizer = None
+            self.summary = ""
+            self.turns = []         # (user, answer) sent verbatim
+            self._folding = []      # turns being summarized (still sent until the summary is ready)
+            self.turn_tokens = []   # (prompt_tokens, answer_tokens) per recorded turn
+            self.summaries = 0
+
+    # ------------------- Prompt -------------------
+
+    def history(self):
+        """
+        Returns:
+            list: Gemini chat history (dicts with "role" and "parts") for the next turn.
+        """
+        with self._lock:
+            summary, turns = self.summary, self._folding + self.turns
+        contents = []
+        if summary:
+            contents.append({"role": "user", "parts": [f"Summary of our conversation so far: {summary}"]})
+            contents.append({"role": "model", "parts": [SUMMARY_ACK]})
+        for user, answer in turns:
+            contents.append({"role": "user", "parts": [user]})
+            contents.append({"role": "model", "parts": [answer]})
+        return contents
+
+    def prompt_tokens(self, text=""):
+        """
+        Args:
+            text (str): The next question.
+
+        Returns:
+            int: Estimated prompt size (history plus question) in tokens.
+        """
+        history = sum(self.count_tokens(part) for content in self.history() for part in content["parts"])
+        return history + self.count_tokens(text)
+
+    def send(self, text):
+        """
+        Asks a question with the conversation history.
+
+        Args:
+            text (str): The question.
+
+        Returns:
+            str: The answer (call `record()` once it was used).
+        """
+        return self.model.start_chat(history=self.history()).send_message(text).text
+
+    def stream(self, text):
+        """
+        Like `send()`, but yields the answer as text pieces while it arrives.
+        """
+        for chunk in self.model.start_chat(history=self.history()).send_message(text, stream=True):
+            try:
+                piece = chunk.text
+            except ValueError:
+                # Chunk without text (e.g. safety metadata only)
+                continue
+            if piece:
+                yield piece
+
+    # ------------------- Memory -------------------
+
+    def record(self, text, answer):
+        """
+        Adds a finished turn and trims the history to the token budget.
+
+        Args:
+            text (str): What the user said.
+            answer (str): What Emma answered (possibly cut short by barge-in).
+        """
+        if not answer:
+            return
+        prompt_tokens = self.prompt_tokens(text)
+        with self._lock:
+            self.turn_tokens.append((prompt_tokens, self.count_tokens(answer)))
+            self.turns.append((text, answer))
+            if self._summarizer is not None:
+                return  # the running summary picks up the rest afterwards
+            batch = self._take_overflow()
+            generation = self._generation
+        if batch:
+            self._start_summary(batch, generation)
+
+    def _take_overflow(self):
+        """Moves the oldest turns over the budget to `_folding` (lock held)."""
+        used = self.count_tokens(self.summary) + sum(self.count_tokens(u) + self.count_tokens(a) for u, a in self.turns)
+        batch = []
+        while used > self.token_budget and len(self.turns) > self.min_recent_turns:
+            user, answer = self.turns.pop(0)
+            used -= self.count_tokens(user) + self.count_tokens(answer)
+            batch.append((user, answer))
+        self._folding = batch
+        return batch
+
+    def _start_summary(self, batch, generation):
+        if not self.background:
+            self._fold(batch, generation)
+            return
+        self._summarizer = threading.Thread(target=self._fold, args=(batch, generation), name="conversation-summary",
+                                            daemon=True)
+        self._summarizer.start()
+
+    def _fold(self, batch, generation):
+        while batch:
+            with self._lock:
+                previous = self.summary
+            try:
+                summary = self.summarize(previous, batch, self.summary_words)
+            except Exception as e:
+                summary = None
+                print(f"⚠️ Conversation summary failed: {e}")
+            with self._lock:
+                if generation != self._generation:
+                    # reset() ran meanwhile: this summary belongs to the old conversation
+                    if self._summarizer is threading.current_thread():
+                        self._summarizer = None
+                    return
+                if summary is None:
+                    # Keep the turns verbatim and try again after the next turn
+                    self.turns[:0] = self._folding
+                    self._folding = []
+                    self._summarizer = None
+                    return
+                self.summary = summary
+                self.summaries += 1
+                # Turns recorded meanwhile may have pushed the history over budget again
+                batch = self._take_overflow()
+                if not batch:
+                    self._summarizer = None
+
+    def wait(self, timeout=None):
+        """Waits for a running summary (e.g. in tests or before shutdown)."""
+        summarizer = self._summarizer
+        if summarizer is not None:
+            summarizer.join(timeout)
+
+    def _summarize_with_model(self, summary, turns, max_words):
+        exchanges = "\n".join(f"User: {user}\nEmma: {answer}" for user, answer in turns)
+        prompt = (f"Update the summary of a conversation between a user and Emma, a talking robot, "
+                  f"with the new exchanges. Keep names, facts and open questions. "
+                  f"Answer with the summary only, at most {max_words} words.\n\n"
+                  f"Summary so far: {summary or '(none)'}\n\nNew exchanges:\n{exchanges}")
+        return self.model.generate_content(prompt).text.strip()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Turns recorded, current prompt size, summary size, verbatim
+            turns, summaries made, and prompt tokens of the last turn.
+        """
+        with self._lock:
+            turn_tokens = list(self.turn_tokens)
+            verbatim = len(self._folding) + len(self.turns)
+            summary_tokens = self.count_tokens(self.summary)
+            summaries = self.summaries
+        return {
+            "turns": len(turn_tokens),
+            "prompt_tokens": self.prompt_tokens(),
+            "summary_tokens": summary_tokens,
+            "verbatim_turns": verbatim,
+            "summaries": summaries,
+            "last_turn_prompt_tokens": turn_tokens[-1][0] if turn_tokens else 0,
+            "max_turn_prompt_tokens": max((prompt for prompt, _ in turn_tokens), default=0),
+        }
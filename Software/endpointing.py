@@ -0,0 +1,144 @@
+"""
+Endpointing for Emma Robot
+Decides when the user has finished talking, so the final transcript is taken
+as soon as possible instead of whenever Vosk's default endpointer fires:
+
+    - trailing silence: finalize after this much silence following speech
+    - max utterance: finalize long monologues at this length
+    - adaptive: short commands ("hello emma", "goodbye") use a shorter timeout
+
+The same settings are passed to Vosk's own endpointer when the installed
+version supports it. Finalization latency (end of speech to final result) is
+recorded per turn so the settings can be tuned.
+"""
+
+import time
+
+from Software.transcripts import normalize_transcript
+
+
+class Endpointer:
+    """
+    Endpoint policy plus latency metrics. Call `start()` per listen, `update()`
+    per chunk, and `finalized()` when a final transcript is taken.
+    """
+
+    def __init__(self, trailing_silence_ms=500, max_utterance_ms=15000, adaptive=True,
+                 short_command_silence_ms=250, short_commands=(), clock=time.monotonic):
+        """
+        Args:
+            trailing_silence_ms (int): Silence after speech that ends an utterance.
+            max_utterance_ms (int): Longest utterance before it is finalized anyway.
+            adaptive (bool): Use the shorter timeout for short commands.
+            short_command_silence_ms (int): Trailing silence for short commands.
+            short_commands (iterable of str): Phrases that are complete on their own,
+                e.g. "hello emma" or the exit keywords.
+            clock (callable): Monotonic clock in seconds.
+        """
+        self.trailing_silence_ms = trailing_silence_ms
+        self.max_utterance_ms = max_utterance_ms
+        self.adaptive = adaptive
+        self.short_command_silence_ms = short_command_silence_ms
+        self.short_commands = [normalize_transcript(c) for c in short_commands]
+        self.clock = clock
+        self.latencies = []  # (reason, end-of-speech to final result in ms)
+        self.start()
+
+    def configure_recognizer(self, recognizer):
+        """
+        Applies the same timeouts to Vosk's internal endpointer (vosk >= 0.3.45).
+
+        Returns:
+            bool: True if the recognizer supports it.
+        """
+        if not hasattr(recognizer, "SetEndpointerDelays"):
+            return False
+        recognizer.SetEndpointerDelays(5.0, self.trailing_silence_ms / 1000, self.max_utterance_ms / 1000)
+        return True
+
+    def start(self):
+        """Resets the per-utterance state at the beginning of a listen."""
+        self.speech_ended_at = None
+        self.timeout_ms = self.trailing_silence_ms
+        self.reason = None
+
+    def is_short_command(self, partial_text):
+        """
+        True when the whole partial transcript is one of the short commands (the
+        same rule as CommandRecognizer.match), so "hello can you" keeps the
+        normal timeout.
+        """
+        return normalize_transcript(partial_text) in self.short_commands
+
+    def update(self, trailing_silence_ms, utterance_ms, partial_text=""):
+        """
+        Checks the endpoint rules after a chunk.
+
+        Args:
+            trailing_silence_ms (float): Silence since the last speech frame (0 while talking).
+            utterance_ms (float): Audio since the first speech frame of this listen.
+            partial_text (str): Current partial transcript.
+
+        Returns:
+            bool: True when the utterance should be finalized now.
+        """
+        if utterance_ms <= 0:
+            return False
+        now = self.clock()
+        if trailing_silence_ms > 0:
+            if self.speech_ended_at is None:
+                self.speech_ended_at = now - trailing_silence_ms / 1000
+        else:
+            self.speech_ended_at = None
+
+        if utterance_ms >= self.max_utterance_ms:
+            self.reason = "max_utterance"
+            return True
+        if not partial_text.strip():
+            return False
+        short = self.adaptive and self.is_short_command(partial_text)
+        self.timeout_ms = self.short_command_silence_ms if short else self.trailing_silence_ms
+        if trailing_silence_ms >= self.timeout_ms:
+            self.reason = "short_command" if short else "trailing_silence"
+            return True
+        return False
+
+    def finalized(self, reason=None):
+        """
+        Records the finalization latency of the current utterance.
+
+        Args:
+            reason (str): Why it was finalized (defaults to the rule that fired,
+                or "recognizer" when Vosk's own endpointer was first).
+
+        Returns:
+            float: End of speech to final result in ms, or None if unknown.
+        """
+        reason = reason or self.reason or "recognizer"
+        latency = None
+        if self.speech_ended_at is not None:
+            latency = 1000 * (self.clock() - self.speech_ended_at)
+            self.latencies.append((reason, latency))
+            print(f"⏱️ Final result {latency:.0f} ms after end of speech ({reason})")
+        self.start()
+        return latency
+
+    def stats(self):
+        """
+        Returns:
+            dict: Number of measured turns, mean/median/90th percentile latency in
+            ms, and how many turns each rule finalized.
+        """
+        values = sorted(latency for _, latency in self.latencies)
+        reasons = {}
+        for reason, _ in self.latencies:
+            reasons[reason] = reasons.get(reason, 0) + 1
+        if not values:
+            return {"turns": 0, "reasons": reasons}
+        return {
+            "turns": len(values),
+            "mean_ms": sum(values) / len(values),
+            "p50_ms": values[len(values) // 2],
+            "p90_ms": values[min(len(values) - 1, int(len(values) * 0.9))],
+            "reasons": reasons,
+        }
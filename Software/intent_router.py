@@ -0,0 +1,145 @@
+"""
+Local intent router for Emma Robot
+Answers simple questions (time, date, Emma's name, what she can do, "repeat
+that") from compiled patterns instead of asking Gemini. Static answers can be
+pre-warmed in the TTS cache; answers that change (the time, the date) are meant
+for the offline voice, so these turns work without a network request.
+
+Routes are checked in the order they were added; the first pattern that
+matches the transcript answers. Hit/miss counts show what share of turns
+skipped the LLM.
+"""
+
+import datetime
+import re
+
+
+class IntentRouter:
+    """
+    Ordered list of (intent, patterns, response) routes.
+    """
+
+    def __init__(self):
+        self._routes = []
+        # Stats
+        self.hits = {}
+        self.misses = 0
+
+    def add(self, intent, patterns, response):
+        """
+        Adds a route.
+
+        Args:
+            intent (str): Name used in the stats.
+            patterns (iterable of str): Regular expressions matched (case-insensitive)
+                against the whole normalized transcript.
+            response (str or callable): The answer, or a function taking the
+                `re.Match` and returning the answer (None falls through to the
+                next route).
+        """
+        compiled = [re.compile(rf"(?:{pattern})", re.IGNORECASE) for pattern in patterns]
+        self._routes.append((intent, compiled, response))
+
+    def static_responses(self):
+        """
+        Returns:
+            list: Fixed answers, e.g. to pre-warm the TTS cache.
+        """
+        return [response for _, _, response in self._routes if isinstance(response, str)]
+
+    def route(self, text):
+        """
+        Finds a local answer for a transcript.
+
+        Args:
+            text (str): What the user said.
+
+        Returns:
+            tuple: (intent, answer), or (None, None) if the LLM should answer.
+        """
+        words = " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+        for intent, patterns, response in self._routes:
+            for pattern in patterns:
+                match = pattern.fullmatch(words)
+                if match is None:
+                    continue
+                answer = response(match) if callable(response) else response
+                if answer is not None:
+                    self.hits[intent] = self.hits.get(intent, 0) + 1
+                    return intent, answer
+        self.misses += 1
+        return None, None
+
+    def stats(self):
+        """
+        Returns:
+            dict: Turns seen, local hits per intent, misses and the share of
+            turns that skipped the LLM.
+        """
+        hits = sum(self.hits.values())
+        turns = hits + self.misses
+        return {
+            "turns": turns,
+            "hits": dict(self.hits),
+            "misses": self.misses,
+            "local_rate": hits / turns if turns else 0.0,
+        }
+
+
+# ------------------- Default Routes -------------------
+
+# Optional politeness around a question: "hey emma, what time is it please"
+_PREFIX = r"(?:(?:hey |hi |ok |okay )?emma )?(?:(?:can|could) you (?:please )?(?:tell me )?|please |do you know )?"
+_SUFFIX = r"(?: please| emma)?"
+
+
+def _spoken_time(now):
+    hour = now.hour % 12 or 12
+    suffix = "AM" if now.hour < 12 else "PM"
+    return f"It's {hour}:{now.minute:02d} {suffix}."
+
+
+def _spoken_date(now):
+    return f"Today is {now.strftime('%A')}, {now.strftime('%B')} {now.day}, {now.year}."
+
+
+def default_router(name="Emma", capabilities=None, last_response=None, clock=datetime.datetime.now):
+    """
+    Builds the router with Emma's built-in answers.
+
+    Args:
+        name (str): The robot's name.
+        capabilities (str): Answer to "what can you do".
+        last_response (callable): Returns the last thing Emma said (for "repeat that").
+        clock (callable): Returns the current datetime.
+
+    Returns:
+        IntentRouter: Router with time, date, name, capabilities and repeat routes.
+    """
+    router = IntentRouter()
+    router.add("time", [
+        _PREFIX + r"what(?: is|'s) the time(?: now)?" + _SUFFIX,
+        _PREFIX + r"what time is it(?: now)?" + _SUFFIX,
+    ], lambda match: _spoken_time(clock()))
+    router.add("date", [
+        _PREFIX + r"what(?: is|'s) (?:the date|today's date)(?: today)?" + _SUFFIX,
+        _PREFIX + r"what day is (?:it|today)(?: today)?" + _SUFFIX,
+    ], lambda match: _spoken_date(clock()))
+    router.add("name", [
+        _PREFIX + r"what(?: is|'s) your name" + _SUFFIX,
+        _PREFIX + r"who are you" + _SUFFIX,
+    ], f"I'm {name}, a talking robot.")
+    router.add("capabilities", [
+        _PREFIX + r"what can you do" + _SUFFIX,
+        _PREFIX + r"what are you able to do" + _SUFFIX,
+        r"help",
+    ], capabilities or ("I can answer questions, tell you the time and date, look left or right, "
+                        "raise my hand and wave. Say goodbye when you are done."))
+    if last_response is not None:
+        router.add("repeat", [
+            _PREFIX + r"(?:repeat|say) that(?: again)?" + _SUFFIX,
+            r"(?:sorry |pardon )?what did you say" + _SUFFIX,
+            r"(?:sorry|pardon)(?: me)?",
+            r"come again",
+        ], lambda match: last_response())
+    return router
@@ -0,0 +1,155 @@
+"""
+Latency budget for Emma Robot's answers
+When Gemini has not produced anything within the budget, Emma says a short
+filler ("Let me think...") and starts a looping "thinking" gesture instead of
+freezing. Both stop as soon as the first piece of the real answer arrives.
+
+Every turn is recorded (time to first output, budget overrun, filler used) so
+the budget and the fillers can be tuned.
+"""
+
+import itertools
+import threading
+import time
+
+
+class SupervisedTurn:
+    """
+    One answer being waited for. Call `ready()` when real output arrives.
+    """
+
+    def __init__(self, supervisor):
+        self._supervisor = supervisor
+        self._lock = threading.Lock()
+        self._done = False
+        self._filler = None
+        self._gesture_stop = None
+        self.started_at = supervisor.clock()
+        self.latency = None
+        self.overrun = False
+        self.filler_phrase = None
+        self._timer = threading.Timer(supervisor.budget_s, self._on_overrun)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_overrun(self):
+        supervisor = self._supervisor
+        with self._lock:
+            if self._done:
+                return
+            self.overrun = True
+            print(f"⏳ No answer after {supervisor.budget_s:g}s, thinking out loud")
+            if supervisor.start_gesture is not None:
+                self._gesture_stop = threading.Event()
+                threading.Thread(target=supervisor.start_gesture, args=(self._gesture_stop,),
+                                 name="thinking-gesture", daemon=True).start()
+            if supervisor.play_filler is not None:
+                phrase = supervisor.next_filler()
+                try:
+                    self._filler = supervisor.play_filler(phrase)
+                    self.filler_phrase = phrase if self._filler is not None else None
+                except Exception as e:
+                    print(f"⚠️ Filler failed: {e}")
+
+    def ready(self):
+        """Stops the timer, filler and gesture, and records the turn (only the first call counts)."""
+        with self._lock:
+            if self._done:
+                return
+            self._done = True
+            self._timer.cancel()
+            if self._gesture_stop is not None:
+                self._gesture_stop.set()
+            if self._filler is not None:
+                self._filler.cancel()
+            self.latency = self._supervisor.clock() - self.started_at
+        self._supervisor._record(self)
+
+
+class LatencySupervisor:
+    """
+    Watches time to first output for each answer.
+    """
+
+    def __init__(self, budget_s=1.5, play_filler=None, start_gesture=None,
+                 fillers=("Let me think...",), clock=time.monotonic):
+        """
+        Args:
+            budget_s (float): Time allowed before the filler and gesture start.
+            play_filler (callable): phrase -> handle with cancel() (e.g. a
+                PlaybackHandle), or None if the phrase is not available.
+                Must not block; use pre-synthesized audio.
+            start_gesture (callable): stop_event -> None. Runs on its own thread
+                and loops until stop_event is set.
+            fillers (iterable of str): Phrases used in turn.
+            clock (callable): Monotonic clock in seconds.
+        """
+        self.budget_s = budget_s
+        self.play_filler = play_filler
+        self.start_gesture = start_gesture
+        self.fillers = list(fillers)
+        self.clock = clock
+        self._next_filler = itertools.cycle(self.fillers) if self.fillers else None
+        self._lock = threading.Lock()
+        self.turns = []  # dicts with latency_s, overrun, filler
+
+    def next_filler(self):
+        """Returns the next filler phrase (they are used in rotation)."""
+        with self._lock:
+            return next(self._next_filler) if self._next_filler is not None else None
+
+    def start_turn(self):
+        """Starts the budget timer for one answer."""
+        return SupervisedTurn(self)
+
+    def wrap_stream(self, chunks):
+        """
+        Supervises a streamed answer: the first chunk counts as output.
+
+        Args:
+            chunks (iterable): Text pieces, e.g. from stream_gemini_text().
+
+        Yields:
+            The same pieces.
+        """
+        turn = self.start_turn()
+        try:
+            for chunk in chunks:
+                turn.ready()
+                yield chunk
+        finally:
+            turn.ready()
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Supervises a blocking request.
+
+        Returns:
+            Whatever fn returns.
+        """
+        turn = self.start_turn()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            turn.ready()
+
+    def _record(self, turn):
+        with self._lock:
+            self.turns.append({"latency_s": turn.latency, "overrun": turn.overrun, "filler": turn.filler_phrase})
+
+    def stats(self):
+        """
+        Returns:
+            dict: Turns, budget overruns, fillers played and time to first output
+            (mean and worst) in ms.
+        """
+        with self._lock:
+            turns = list(self.turns)
+        latencies = [turn["latency_s"] for turn in turns]
+        return {
+            "turns": len(turns),
+            "overruns": sum(turn["overrun"] for turn in turns),
+            "fillers": sum(turn["filler"] is not None for turn in turns),
+            "mean_first_output_ms": 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            "max_first_output_ms": 1000 * max(latencies) if latencies else 0.0,
+        }
@@ -0,0 +1,99 @@
+"""
+Long-lived LLM/TTS client layer for Emma Robot
+
+Creates the OpenAI client and Gemini model objects once per session instead of
+once per turn, keeps their connections alive between turns, and can pre-warm
+them at startup so the first question after boot does not pay for the TLS
+handshake.
+"""
+
+import threading
+
+
+class ClientPool:
+    """
+    Caches API clients and Gemini model objects for the whole session.
+    """
+
+    def __init__(self, gemini_api_key=None, openai_api_key=None, openai_base_url=None, timeout=30.0):
+        """
+        Args:
+            gemini_api_key (str): Gemini API key (None skips Gemini setup).
+            openai_api_key (str): OpenAI API key (None skips OpenAI setup).
+            openai_base_url (str): Optional OpenAI-compatible endpoint (e.g. a local stub).
+            timeout (float): Per-request timeout in seconds for OpenAI calls.
+        """
+        self.gemini_api_key = gemini_api_key
+        self.openai_api_key = openai_api_key
+        self.openai_base_url = openai_base_url
+        self.timeout = timeout
+        self._models = {}
+        self._openai = None
+        self._lock = threading.Lock()
+
+        if gemini_api_key is not None:
+            import google.generativeai as genai
+            genai.configure(api_key=gemini_api_key)
+
+    @property
+    def openai(self):
+        """Shared OpenAI client; its HTTP connection pool keeps connections alive between turns."""
+        with self._lock:
+            if self._openai is None:
+                from openai import OpenAI, DefaultHttpxClient
+                kwargs = {"api_key": self.openai_api_key, "timeout": self.timeout,
+                          "http_client": DefaultHttpxClient()}
+                if self.openai_base_url is not None:
+                    kwargs["base_url"] = self.openai_base_url
+                self._openai = OpenAI(**kwargs)
+            return self._openai
+
+    def gemini_model(self, model_name, system_instruction=None):
+        """
+        Returns a cached Gemini model object.
+
+        Args:
+            model_name (str): Gemini model name.
+            system_instruction (str): Optional system prompt (part of the cache key).
+
+        Returns:
+            genai.GenerativeModel: Model object reused across turns.
+        """
+        key = (model_name, system_instruction)
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                import google.generativeai as genai
+                model = genai.GenerativeModel(model_name=model_name, system_instruction=system_instruction)
+                self._models[key] = model
+            return model
+
+    def prewarm(self, gemini_model_name=None, background=True):
+        """
+        Opens the API connections with cheap requests before the first real turn.
+
+        Args:
+            gemini_model_name (str): Gemini model to warm up (None skips Gemini).
+            background (bool): Run on a daemon thread instead of blocking.
+
+        Returns:
+            threading.Thread or None: The warm-up thread when running in the background.
+        """
+        if background:
+            thread = threading.Thread(target=self.prewarm, args=(gemini_model_name, False), daemon=True)
+            thread.start()
+            return thread
+
+        if self.openai_api_key is not None:
+            try:
+                # Listing models is free and opens the pooled TLS connection
+                self.openai.models.list()
+            except Exception as e:
+                print(f"⚠️ OpenAI pre-warm failed: {e}")
+        if self.gemini_api_key is not None and gemini_model_name is not None:
+            try:
+                # Token counting is free and opens the Gemini channel
+                self.gemini_model(gemini_model_name).count_tokens("hello")
+            except Exception as e:
+                print(f"⚠️ Gemini pre-warm failed: {e}")
+        return None
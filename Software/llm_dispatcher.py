@@ -0,0 +1,301 @@
+"""
+Hedged LLM requests for Emma Robot
+Sends each question to a primary backend (Gemini) and, if it has not started
+answering within a threshold taken from its own recent latencies (e.g. the
+90th percentile), also to a second backend (OpenAI chat). The first backend
+to produce text wins and the other is cancelled. Failures, blocked answers
+and hung requests switch to the other backend right away, and every request
+has a deadline, so a bad request can no longer stall or crash the robot.
+
+Backends are plain functions (text, cancel_event) -> iterator of text pieces;
+`gemini_backend` and `openai_chat_backend` build them for the real APIs.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+
+
+class LLMUnavailable(Exception):
+    """Raised when no backend produced an answer before the deadline."""
+
+
+# ------------------- Backends -------------------
+
+def gemini_backend(stream):
+    """
+    Wraps a Gemini text stream as a backend.
+
+    Args:
+        stream (callable): text -> iterator of text pieces, e.g. a
+            ConversationSession's `stream` or stream_gemini_text bound to a model.
+
+    Returns:
+        callable: (text, cancel_event) -> iterator of text pieces.
+    """
+    def run(text, cancel_event):
+        for piece in stream(text):
+            if cancel_event.is_set():
+                return
+            yield piece
+    return run
+
+
+def openai_chat_backend(client, model, history=None, system_prompt=None, timeout=None):
+    """
+    Builds a backend on the OpenAI chat completions API (streaming).
+
+    Args:
+        client (OpenAI): Shared OpenAI client.
+        model (str): Chat model name, e.g. "gpt-4o-mini".
+        history (callable): Returns the conversation so far as Gemini-style
+            contents ({"role": "user"/"model", "parts": [...]}), or None.
+        system_prompt (str): Optional system message.
+        timeout (float): Per-request HTTP timeout in seconds.
+
+    Returns:
+        callable: (text, cancel_event) -> iterator of text pieces.
+    """
+    # Hedging replaces the client's own retries, which would only add delay here
+    client = client.with_options(max_retries=0)
+
+    def run(text, cancel_event):
+        messages = [{"role": "system", "content": system_prompt}] if system_prompt else []
+        for content in (history() if history is not None else []):
+            role = "assistant" if content["role"] == "model" else "user"
+            messages.append({"role": role, "content": " ".join(content["parts"])})
+        messages.append({"role": "user", "content": text})
+        kwargs = {"timeout": timeout} if timeout is not None else {}
+        stream = client.chat.completions.create(model=model, messages=messages, stream=True, **kwargs)
+        try:
+            for chunk in stream:
+                if cancel_event.is_set():
+                    return
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()  # frees the connection of a cancelled request
+    return run
+
+
+# ------------------- Dispatcher -------------------
+
+class _Attempt:
+    """One backend request, read on its own thread into a queue."""
+
+    _DONE = object()
+
+    def __init__(self, name, backend, text, events):
+        self.name = name
+        self.cancel_event = threading.Event()
+        self.started_at = time.monotonic()
+        self.first_at = None
+        self.error = None
+        self.pieces = queue.Queue()
+        self._events = events
+        threading.Thread(target=self._run, args=(backend, text), name=f"llm-{name}", daemon=True).start()
+
+    def _run(self, backend, text):
+        try:
+            for piece in backend(text, self.cancel_event):
+                if self.cancel_event.is_set():
+                    break
+                if not piece:
+                    continue
+                if self.first_at is None:
+                    self.first_at = time.monotonic()
+                    self._events.put(("first", self))
+                self.pieces.put(piece)
+            if self.first_at is None and not self.cancel_event.is_set():
+                # e.g. a Gemini answer blocked by the safety filters
+                raise LLMUnavailable(f"{self.name} returned no text")
+        except Exception as e:
+            self.error = e
+            if self.first_at is None:
+                self._events.put(("failed", self))
+        finally:
+            self.pieces.put(self._DONE)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+
+class HedgedDispatcher:
+    """
+    Races a primary and a fallback LLM backend with a latency-based hedge.
+    """
+
+    def __init__(self, backends, hedge_percentile=90, initial_hedge_s=2.0, min_hedge_s=0.5,
+                 max_hedge_s=4.0, first_output_deadline_s=10.0, stall_timeout_s=10.0,
+                 window=50, min_samples=5):
+        """
+        Args:
+            backends (list): (name, backend) pairs, primary first.
+            hedge_percentile (float): Percentile of the primary's recent time to
+                first text used as the hedge threshold.
+            initial_hedge_s (float): Threshold until `min_samples` are known.
+            min_hedge_s (float): Lower bound of the threshold.
+            max_hedge_s (float): Upper bound of the threshold.
+            first_output_deadline_s (float): Give up if no backend produced text by then.
+            stall_timeout_s (float): Give up if the winning answer stops for this long.
+            window (int): Number of recent primary latencies kept.
+            min_samples (int): Latencies needed before the percentile is used.
+        """
+        self.backends = list(backends)
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_s = initial_hedge_s
+        self.min_hedge_s = min_hedge_s
+        self.max_hedge_s = max_hedge_s
+        self.first_output_deadline_s = first_output_deadline_s
+        self.stall_timeout_s = stall_timeout_s
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        # Stats
+        self.requests = 0
+        self.hedges = 0
+        self.wins = {name: 0 for name, _ in self.backends}
+        self.errors = {name: 0 for name, _ in self.backends}
+        self.unavailable = 0
+        self.first_output_times = []
+
+    def hedge_threshold(self):
+        """
+        Returns:
+            float: Seconds to wait for the primary before asking the next backend.
+        """
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.min_samples:
+            threshold = self.initial_hedge_s
+        else:
+            index = min(len(samples) - 1, int(len(samples) * self.hedge_percentile / 100))
+            threshold = samples[index]
+        return min(self.max_hedge_s, max(self.min_hedge_s, threshold))
+
+    def stream(self, text):
+        """
+        Streams the answer of whichever backend starts first.
+
+        Args:
+            text (str): The question.
+
+        Yields:
+            str: Text pieces of the winning answer.
+
+        Raises:
+            LLMUnavailable: No backend answered before the deadline.
+        """
+        with self._lock:
+            self.requests += 1
+        winner = self._race(text)
+        try:
+            while True:
+                try:
+                    piece = winner.pieces.get(timeout=self.stall_timeout_s)
+                except queue.Empty:
+                    winner.cancel()
+                    raise LLMUnavailable(f"{winner.name} stalled for {self.stall_timeout_s:g}s")
+                if piece is _Attempt._DONE:
+                    break
+                yield piece
+            if winner.error is not None:
+                # Failed after it started answering: keep what was said
+                print(f"⚠️ {winner.name} failed mid-answer: {winner.error}")
+                with self._lock:
+                    self.errors[winner.name] += 1
+        finally:
+            winner.cancel()
+
+    def ask(self, text):
+        """
+        Returns the complete answer of whichever backend starts first.
+
+        Raises:
+            LLMUnavailable: No backend answered before the deadline.
+        """
+        return "".join(self.stream(text))
+
+    def _race(self, text):
+        events = queue.Queue()
+        started = time.monotonic()
+        deadline = started + self.first_output_deadline_s
+        pending = list(self.backends)
+        attempts = []
+
+        def launch():
+            name, backend = pending.pop(0)
+            attempts.append(_Attempt(name, backend, text, events))
+
+        launch()
+        hedge_at = started + self.hedge_threshold()
+        while True:
+            now = time.monotonic()
+            live = [a for a in attempts if a.error is None]
+            if not live and not pending:
+                break
+            if pending and (not live or now >= hedge_at):
+                if live:
+                    print(f"🔀 {attempts[0].name} slow after {now - started:.1f}s, also asking {pending[0][0]}")
+                    with self._lock:
+                        self.hedges += 1
+                launch()
+                continue
+            wait_until = min(deadline, hedge_at) if pending else deadline
+            try:
+                kind, attempt = events.get(timeout=max(0.0, wait_until - now))
+            except queue.Empty:
+                if time.monotonic() >= deadline:
+                    break
+                continue
+            if kind == "failed":
+                print(f"⚠️ {attempt.name} failed: {attempt.error}")
+                with self._lock:
+                    self.errors[attempt.name] += 1
+                continue
+            # First text wins; the others are cancelled
+            for other in attempts:
+                if other is not attempt:
+                    other.cancel()
+            self._record(attempts[0], attempt, started)
+            return attempt
+
+        for attempt in attempts:
+            attempt.cancel()
+        with self._lock:
+            self.unavailable += 1
+        raise LLMUnavailable(f"no answer within {self.first_output_deadline_s:g}s")
+
+    def _record(self, primary, winner, started):
+        with self._lock:
+            self.wins[winner.name] += 1
+            self.first_output_times.append(winner.first_at - started)
+            if primary.first_at is not None:
+                self._latencies.append(primary.first_at - primary.started_at)
+            elif winner is not primary:
+                # The primary lost: count it as at least as slow as it has been so far
+                self._latencies.append(winner.first_at - primary.started_at)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Requests, hedges fired, wins and errors per backend, requests
+            with no answer, current hedge threshold, and median/p90/max time to
+            first text in ms.
+        """
+        with self._lock:
+            times = sorted(self.first_output_times)
+            stats = {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "wins": dict(self.wins),
+                "errors": dict(self.errors),
+                "unavailable": self.unavailable,
+            }
+        stats["hedge_threshold_s"] = self.hedge_threshold()
+        if times:
+            stats["p50_ms"] = 1000 * times[len(times) // 2]
+            stats["p90_ms"] = 1000 * times[min(len(times) - 1, int(len(times) * 0.9))]
+            stats["max_ms"] = 1000 * times[-1]
+        return stats
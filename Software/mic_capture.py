@@ -0,0 +1,256 @@
+"""
+Always-on microphone capture for Emma Robot
+
+One long-lived thread owns the PyAudio input stream and writes into a fixed-size
+ring buffer. Listeners read from the buffer through their own cursor, so the
+device is opened once at startup instead of on every turn, and a listener can
+start a little in the past ("pre-roll") to keep the first syllables.
+"""
+
+import threading
+import time
+
+SAMPLE_WIDTH = 2  # bytes per sample (paInt16)
+
+
+# ------------------- Ring Buffer -------------------
+
+class AudioRingBuffer:
+    """
+    Fixed-size byte ring buffer addressed by absolute stream position.
+
+    Positions count every byte ever written, so a reader can tell whether the
+    data it wants is still available or has already been overwritten.
+    """
+
+    def __init__(self, capacity):
+        """
+        Args:
+            capacity (int): Buffer size in bytes.
+        """
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._write_pos = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def write_pos(self):
+        """Absolute position of the next byte to be written."""
+        with self._cond:
+            return self._write_pos
+
+    @property
+    def oldest_pos(self):
+        """Absolute position of the oldest byte still in the buffer."""
+        with self._cond:
+            return max(0, self._write_pos - self.capacity)
+
+    def write(self, data):
+        """Appends audio, overwriting the oldest data when full."""
+        skipped = max(0, len(data) - self.capacity)
+        data = data[skipped:]
+        with self._cond:
+            self._write_pos += skipped
+            start = self._write_pos % self.capacity
+            first = min(len(data), self.capacity - start)
+            self._buffer[start:start + first] = data[:first]
+            self._buffer[:len(data) - first] = data[first:]
+            self._write_pos += len(data)
+            self._cond.notify_all()
+
+    def close(self):
+        """Wakes up all waiting readers; no more data will arrive."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def read(self, pos, max_bytes, timeout=None):
+        """
+        Reads data starting at an absolute position.
+
+        Blocks until at least one byte past `pos` is available.
+
+        Args:
+            pos (int): Absolute position to read from.
+            max_bytes (int): Max bytes to return.
+            timeout (float): Max seconds to wait (None waits forever).
+
+        Returns:
+            tuple: (data, start_pos). `start_pos` is later than `pos` if the
+            requested data had already been overwritten. `data` is empty on
+            timeout or once the buffer is closed.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._write_pos > pos or self._closed, timeout):
+                return b"", pos
+            pos = max(pos, self._write_pos - self.capacity)
+            size = min(max_bytes, self._write_pos - pos)
+            start = pos % self.capacity
+            first = min(size, self.capacity - start)
+            data = bytes(self._buffer[start:start + first]) + bytes(self._buffer[:size - first])
+            return data, pos
+
+
+# ------------------- Capture Thread -------------------
+
+class CaptureReader:
+    """
+    A listener's cursor into the shared capture buffer.
+    """
+
+    def __init__(self, ring, pos, chunk_bytes, bytes_per_second=None, bytes_per_frame=SAMPLE_WIDTH):
+        self._ring = ring
+        self.pos = pos
+        self.chunk_bytes = chunk_bytes
+        self.bytes_per_second = bytes_per_second
+        self.bytes_per_frame = bytes_per_frame
+        self.dropped_bytes = 0  # audio lost because the reader fell behind
+        self.muted_bytes = 0
+        self._mutes = []  # (start_pos, end_pos) ranges replaced by silence
+
+    def mute(self, start_pos, end_pos):
+        """
+        Replaces the audio between two absolute positions with silence, e.g. so
+        a cue sound played through the speaker is not recognized as speech.
+        """
+        start_pos -= start_pos % self.bytes_per_frame
+        end_pos += -end_pos % self.bytes_per_frame
+        if end_pos > start_pos:
+            self._mutes.append((start_pos, end_pos))
+
+    def mute_for(self, seconds, margin=0.1):
+        """
+        Silences the next `seconds` (+ `margin` for output latency) of audio, starting now.
+
+        Args:
+            seconds (float): Length of the sound being played.
+            margin (float): Extra time for device latency and room echo.
+        """
+        start = self._ring.write_pos
+        self.mute(start, start + int((seconds + margin) * self.bytes_per_second))
+
+    def read(self, timeout=None):
+        """
+        Returns the next chunk of audio (up to `chunk_bytes`).
+
+        Args:
+            timeout (float): Max seconds to wait for new audio.
+
+        Returns:
+            bytes: Audio data, or b"" on timeout / after the capture stopped.
+        """
+        data, start = self._ring.read(self.pos, self.chunk_bytes, timeout)
+        self.dropped_bytes += start - self.pos
+        self.pos = start + len(data)
+        if self._mutes and data:
+            data = self._apply_mutes(data, start)
+        return data
+
+    def _apply_mutes(self, data, start):
+        end = start + len(data)
+        data = bytearray(data)
+        for mute_start, mute_end in self._mutes:
+            lo, hi = max(start, mute_start), min(end, mute_end)
+            if lo < hi:
+                data[lo - start:hi - start] = bytes(hi - lo)
+                self.muted_bytes += hi - lo
+        self._mutes = [(s, e) for s, e in self._mutes if e > end]
+        return bytes(data)
+
+
+class MicrophoneCapture:
+    """
+    Owns the microphone stream for the whole session.
+    """
+
+    def __init__(self, rate, channels=1, chunk_size=2048, buffer_seconds=10.0):
+        """
+        Args:
+            rate (int): Sample rate in Hz.
+            channels (int): Number of input channels.
+            chunk_size (int): Frames per device read.
+            buffer_seconds (float): How much audio the ring buffer keeps.
+        """
+        self.rate = rate
+        self.channels = channels
+        self.chunk_size = chunk_size
+        self.bytes_per_frame = SAMPLE_WIDTH * channels
+        self.bytes_per_second = rate * self.bytes_per_frame
+        self.ring = AudioRingBuffer(int(buffer_seconds * rate) * self.bytes_per_frame)
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Opens the microphone and starts the capture thread.
+
+        Raises:
+            Exception: Whatever PyAudio raised if the device could not be opened
+                (readers then get b"" instead of waiting forever).
+        """
+        if self._thread is not None:
+            return
+        mic = None
+        try:
+            import pyaudio
+            mic = pyaudio.PyAudio()
+            stream = mic.open(
+                format=pyaudio.paInt16,
+                channels=self.channels,
+                rate=self.rate,
+                input=True,
+                frames_per_buffer=self.chunk_size
+            )
+        except Exception:
+            self.ring.close()
+            if mic is not None:
+                mic.terminate()
+            raise
+        self._thread = threading.Thread(target=self._run, args=(mic, stream), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the capture thread and releases the microphone."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reader(self, pre_roll_ms=0, start_pos=None):
+        """
+        Creates a cursor starting `pre_roll_ms` before now.
+
+        Args:
+            pre_roll_ms (int): Audio from just before the call to include.
+            start_pos (int): Absolute position to start from instead (e.g. where
+                the user started talking over Emma).
+
+        Returns:
+            CaptureReader: Cursor yielding chunks of `chunk_size` frames.
+        """
+        if start_pos is None:
+            start_pos = self.ring.write_pos - int(self.rate * pre_roll_ms / 1000) * self.bytes_per_frame
+        pos = max(start_pos, self.ring.oldest_pos)
+        pos -= pos % self.bytes_per_frame
+        return CaptureReader(self.ring, pos, self.chunk_size * self.bytes_per_frame,
+                             self.bytes_per_second, self.bytes_per_frame)
+
+    def _run(self, mic, stream):
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    data = stream.read(self.chunk_size, exception_on_overflow=False)
+                except Exception:
+                    time.sleep(0.01)
+                    continue
+                if data:
+                    self.ring.write(data)
+        finally:
+            self.ring.close()
+            try:
+                stream.stop_stream()
+            except Exception:
+                pass
+            stream.close()
+            mic.terminate()
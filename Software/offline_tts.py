@@ -0,0 +1,317 @@
+"""
+Offline text-to-speech service for Emma Robot
+One pyttsx3 engine lives in a worker process for the whole session, so the
+engine is initialized and the voice chosen once instead of on every call.
+Sentences are sent to the worker in order and come back as WAV audio (AIFF on
+macOS) instead of being spoken by the engine, so the caller does not block in
+runAndWait(): the audio can be cached, rendered ahead while the previous
+sentence plays (SpeechPipeline) and played through the shared PlaybackEngine.
+
+The worker is this file run as a script (not multiprocessing), so the scripts
+that use it are not imported again in the child. Requests and replies are
+JSON lines on the worker's stdin/stdout.
+"""
+
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+AUDIO_FORMAT = "aiff" if sys.platform == "darwin" else "wav"  # what pyttsx3's save_to_file writes
+
+
+class OfflineTTSError(Exception):
+    """Raised when the worker could not render a sentence."""
+
+
+# ------------------- Worker Process -------------------
+
+def choose_voice(voices, voice=None):
+    """
+    Picks a voice: by id or name if given, else a female English voice, else
+    any English voice.
+
+    Args:
+        voices (list): pyttsx3 voice objects (with `id` and `name`).
+        voice (str): Voice id or name (substring, case-insensitive), or None.
+
+    Returns:
+        Voice object, or None to keep the engine's default.
+    """
+    if voice:
+        wanted = voice.lower()
+        return next((v for v in voices if wanted == v.id.lower() or wanted in (v.name or "").lower()), None)
+    english = [v for v in voices if 'en' in v.id.lower() or 'english' in (v.name or "").lower()]
+    female = [v for v in english if 'female' in (v.name or "").lower() or 'woman' in (v.name or "").lower()]
+    return (female or english or [None])[0]
+
+
+def serve(requests, replies, engine):
+    """
+    Renders requests until stdin closes (runs in the worker process).
+
+    Args:
+        requests (file): JSON lines {"id", "text", "path"}.
+        replies (file): JSON lines {"id"} or {"id", "error"} are written here.
+        engine: Initialized pyttsx3 engine.
+    """
+    for line in requests:
+        request = json.loads(line)
+        try:
+            engine.save_to_file(request["text"], request["path"])
+            engine.runAndWait()
+            reply = {"id": request["id"]}
+        except Exception as e:
+            reply = {"id": request["id"], "error": str(e)}
+        replies.write(json.dumps(reply) + "\n")
+        replies.flush()
+
+
+def _worker_main(settings):
+    # Keep stdout for replies; whatever the speech driver prints goes to stderr
+    replies = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    import pyttsx3
+    engine = pyttsx3.init()
+    engine.setProperty('rate', settings["rate"])
+    engine.setProperty('volume', settings["volume"])
+    voice = choose_voice(engine.getProperty('voices'), settings.get("voice"))
+    if voice is not None:
+        engine.setProperty('voice', voice.id)
+    replies.write(json.dumps({"ready": True, "voice": voice.name if voice is not None else "default"}) + "\n")
+    replies.flush()
+    serve(sys.stdin, replies, engine)
+
+
+# ------------------- Client -------------------
+
+class OfflineTTS:
+    """
+    Renders text to audio with a long-lived pyttsx3 worker process.
+    """
+
+    def __init__(self, rate=170, volume=1.0, voice=None, cache=None, command=None, start_timeout=10.0):
+        """
+        Args:
+            rate (int): Speech rate in words per minute.
+            volume (float): Volume (0.0 to 1.0).
+            voice (str): Voice id or name; None prefers a female English voice.
+            cache (TTSCache): Optional audio cache (engine "pyttsx3").
+            command (list): Worker command line (default: this file run with the
+                current Python interpreter). The settings are passed as JSON.
+            start_timeout (float): Seconds to wait for the worker to be ready.
+        """
+        self.settings = {"rate": rate, "volume": volume, "voice": voice}
+        self.cache = cache
+        self.command = command or [sys.executable, os.path.abspath(__file__)]
+        self.start_timeout = start_timeout
+        self.audio_format = AUDIO_FORMAT
+        self.voice = None
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._pending = {}  # request id -> (Future, path, submitted at, worker process)
+        self._process = None
+        self._ready = None
+        self._dir = tempfile.mkdtemp(prefix="emma_tts_")
+        # Stats
+        self.requests = 0
+        self.cache_hits = 0
+        self.restarts = 0
+        self.render_times = []
+        self.start()
+
+    # ------------------- Worker -------------------
+
+    def start(self):
+        """Starts the worker process (again) and waits until its engine is ready."""
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                return
+            if self._process is not None:
+                self.restarts += 1
+            self._ready = threading.Event()
+            self._process = subprocess.Popen(self.command + [json.dumps(self.settings)], stdin=subprocess.PIPE,
+                                             stdout=subprocess.PIPE, text=True, bufsize=1)
+            process, ready = self._process, self._ready
+        threading.Thread(target=self._read_replies, args=(process, ready), name="offline-tts-replies",
+                         daemon=True).start()
+        if not ready.wait(self.start_timeout) or process.poll() is not None:
+            process.kill()
+            raise OfflineTTSError("offline TTS worker did not start")
+        print(f"✅ Offline TTS worker ready (voice: {self.voice})")
+
+    def _read_replies(self, process, ready):
+        for line in process.stdout:
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                continue
+            if reply.get("ready"):
+                self.voice = reply.get("voice")
+                ready.set()
+                continue
+            with self._lock:
+                future, path, submitted, _ = self._pending.pop(reply["id"], (None, None, None, None))
+            if future is None:
+                continue
+            try:
+                if "error" in reply:
+                    raise OfflineTTSError(reply["error"])
+                with open(path, "rb") as f:
+                    audio = f.read()
+                if not audio:
+                    raise OfflineTTSError("the engine rendered no audio")
+            except Exception as e:
+                future.set_exception(e if isinstance(e, OfflineTTSError) else OfflineTTSError(str(e)))
+            else:
+                with self._lock:
+                    self.render_times.append(time.monotonic() - submitted)
+                future.set_result(audio)
+            finally:
+                if os.path.exists(path):
+                    os.remove(path)
+        # The worker exited: fail what it had not finished. Reaped before waking start(),
+        # so start() sees poll() is not None and does not report a dead worker as ready
+        process.wait()
+        ready.set()
+        with self._lock:
+            lost = [request_id for request_id, entry in self._pending.items() if entry[3] is process]
+            failed = [self._pending.pop(request_id)[0] for request_id in lost]
+        for future in failed:
+            future.set_exception(OfflineTTSError("offline TTS worker exited"))
+
+    # ------------------- Rendering -------------------
+
+    def submit(self, text):
+        """
+        Queues a sentence for rendering and returns immediately.
+
+        Args:
+            text (str): Text to speak.
+
+        Returns:
+            Future: Resolves to the audio bytes (format `audio_format`).
+        """
+        future = Future()
+        with self._lock:
+            self.requests += 1
+        key = None
+        if self.cache is not None:
+            key = self.cache.key("pyttsx3", "system", self._voice_key(), text, self.audio_format)
+            audio = self.cache.get(key)
+            if audio is not None:
+                with self._lock:
+                    self.cache_hits += 1
+                future.set_result(audio)
+                return future
+            future.add_done_callback(lambda done: done.exception() is None and self.cache.put(key, done.result()))
+        request_id = next(self._ids)
+        path = os.path.join(self._dir, f"{request_id}.{self.audio_format}")
+        while True:
+            # Registered only while the worker is alive, so its exit handler fails it if it dies
+            with self._lock:
+                process = self._process
+                if process is not None and process.poll() is None:
+                    self._pending[request_id] = (future, path, time.monotonic(), process)
+                    break
+            print("⚠️ Offline TTS worker is not running, restarting it")
+            self.start()
+        try:
+            process.stdin.write(json.dumps({"id": request_id, "text": text, "path": path}) + "\n")
+            process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            future.set_exception(OfflineTTSError(f"offline TTS worker unavailable: {e}"))
+        return future
+
+    def render(self, text, timeout=30.0):
+        """
+        Renders a sentence and waits for the audio.
+
+        Args:
+            text (str): Text to speak.
+            timeout (float): Seconds to wait.
+
+        Returns:
+            bytes: Audio (format `audio_format`), e.g. for PlaybackEngine.play.
+        """
+        return self.submit(text).result(timeout)
+
+    def speak(self, text, playback, timeout=30.0, cancel_event=None):
+        """
+        Speaks text sentence by sentence; each sentence is rendered while the
+        previous one plays. Like the pyttsx3 call it replaces, this blocks until
+        the last sentence has finished playing (or playback was cut off); use
+        submit() and PlaybackEngine.play directly to play without waiting.
+
+        Args:
+            text (str): Text to speak.
+            playback (PlaybackEngine): Shared output device.
+            timeout (float): Seconds to wait for each sentence.
+            cancel_event (threading.Event): Optional; when set, no further
+                sentence is started.
+
+        Returns:
+            float: Seconds until the first sentence started playing, or None if
+            nothing was played (empty text or cut off).
+        """
+        from Software.speech_pipeline import SentenceSegmenter
+        started = time.monotonic()
+        segmenter = SentenceSegmenter()
+        sentences = segmenter.feed(text) + [segmenter.flush()]
+        renders = [self.submit(sentence) for sentence in sentences if sentence]
+        first_audio = None
+        for render in renders:
+            audio = render.result(timeout)
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            handle = playback.play(audio, self.audio_format)
+            if first_audio is None:
+                first_audio = time.monotonic() - started
+            handle.wait()
+            if handle.cancelled:
+                break  # e.g. barge-in; the remaining renders are simply dropped
+        return first_audio
+
+    def _voice_key(self):
+        settings = self.settings
+        return f"{self.voice or settings['voice'] or 'default'}@{settings['rate']}/{settings['volume']}"
+
+    def close(self):
+        """Stops the worker process and removes its temporary files."""
+        with self._lock:
+            process, self._process = self._process, None
+        if process is not None:
+            try:
+                process.stdin.close()
+                process.wait(timeout=5)
+            except Exception:
+                process.kill()
+        for name in os.listdir(self._dir):
+            os.remove(os.path.join(self._dir, name))
+        os.rmdir(self._dir)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Requests, cache hits, worker restarts and mean/max render time in ms.
+        """
+        with self._lock:
+            times = list(self.render_times)
+            return {
+                "requests": self.requests,
+                "cache_hits": self.cache_hits,
+                "restarts": self.restarts,
+                "mean_render_ms": 1000 * sum(times) / len(times) if times else 0.0,
+                "max_render_ms": 1000 * max(times) if times else 0.0,
+            }
+
+
+if __name__ == "__main__":
+    _worker_main(json.loads(sys.argv[1]))
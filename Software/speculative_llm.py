@@ -0,0 +1,213 @@
+"""
+Speculative LLM dispatch for Emma Robot
+Vosk's partial transcript usually stops changing a little before the final
+result arrives. Once it has been stable for a few chunks, the Gemini request is
+started early. If the final transcript matches (after normalization), the
+early response is used; otherwise it is cancelled and the request is reissued.
+
+    speculator = SpeculativeDispatcher(start_request)
+    ...in the listen loop:  speculator.observe(partial_text)
+    ...after the final:      handle = speculator.finalize(final_text)
+"""
+
+import queue
+import threading
+import time
+
+from Software.transcripts import normalize_transcript
+
+
+# ------------------- Prefetched Stream -------------------
+
+class PrefetchedStream:
+    """
+    Consumes a streaming response on a background thread so it can be started
+    before anyone reads it. Iterating yields the chunks received so far, then
+    the rest as they arrive.
+    """
+
+    _DONE = object()
+
+    def __init__(self, make_stream):
+        """
+        Args:
+            make_stream (callable): () -> iterable of chunks, e.g. a Gemini text stream.
+        """
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(make_stream,), daemon=True)
+        self._thread.start()
+
+    def _run(self, make_stream):
+        try:
+            for chunk in make_stream():
+                if self._cancel.is_set():
+                    break
+                self._queue.put(chunk)
+        except Exception as e:
+            self._queue.put(e)
+        finally:
+            self._queue.put(self._DONE)
+
+    def cancel(self):
+        """Stops reading the stream at the next chunk."""
+        self._cancel.set()
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+class _Call:
+    """Runs a blocking request on its own thread; result() waits for it."""
+
+    def __init__(self, fn, text):
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+        threading.Thread(target=self._run, args=(fn, text), daemon=True).start()
+
+    def _run(self, fn, text):
+        try:
+            self._result = fn(text)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done.set()
+
+    def result(self, timeout=None):
+        if not self._done.wait(timeout):
+            raise TimeoutError("request still running")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+def background_call(fn):
+    """
+    Wraps a blocking text -> result function (e.g. a non-streaming Gemini call)
+    as a speculative request starter.
+
+    Returns:
+        callable: text -> handle with result(timeout=None).
+    """
+    return lambda text: _Call(fn, text)
+
+
+# ------------------- Speculative Dispatcher -------------------
+
+class SpeculativeDispatcher:
+    """
+    Starts requests from stable partial transcripts and reconciles them with the
+    final transcript.
+    """
+
+    def __init__(self, start_request, stable_frames=3, min_words=3, clock=time.monotonic):
+        """
+        Args:
+            start_request (callable): text -> handle. Must return right away; the
+                handle may have cancel(). Use PrefetchedStream or background_call.
+            stable_frames (int): Identical partials in a row before speculating.
+            min_words (int): Shortest partial worth speculating on.
+            clock (callable): Monotonic clock in seconds.
+        """
+        self.start_request = start_request
+        self.stable_frames = stable_frames
+        self.min_words = min_words
+        self.clock = clock
+        self.turns = 0
+        self.hits = 0
+        self.speculations = 0
+        self.saved_seconds = 0.0
+        self._speculation = None  # (normalized text, started at, handle)
+        self.reset()
+
+    def reset(self):
+        """Starts a new turn; a speculation still running is cancelled."""
+        self.discard()
+        self._last_partial = None
+        self._stable_count = 0
+
+    def discard(self):
+        """Cancels the running speculation (e.g. the utterance was a command)."""
+        speculation, self._speculation = self._speculation, None
+        if speculation is not None:
+            _cancel(speculation[2])
+
+    def observe(self, partial_text):
+        """
+        Feeds the latest partial transcript (one call per audio chunk).
+
+        Args:
+            partial_text (str): Text of recognizer.PartialResult().
+        """
+        partial = normalize_transcript(partial_text)
+        if partial != self._last_partial:
+            self._last_partial = partial
+            self._stable_count = 1
+            return
+        self._stable_count += 1
+        if self._stable_count < self.stable_frames or len(partial.split()) < self.min_words:
+            return
+        if self._speculation is not None and self._speculation[0] == partial:
+            return
+        # Stable and different from what is already running: (re)speculate
+        self.discard()
+        self._speculation = (partial, self.clock(), self.start_request(partial_text))
+        self.speculations += 1
+
+    def finalize(self, final_text):
+        """
+        Returns the request handle for the final transcript, reusing the
+        speculative one when the texts match.
+
+        Args:
+            final_text (str): Final transcript.
+
+        Returns:
+            tuple: (handle, hit, saved_seconds).
+        """
+        self.turns += 1
+        now = self.clock()
+        speculation, self._speculation = self._speculation, None
+        self._last_partial, self._stable_count = None, 0
+        if speculation is not None and speculation[0] == normalize_transcript(final_text):
+            saved = now - speculation[1]
+            self.hits += 1
+            self.saved_seconds += saved
+            print(f"⚡ Speculative hit: request started {saved * 1000:.0f} ms before the final transcript "
+                  f"(hit rate {self.hit_rate():.0%})")
+            return speculation[2], True, saved
+        if speculation is not None:
+            _cancel(speculation[2])
+            print(f"↩️ Speculative miss: '{speculation[0]}' != '{normalize_transcript(final_text)}', reissuing "
+                  f"(hit rate {self.hit_rate():.0%})")
+        return self.start_request(final_text), False, 0.0
+
+    def hit_rate(self):
+        """Share of finalized turns served by a speculative request."""
+        return self.hits / self.turns if self.turns else 0.0
+
+    def stats(self):
+        """
+        Returns:
+            dict: Turns, speculations started, hits, hit rate and average ms saved per hit.
+        """
+        return {
+            "turns": self.turns,
+            "speculations": self.speculations,
+            "hits": self.hits,
+            "hit_rate": self.hit_rate(),
+            "avg_saved_ms": 1000 * self.saved_seconds / self.hits if self.hits else 0.0,
+        }
+
+
+def _cancel(handle):
+    cancel = getattr(handle, "cancel", None)
+    if cancel is not None:
+        cancel()
@@ -0,0 +1,228 @@
+"""
+Sentence-pipelined think -> speak for Emma Robot
+
+Instead of waiting for the full Gemini answer, then synthesizing all of it, then
+playing it, the answer is streamed, cut into sentences as they arrive, and each
+sentence is synthesized and played in order:
+
+    Gemini stream -> sentences -> TTS -> playback
+    (sentence 3)     (sentence 2)        (sentence 1)
+
+so Emma starts talking after roughly the first sentence instead of the whole answer.
+"""
+
+import queue
+import re
+import threading
+
+# Words ending in "." that do not end a sentence
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "approx"}
+# Abbreviations only when a number follows ("No. 5"), otherwise ordinary words ("The answer is no.")
+NUMBER_ABBREVIATIONS = {"no"}
+
+# Sentence end: punctuation (optionally closed by quotes/brackets) followed by whitespace
+_SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+
+_DONE = object()  # queue sentinel
+
+
+# ------------------- Sentence Segmenter -------------------
+
+class SentenceSegmenter:
+    """
+    Incrementally cuts streamed text into complete sentences.
+    """
+
+    def __init__(self, min_chars=20):
+        """
+        Args:
+            min_chars (int): Sentences shorter than this are joined with the next
+                one, so "Sure." does not become its own TTS request.
+        """
+        self.min_chars = min_chars
+        self._pending = ""
+
+    def feed(self, text):
+        """
+        Adds streamed text.
+
+        Args:
+            text (str): Next piece of the streamed answer.
+
+        Returns:
+            list: Sentences completed by this piece (may be empty).
+        """
+        self._pending += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._pending):
+            candidate = self._pending[start:match.end()].strip()
+            last_word = candidate.rstrip('.!?"\')]').rsplit(None, 1)[-1].lower() if candidate else ""
+            if candidate.endswith(".") and last_word in ABBREVIATIONS:
+                continue
+            if candidate.endswith(".") and last_word in NUMBER_ABBREVIATIONS:
+                following = self._pending[match.end():match.end() + 1]
+                if not following:
+                    break  # decided by the next piece
+                if following.isdigit():
+                    continue
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._pending = self._pending[start:]
+        return sentences
+
+    def flush(self):
+        """
+        Returns:
+            str: Whatever text is left once the stream ends ("" if nothing).
+        """
+        rest = self._pending.strip()
+        self._pending = ""
+        return rest
+
+
+# ------------------- Gemini Streaming -------------------
+
+def stream_gemini_text(model, prompt):
+    """
+    Streams a Gemini answer as text pieces.
+
+    Args:
+        model (genai.GenerativeModel): Gemini model.
+        prompt (str): Input text.
+
+    Yields:
+        str: Text pieces in the order they arrive.
+    """
+    for chunk in model.generate_content(prompt, stream=True):
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunk without text (e.g. safety metadata only)
+            continue
+        if text:
+            yield text
+
+
+# ------------------- Pipeline -------------------
+
+class SpeechPipeline:
+    """
+    Runs generation, synthesis and playback as three overlapping stages.
+
+    Generation and synthesis run on background threads; playback runs on the
+    caller's thread in `play_all`, so the caller can do other work (gestures)
+    between `start` and `play_all`.
+    """
+
+    def __init__(self, synthesize, play, segmenter=None, max_pending=4):
+        """
+        Args:
+            synthesize (callable): sentence (str) -> audio, e.g. openai_text_to_speech.
+            play (callable): audio -> None, blocks until the audio finished playing.
+            segmenter (SentenceSegmenter): Optional custom segmenter.
+            max_pending (int): Max sentences synthesized ahead of playback.
+        """
+        self.synthesize = synthesize
+        self.play = play
+        self.segmenter = segmenter or SentenceSegmenter()
+        self.cancel_event = threading.Event()
+        self.sentences = []  # every sentence sent to synthesis
+        self.played = []     # sentences that started playing (what Emma actually said)
+        self._text_queue = queue.Queue()
+        self._audio_queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._threads = []
+
+    def start(self, text_chunks):
+        """
+        Starts generation and synthesis in the background.
+
+        Args:
+            text_chunks (iterable of str): Streamed answer, e.g. from stream_gemini_text.
+        """
+        self._threads = [
+            threading.Thread(target=self._generate, args=(text_chunks,), daemon=True),
+            threading.Thread(target=self._synthesize, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def play_all(self):
+        """
+        Plays sentences in order as they become ready. Blocks until done, or
+        returns right away once cancelled (the background threads then finish
+        on their own when the stream does).
+
+        Returns:
+            str: The sentences that were played (the full answer unless cancelled).
+        """
+        while True:
+            try:
+                item = self._audio_queue.get(timeout=0.05)
+            except queue.Empty:
+                item = None
+            if self.cancel_event.is_set():
+                break
+            if item is _DONE:
+                for thread in self._threads:
+                    thread.join()
+                break
+            if item is not None:
+                sentence, audio = item
+                print(f"Emma says: {sentence}")
+                self.played.append(sentence)
+                self.play(audio)
+        if self._error is not None:
+            raise self._error
+        return " ".join(self.played)
+
+    def cancel(self):
+        """Stops generation and drops sentences not yet played."""
+        self.cancel_event.set()
+
+    def _generate(self, text_chunks):
+        try:
+            for piece in text_chunks:
+                if self.cancel_event.is_set():
+                    break
+                for sentence in self.segmenter.feed(piece):
+                    self._text_queue.put(sentence)
+            rest = self.segmenter.flush()
+            if rest and not self.cancel_event.is_set():
+                self._text_queue.put(rest)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._text_queue.put(_DONE)
+
+    def _synthesize(self):
+        try:
+            while True:
+                sentence = self._text_queue.get()
+                if sentence is _DONE:
+                    break
+                if self.cancel_event.is_set() or self._error is not None:
+                    continue
+                self.sentences.append(sentence)
+                self._put_audio((sentence, self.synthesize(sentence)))
+        except Exception as e:
+            self._error = e
+            self.cancel_event.set()
+            # Unblock the generator so it can finish
+            while self._text_queue.get() is not _DONE:
+                pass
+        finally:
+            self._put_audio(_DONE)
+
+    def _put_audio(self, item):
+        # Nobody reads the queue after a cancel, so a full queue must not block forever
+        while True:
+            try:
+                self._audio_queue.put(item, timeout=0.05)
+                return
+            except queue.Full:
+                if self.cancel_event.is_set():
+                    return
@@ -0,0 +1,269 @@
+"""
+Hybrid speech recognition for Emma Robot
+The same captured utterance goes to Vosk (offline, fast) and to Google
+(online, usually more accurate) at the same time: Google gets the captured
+audio while Vosk finishes decoding it. The first transcript whose
+confidence clears a threshold is used, unless a preferred engine is still
+working and answers within a short grace window. When Google cannot be
+reached it is skipped for a while and Emma keeps going on Vosk alone.
+
+Engines are plain functions pcm -> (text, confidence); `google_engine` builds
+one for Google. Vosk already heard the utterance while listening, so it takes
+part through a decoder (`vosk_decoder`) that finishes that recognizer. Wins and latencies are
+kept per engine so the threshold and the preference can be tuned.
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import namedtuple
+
+STTResult = namedtuple("STTResult", ["engine", "text", "confidence", "latency_s"])
+
+
+class EngineOffline(Exception):
+    """Raised by an engine that cannot reach its service (e.g. no network)."""
+
+
+# ------------------- Engines -------------------
+
+def vosk_confidence(result):
+    """
+    Mean word confidence of a Vosk result (needs SetWords(True)).
+
+    Args:
+        result (dict): Parsed Result()/FinalResult() JSON.
+
+    Returns:
+        float: 0 to 1; 1.0 when the recognizer did not report word confidences.
+    """
+    words = result.get("result") or []
+    if not words:
+        return 1.0 if result.get("text", "").strip() else 0.0
+    return sum(word.get("conf", 1.0) for word in words) / len(words)
+
+
+def vosk_decoder(recognizer, accepted=False):
+    """
+    Builds a decoder that finishes a Vosk recognizer fed while listening.
+
+    Args:
+        recognizer (vosk.KaldiRecognizer): Recognizer with SetWords(True).
+        accepted (bool): AcceptWaveform() already reported the end of the
+            utterance (Result()); otherwise it is finalized (FinalResult()).
+
+    Returns:
+        callable: () -> (text, confidence), for STTRace.recognize(decoders=...).
+    """
+    def run():
+        result = json.loads(recognizer.Result() if accepted else recognizer.FinalResult())
+        return result.get("text", ""), vosk_confidence(result)
+    return run
+
+
+def google_engine(recognizer, sample_rate, language="en-US", missing_confidence=0.8, sr_module=None):
+    """
+    Builds an engine on speech_recognition's Google Web Speech API.
+
+    Args:
+        recognizer (sr.Recognizer): Shared recognizer (its operation_timeout bounds
+            each request).
+        sample_rate (int): Audio sample rate in Hz (16-bit mono PCM).
+        language (str): Recognition language.
+        missing_confidence (float): Used when Google returns a transcript
+            without a confidence.
+        sr_module: The `speech_recognition` module (imported lazily when None).
+
+    Returns:
+        callable: pcm -> (text, confidence). Raises EngineOffline when the
+        service cannot be reached.
+    """
+    if sr_module is None:
+        import speech_recognition as sr_module
+
+    def run(pcm):
+        audio = sr_module.AudioData(pcm, sample_rate, 2)
+        try:
+            response = recognizer.recognize_google(audio, language=language, show_all=True)
+        except sr_module.RequestError as e:
+            raise EngineOffline(str(e)) from e
+        alternatives = response.get("alternative") if isinstance(response, dict) else None
+        if not alternatives:
+            return "", 0.0  # nothing recognizable
+        best = alternatives[0]
+        return best.get("transcript", ""), best.get("confidence", missing_confidence)
+    return run
+
+
+# ------------------- Race -------------------
+
+class STTRace:
+    """
+    Runs several speech engines on one utterance and picks a transcript.
+    """
+
+    def __init__(self, engines, min_confidence=0.6, prefer=None, grace_s=0.4, timeout_s=5.0,
+                 offline_retry_s=60.0, clock=time.monotonic):
+        """
+        Args:
+            engines (list): (name, engine) pairs; engine is pcm -> (text, confidence),
+                or None for an engine that only runs from a decoder given to
+                recognize().
+            min_confidence (float): Results below this only win if nothing better
+                arrives before the timeout.
+            prefer (str): Engine whose confident result is worth waiting for, or
+                None to take the earliest confident result.
+            grace_s (float): How long a confident result from another engine waits
+                for the preferred one.
+            timeout_s (float): Give up waiting for slower engines after this long.
+            offline_retry_s (float): Skip an engine for this long after it reported
+                EngineOffline.
+            clock (callable): Monotonic clock in seconds.
+        """
+        self.engines = list(engines)
+        self.min_confidence = min_confidence
+        self.prefer = prefer
+        self.grace_s = grace_s
+        self.timeout_s = timeout_s
+        self.offline_retry_s = offline_retry_s
+        self.clock = clock
+        self._offline_until = {}
+        self._lock = threading.Lock()
+        # Stats
+        self.races = 0
+        self.unconfident = 0  # races won below min_confidence
+        self.wins = {name: 0 for name, _ in self.engines}
+        self.errors = {name: 0 for name, _ in self.engines}
+        self.skipped = {name: 0 for name, _ in self.engines}  # races run without the engine (offline)
+        self.latencies = {name: [] for name, _ in self.engines}
+
+    def available(self, name):
+        """
+        Returns:
+            bool: False while the engine is skipped after going offline.
+        """
+        with self._lock:
+            return self.clock() >= self._offline_until.get(name, 0.0)
+
+    def recognize(self, pcm, decoders=None):
+        """
+        Races the engines on one utterance. All of them start at once, each on
+        its own thread.
+
+        Args:
+            pcm (bytes): The utterance (16-bit mono).
+            decoders (dict): By engine name, a callable () -> (text, confidence)
+                run (and timed) instead of that engine, e.g. finishing the Vosk
+                recognizer that was fed the utterance while listening.
+
+        Returns:
+            STTResult: The chosen transcript, or None if no engine heard anything.
+        """
+        events = queue.Queue()
+        started = self.clock()
+        decoders = decoders or {}
+        pending = set()
+        with self._lock:
+            self.races += 1
+        for name, engine in self.engines:
+            if name in decoders:
+                decode = decoders[name]
+            elif engine is not None and self.available(name):
+                decode = lambda engine=engine: engine(pcm)
+            else:
+                with self._lock:
+                    self.skipped[name] += 1
+                continue
+            threading.Thread(target=self._run, args=(name, decode, events), name=f"stt-{name}", daemon=True).start()
+            pending.add(name)
+        return self._decide(events, pending, started)
+
+    def _run(self, name, decode, events):
+        started = self.clock()
+        try:
+            text, confidence = decode()
+        except EngineOffline as e:
+            print(f"⚠️ {name} speech recognition offline ({e}), using the others for {self.offline_retry_s:g}s")
+            with self._lock:
+                self.errors[name] += 1
+                self._offline_until[name] = self.clock() + self.offline_retry_s
+            events.put((name, None, 0.0, None))
+            return
+        except Exception as e:
+            print(f"⚠️ {name} speech recognition failed: {e}")
+            with self._lock:
+                self.errors[name] += 1
+            events.put((name, None, 0.0, None))
+            return
+        latency = self.clock() - started
+        with self._lock:
+            # Recorded for losers too, so the latencies show how far behind they are
+            self.latencies[name].append(latency)
+        events.put((name, text, confidence, latency))
+
+    def _decide(self, events, pending, started):
+        deadline = started + self.timeout_s
+        best = None        # highest confidence so far
+        candidate = None   # confident result waiting for the preferred engine
+        grace_until = None
+        while pending:
+            if candidate is not None and self.prefer not in pending:
+                break  # the preferred engine answered without confidence or failed
+            now = self.clock()
+            wait_until = min(deadline, grace_until) if grace_until is not None else deadline
+            if now >= wait_until:
+                break
+            try:
+                name, text, confidence, latency = events.get(timeout=wait_until - now)
+            except queue.Empty:
+                continue
+            pending.discard(name)
+            if not text or not text.strip():
+                continue
+            result = STTResult(name, text.strip(), confidence, self.clock() - started)
+            if best is None or result.confidence > best.confidence:
+                best = result
+            if result.confidence < self.min_confidence:
+                continue
+            if self.prefer is None or name == self.prefer or self.prefer not in pending:
+                return self._win(result)
+            if candidate is None:
+                candidate = result
+                grace_until = self.clock() + self.grace_s
+        if candidate is not None:
+            return self._win(candidate)
+        if best is not None:
+            with self._lock:
+                self.unconfident += 1
+            return self._win(best)
+        return None
+
+    def _win(self, result):
+        with self._lock:
+            self.wins[result.engine] += 1
+        return result
+
+    def stats(self):
+        """
+        Returns:
+            dict: Races, wins, win rate, errors and offline skips per engine,
+            races won below the confidence threshold, and median/p90 latency
+            per engine in ms.
+        """
+        with self._lock:
+            races = self.races
+            stats = {
+                "races": races,
+                "wins": dict(self.wins),
+                "win_rate": {name: wins / races if races else 0.0 for name, wins in self.wins.items()},
+                "errors": dict(self.errors),
+                "skipped": dict(self.skipped),
+                "unconfident": self.unconfident,
+            }
+            latencies = {name: sorted(times) for name, times in self.latencies.items()}
+        stats["latency_ms"] = {
+            name: {"p50": 1000 * times[len(times) // 2], "p90": 1000 * times[min(len(times) - 1, int(len(times) * 0.9))]}
+            for name, times in latencies.items() if times
+        }
+        return stats
@@ -5,10 +5,13 @@ Text to Speech with offline library
 """
 import pyttsx3
 
+# The engine is created and the voices listed once, not on every call
+# (Software/offline_tts.py runs it in a worker process and returns WAV audio instead)
+engine = pyttsx3.init()
+voices = engine.getProperty('voices')
+
 def text_to_speech(text, voice_index=0, rate=150, volume=1.0):
     """Convert text to speech using a specified voice."""
-    engine = pyttsx3.init()
-    voices = engine.getProperty('voices')
 
     # Set properties
     engine.setProperty('voice', voices[voice_index].id)  # 0 male, 1 female
@@ -0,0 +1,34 @@
+"""
+Transcript helpers for Emma Robot
+Normalization and phrase matching shared by the recognizers, the endpointer
+and the speculative LLM dispatch, so they all compare transcripts the same way.
+"""
+
+import re
+
+_PUNCTUATION = re.compile(r"[^\w\s']")
+
+
+def normalize_transcript(text):
+    """
+    Args:
+        text (str): Partial or final transcript.
+
+    Returns:
+        str: Lowercase words without punctuation, single spaces.
+    """
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+def contains_phrase(words, phrase):
+    """
+    Whole-word phrase match ("quite" does not contain "quit").
+
+    Args:
+        words (str): Normalized transcript.
+        phrase (str): Normalized phrase.
+
+    Returns:
+        bool: True if the phrase occurs in the transcript as whole words.
+    """
+    return bool(phrase) and f" {phrase} " in f" {words} "
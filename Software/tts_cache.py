@@ -0,0 +1,217 @@
+"""
+Text-to-speech audio cache for Emma Robot
+Stores synthesized audio on disk, keyed by a hash of (engine, model, voice,
+format, normalized text), so phrases Emma says often ("Hello! How can I assist
+you today?", "Goodbye!") are played without another API call.
+
+The cache has a size cap; the least recently used files are evicted first.
+"""
+
+import hashlib
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+
+def normalize_text(text):
+    """
+    Normalizes text so trivially different spellings share one cache entry.
+
+    Args:
+        text (str): Text to speak.
+
+    Returns:
+        str: NFC-normalized text with whitespace collapsed.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+# ------------------- TTS Cache -------------------
+
+class TTSCache:
+    """
+    Content-addressed, size-capped LRU cache of audio files in one directory.
+    Safe to use from several threads (e.g. pre-warming while Emma talks).
+    """
+
+    def __init__(self, directory, max_bytes=50 * 1024 * 1024):
+        """
+        Args:
+            directory (str): Folder for the cached audio files (created if missing).
+            max_bytes (int): Total size cap; older entries are evicted beyond it.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # file name -> size, least recently used first
+        self._total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+
+        # Rebuild the LRU order from the files' modification times
+        files = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".tmp") or not os.path.isfile(path):
+                continue
+            info = os.stat(path)
+            files.append((info.st_mtime, name, info.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total_bytes += size
+        with self._lock:
+            self._evict()
+
+    @staticmethod
+    def key(engine, model, voice, text, audio_format="mp3"):
+        """
+        Returns:
+            str: Cache file name for this synthesis request.
+        """
+        identity = "\n".join([engine, model or "", voice or "", audio_format, normalize_text(text)])
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest() + "." + audio_format
+
+    def get(self, key):
+        """
+        Args:
+            key (str): Value from `key()`.
+
+        Returns:
+            bytes: Cached audio, or None on a miss.
+        """
+        path = os.path.join(self.directory, key)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except OSError:
+                self._total_bytes -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(path)  # keeps the LRU order across restarts
+        except OSError:
+            pass
+        return data
+
+    def put(self, key, data):
+        """
+        Stores audio (written to a temporary file first, so readers never see half a file).
+
+        Args:
+            key (str): Value from `key()`.
+            data (bytes): Audio content.
+        """
+        if not data or len(data) > self.max_bytes:
+            return
+        path = os.path.join(self.directory, key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def _evict(self):
+        # Called with the lock held
+        while self._total_bytes > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def get_or_create(self, engine, model, voice, text, synthesize, audio_format="mp3"):
+        """
+        Returns cached audio, synthesizing and storing it on a miss.
+
+        Args:
+            engine (str): TTS engine name, e.g. "openai".
+            model (str): TTS model name.
+            voice (str): Voice name.
+            text (str): Text to speak.
+            synthesize (callable): text -> audio bytes, only called on a miss.
+            audio_format (str): Audio format produced by `synthesize`.
+
+        Returns:
+            bytes: Audio content.
+        """
+        key = self.key(engine, model, voice, text, audio_format)
+        data = self.get(key)
+        if data is None:
+            data = synthesize(text)
+            self.put(key, data)
+        return data
+
+    def prewarm(self, phrases, engine, model, voice, synthesize, audio_format="mp3", background=True):
+        """
+        Synthesizes phrases that are not cached yet, e.g. greetings at startup.
+
+        Args:
+            phrases (list): Texts to cache.
+            engine, model, voice, synthesize, audio_format: As in `get_or_create`.
+            background (bool): Run in a daemon thread instead of blocking.
+
+        Returns:
+            threading.Thread: The worker thread when `background` is True, else None.
+        """
+        def warm():
+            for phrase in phrases:
+                key = self.key(engine, model, voice, phrase, audio_format)
+                with self._lock:
+                    cached = key in self._entries
+                if cached:
+                    continue
+                try:
+                    self.put(key, synthesize(phrase))
+                except Exception as e:
+                    print(f"⚠️ TTS cache pre-warm failed for '{phrase}': {e}")
+
+        if not background:
+            warm()
+            return None
+        thread = threading.Thread(target=warm, daemon=True)
+        thread.start()
+        return thread
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hits, misses, number of entries and total size in bytes.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
+
+
+# ------------------- OpenAI Helpers -------------------
+
+def openai_synthesizer(client, model, voice, response_format="mp3"):
+    """
+    Returns:
+        callable: text -> audio bytes using OpenAI TTS (non-streaming), for the cache.
+    """
+    def synthesize(text):
+        response = client.audio.speech.create(
+            model=model,
+            voice=voice,
+            input=text,
+            response_format=response_format
+        )
+        return response.read()
+    return synthesize
@@ -0,0 +1,209 @@
+"""
+Two-tier speech recognition for Emma Robot
+A small Vosk model stays loaded and only listens for a handful of keywords
+(wake words and exit phrases) through a restricted grammar, which is cheap
+enough to run all the time. The large dictation model is loaded the first time
+Emma is woken up (in the background, while she greets the user), decodes the
+conversation, and is unloaded again after a period without use.
+
+Both tiers read from the same microphone capture; only the recognizer changes.
+"""
+
+import gc
+import json
+import threading
+import time
+
+from Software.transcripts import contains_phrase, normalize_transcript
+
+UNKNOWN_WORD = "[unk]"  # Vosk grammar entry that absorbs everything else
+
+
+class TwoTierRecognizer:
+    """
+    Owns the keyword spotter and the lazily loaded dictation recognizer.
+    """
+
+    def __init__(self, small_model_path, large_model_path, sample_rate, keywords, exit_phrases=(),
+                 unload_after_s=300, configure=None, vosk_module=None):
+        """
+        Args:
+            small_model_path (str): Small Vosk model (must support runtime grammars,
+                e.g. vosk-model-small-en-us-0.15).
+            large_model_path (str): Large dictation model, loaded on first use.
+            sample_rate (int): Audio sample rate in Hz.
+            keywords (iterable of str): Wake words; found anywhere in a spotter result.
+            exit_phrases (iterable of str): Phrases that only count when they are the
+                whole spotter result, so "don't stop" does not end the program.
+            unload_after_s (float): Unload the large model after this many seconds
+                back in keyword mode (None keeps it loaded).
+            configure (callable): Called with every new recognizer (e.g. to set
+                endpointer delays).
+            vosk_module: The `vosk` module (imported lazily when None).
+        """
+        if vosk_module is None:
+            import vosk as vosk_module
+        self.vosk = vosk_module
+        self.large_model_path = large_model_path
+        self.sample_rate = sample_rate
+        self.keywords = [normalize_transcript(k) for k in keywords]
+        self.exit_phrases = [normalize_transcript(p) for p in exit_phrases]
+        self.unload_after_s = unload_after_s
+        self.configure = configure or (lambda recognizer: None)
+
+        self._lock = threading.Lock()
+        self._large_model = None
+        self._large_recognizer = None
+        self._loader = None
+        self._unload_timer = None
+        # Stats
+        self.large_loads = 0
+        self.large_load_seconds = 0.0
+        self.large_unloads = 0
+
+        started = time.perf_counter()
+        self.small_model = self.vosk.Model(small_model_path)
+        self.small_load_seconds = time.perf_counter() - started
+        self.spotter = self._new_recognizer(self.small_model, self._grammar())
+
+    def _grammar(self):
+        """Vosk grammar: every keyword word plus the unknown-word filler."""
+        phrases = []
+        spotted = self.keywords + self.exit_phrases
+        for phrase in spotted + [word for keyword in spotted for word in keyword.split()]:
+            if phrase not in phrases:
+                phrases.append(phrase)
+        return json.dumps(phrases + [UNKNOWN_WORD])
+
+    def _new_recognizer(self, model, grammar=None):
+        if grammar is None:
+            recognizer = self.vosk.KaldiRecognizer(model, self.sample_rate)
+        else:
+            recognizer = self.vosk.KaldiRecognizer(model, self.sample_rate, grammar)
+        self.configure(recognizer)
+        return recognizer
+
+    # ------------------- Keyword Tier -------------------
+
+    def spot(self, text):
+        """
+        Finds a keyword in a spotter result.
+
+        Args:
+            text (str): Transcript from the spotter (may contain "[unk]").
+
+        Returns:
+            str: The exit phrase the whole result consists of, else the wake word
+            found in it (longest first), or None.
+        """
+        if UNKNOWN_WORD not in text and normalize_transcript(text) in self.exit_phrases:
+            return normalize_transcript(text)
+        words = normalize_transcript(text.replace(UNKNOWN_WORD, " "))
+        for keyword in sorted(self.keywords, key=len, reverse=True):
+            if contains_phrase(words, keyword):
+                return keyword
+        return None
+
+    def release(self):
+        """
+        Switches back to keyword mode; the large model is unloaded if it is not
+        needed again within `unload_after_s`.
+        """
+        self.spotter.Reset()
+        if self.unload_after_s is None:
+            return
+        with self._lock:
+            self._cancel_unload()
+            self._unload_timer = threading.Timer(self.unload_after_s, self._unload)
+            self._unload_timer.daemon = True
+            self._unload_timer.start()
+
+    # ------------------- Dictation Tier -------------------
+
+    @property
+    def large_loaded(self):
+        """True while the large model is in memory."""
+        return self._large_model is not None
+
+    def preload(self):
+        """Starts loading the large model in the background (no-op if loaded or loading)."""
+        with self._lock:
+            self._cancel_unload()
+            if self._large_model is not None or self._loader is not None:
+                return
+            self._loader = threading.Thread(target=self._load, name="vosk-large-loader", daemon=True)
+            self._loader.start()
+
+    def dictation(self):
+        """
+        Returns the dictation recognizer, loading the large model if needed.
+
+        Returns:
+            KaldiRecognizer: Recognizer on the large model (reused across turns).
+        """
+        self.preload()
+        loader = self._loader
+        if loader is not None:
+            loader.join()
+        with self._lock:
+            if self._large_recognizer is None:
+                # The loader failed; let the error surface here
+                self._load_locked()
+            return self._large_recognizer
+
+    def _load(self):
+        with self._lock:
+            try:
+                self._load_locked()
+            except Exception as e:
+                print(f"⚠️ Failed to load {self.large_model_path}: {e}")
+            finally:
+                self._loader = None
+
+    def _load_locked(self):
+        if self._large_model is not None:
+            return
+        print(f"⏳ Loading dictation model {self.large_model_path}...")
+        started = time.perf_counter()
+        model = self.vosk.Model(self.large_model_path)
+        self._large_recognizer = self._new_recognizer(model)
+        self._large_model = model
+        elapsed = time.perf_counter() - started
+        self.large_loads += 1
+        self.large_load_seconds += elapsed
+        print(f"✅ Dictation model loaded in {elapsed:.1f}s")
+
+    def _cancel_unload(self):
+        if self._unload_timer is not None:
+            self._unload_timer.cancel()
+            self._unload_timer = None
+
+    def _unload(self):
+        with self._lock:
+            self._unload_timer = None
+            if self._large_model is None:
+                return
+            self._large_recognizer = None
+            self._large_model = None
+            self.large_unloads += 1
+        gc.collect()
+        print("💤 Dictation model unloaded")
+
+    def close(self):
+        """Cancels the pending unload and frees the large model."""
+        with self._lock:
+            self._cancel_unload()
+        self._unload()
+
+    def stats(self):
+        """
+        Returns:
+            dict: Model load times and how often the large model was (un)loaded.
+        """
+        return {
+            "small_load_s": self.small_load_seconds,
+            "large_loaded": self.large_loaded,
+            "large_loads": self.large_loads,
+            "large_load_s": self.large_load_seconds,
+            "large_unloads": self.large_unloads,
+        }
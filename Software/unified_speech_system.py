@@ -8,45 +8,86 @@ Configure via config.py to switch between modes
 import sys
 import os
 import json
-import pygame
-import pyaudio
+import threading
+import time
 
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import *
+from Software.mic_capture import MicrophoneCapture
+from Software.audio_playback import PlaybackEngine
+from Software.backend_registry import BackendRegistry, LatencyPolicy
+from Software.tts_cache import TTSCache
 
 class UnifiedSpeechSystem:
-    def __init__(self, use_offline_stt=True, use_offline_tts=False):
+    def __init__(self, use_offline_stt=True, use_offline_tts=False, hybrid_stt=False,
+                 adaptive=BACKEND_SELECTION_ENABLED):
         """
         Initialize speech system
         
         Args:
-            use_offline_stt (bool): Use VOSK (offline) vs Google (online) for speech-to-text
-            use_offline_tts (bool): Use pyttsx3 (offline) vs OpenAI (online) for text-to-speech
+            use_offline_stt (bool): Prefer VOSK (offline) over Google (online) for speech-to-text
+            use_offline_tts (bool): Prefer pyttsx3 (offline) over OpenAI (online) for text-to-speech
+            hybrid_stt (bool): Run VOSK and Google on each utterance and take the first
+                confident transcript (falls back to VOSK alone without network)
+            adaptive (bool): Switch to the other backend while the preferred one misses
+                its latency target (BACKEND_LATENCY_TARGETS)
         """
-        self.use_offline_stt = use_offline_stt
+        self.use_offline_stt = use_offline_stt or hybrid_stt
         self.use_offline_tts = use_offline_tts
+        self.stt_race = None
         
-        # Initialize pygame for audio prompts
-        pygame.mixer.init()
+        # One output device for prompts and speech; prompts are decoded once
+        self.audio_output = PlaybackEngine()
+        for path in (LISTEN_SOUND_PATH, CONVERT_SOUND_PATH):
+            try:
+                self.audio_output.load_effect(path, path)
+            except Exception as e:
+                print(f"⚠️ Could not load {path}: {e}")
         
-        # Initialize speech-to-text
-        if use_offline_stt:
-            self._init_vosk()
-        else:
-            self._init_google_stt()
-            
-        # Initialize text-to-speech
-        if use_offline_tts:
-            self._init_pyttsx3()
+        # Repeated phrases are played from disk instead of being synthesized again (both TTS backends)
+        self.tts_cache = TTSCache(TTS_CACHE_DIR, TTS_CACHE_MAX_MB * 1024 * 1024) if TTS_CACHE_ENABLED else None
+        
+        # Backends in order of preference; the others are only loaded if the policy switches to them
+        self.backends = BackendRegistry()
+        if hybrid_stt:
+            self.backends.register("stt", "hybrid", self._listen_vosk, load=self._init_hybrid_stt)
         else:
-            self._init_openai_tts()
+            stt = [("vosk", self._listen_vosk, self._init_vosk), ("google", self._listen_google, self._init_google_stt)]
+            for name, run, load in (stt if use_offline_stt else stt[::-1]):
+                self.backends.register("stt", name, run, load=load)
+        tts = [("pyttsx3", self._speak_pyttsx3, self._init_pyttsx3), ("openai", self._speak_openai, self._init_openai_tts)]
+        for name, run, load in (tts if use_offline_tts else tts[::-1]):
+            self.backends.register("tts", name, run, load=load)
+        if adaptive:
+            for kind in ("stt", "tts"):
+                self.backends.set_policy(kind, LatencyPolicy(BACKEND_LATENCY_TARGETS[kind],
+                                                             percentile=BACKEND_LATENCY_PERCENTILE,
+                                                             max_error_rate=BACKEND_MAX_ERROR_RATE,
+                                                             retry_after_s=BACKEND_RETRY_AFTER_S))
+        
+        # Initialize the preferred speech-to-text and text-to-speech now
+        self.backends.select("stt").load()
+        self.backends.select("tts").load()
     
     def _init_vosk(self):
         """Initialize VOSK offline speech recognition"""
         import vosk
         self.vosk_model = vosk.Model(VOSK_MODEL_PATH)
         self.vosk_recognizer = vosk.KaldiRecognizer(self.vosk_model, VOSK_SAMPLE_RATE)
+        # One microphone stream for the whole session, shared by every listen() call
+        self.mic_capture = MicrophoneCapture(VOSK_SAMPLE_RATE, AUDIO_CHANNELS, AUDIO_CHUNK_SIZE, MIC_BUFFER_SECONDS)
+        self.mic_capture.start()
+        # Only speech is passed to the decoder
+        from Software.vad import VoiceActivityDetector
+        self.vad = VoiceActivityDetector(VOSK_SAMPLE_RATE, energy_ratio=VAD_ENERGY_RATIO, hangover_ms=VAD_HANGOVER_MS,
+                                         pre_roll_ms=VAD_PRE_ROLL_MS) if VAD_ENABLED else None
+        # Our own end-of-utterance timeouts, also applied to Vosk's endpointer
+        from Software.endpointing import Endpointer
+        self.endpointer = Endpointer(ENDPOINT_TRAILING_SILENCE_MS, ENDPOINT_MAX_UTTERANCE_MS, adaptive=ENDPOINT_ADAPTIVE,
+                                     short_command_silence_ms=ENDPOINT_SHORT_COMMAND_SILENCE_MS,
+                                     short_commands=ENDPOINT_SHORT_COMMANDS)
+        self.endpointer.configure_recognizer(self.vosk_recognizer)
         print("✅ VOSK offline speech recognition initialized")
     
     def _init_google_stt(self):
@@ -55,129 +96,203 @@ class UnifiedSpeechSystem:
         self.google_recognizer = sr.Recognizer()
         print("✅ Google online speech recognition initialized")
     
+    def _init_hybrid_stt(self):
+        """Race VOSK (decoded while listening) against Google on the same audio"""
+        from Software.stt_race import STTRace, google_engine
+        self._init_vosk()
+        self._init_google_stt()
+        # Word confidences for the race; VOSK takes part by finishing the recognizer fed while listening
+        self.vosk_recognizer.SetWords(True)
+        self.google_recognizer.operation_timeout = STT_RACE_TIMEOUT_S
+        self.stt_race = STTRace([("vosk", None),
+                                 ("google", google_engine(self.google_recognizer, VOSK_SAMPLE_RATE,
+                                                          language=GOOGLE_STT_LANGUAGE))],
+                                min_confidence=STT_RACE_MIN_CONFIDENCE, prefer=STT_RACE_PREFER,
+                                grace_s=STT_RACE_GRACE_MS / 1000, timeout_s=STT_RACE_TIMEOUT_S,
+                                offline_retry_s=STT_RACE_OFFLINE_RETRY_S)
+        print(f"✅ Hybrid speech recognition initialized (preferring {STT_RACE_PREFER or 'the fastest'})")
+    
     def _init_pyttsx3(self):
         """Initialize pyttsx3 offline text-to-speech"""
-        import pyttsx3
-        self.tts_engine = pyttsx3.init()
-        self.tts_engine.setProperty('rate', 170)
-        self.tts_engine.setProperty('volume', 1.0)
+        from Software.offline_tts import OfflineTTS
+        # One engine in a worker process; audio comes back as WAV and plays on our output device
+        self.offline_tts = OfflineTTS(rate=170, volume=1.0, voice=OFFLINE_TTS_VOICE, cache=self.tts_cache)
         print("✅ pyttsx3 offline text-to-speech initialized")
     
     def _init_openai_tts(self):
         """Initialize OpenAI online text-to-speech"""
-        from openai import OpenAI
-        self.openai_client = OpenAI(api_key=OPENAI_API_KEY)
+        from Software.audio_streaming import StreamingPlayer
+        from Software.llm_clients import ClientPool
+        from Software.tts_cache import openai_synthesizer
+        self.clients = ClientPool(openai_api_key=OPENAI_API_KEY)
+        self.openai_client = self.clients.openai
+        if LLM_PREWARM:
+            self.clients.prewarm()
+        self.streaming_player = StreamingPlayer(prefill_ms=OPENAI_TTS_STREAM_PREFILL_MS) if OPENAI_TTS_STREAMING else None
+        self.tts_format = "pcm" if self.streaming_player is not None else "mp3"
+        if self.tts_cache is not None and TTS_PREWARM_PHRASES:
+            self.tts_cache.prewarm(TTS_PREWARM_PHRASES, "openai", OPENAI_TTS_MODEL, OPENAI_TTS_VOICE,
+                                   openai_synthesizer(self.openai_client, OPENAI_TTS_MODEL, OPENAI_TTS_VOICE, self.tts_format),
+                                   audio_format=self.tts_format)
         print("✅ OpenAI online text-to-speech initialized")
     
-    def play_sound(self, file_path):
-        """Play audio prompt"""
-        pygame.mixer.music.load(file_path)
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(5)
+    def play_sound(self, file_path, wait=True):
+        """Play audio prompt on an effects channel"""
+        handle = self.audio_output.play_effect(file_path)
+        if wait:
+            handle.wait()
+        return handle
+    
+    def stop_speaking(self):
+        """Cut off the current utterance"""
+        self.audio_output.stop()
     
     def listen(self):
         """Listen for speech and return text"""
-        if self.use_offline_stt:
-            return self._listen_vosk()
-        else:
-            return self._listen_google()
+        return self.backends.call("stt")
     
     def _listen_vosk(self):
-        """Listen using VOSK (offline)"""
-        mic = pyaudio.PyAudio()
-        
-        # Use smaller buffer to prevent overflow
-        buffer_size = 4096  # Smaller than config
-        
-        stream = mic.open(
-            format=pyaudio.paInt16,
-            channels=AUDIO_CHANNELS,
-            rate=VOSK_SAMPLE_RATE,
-            input=True,
-            frames_per_buffer=buffer_size,
-            stream_callback=None
-        )
-        stream.start_stream()
+        """Listen using VOSK (offline); returns (text, seconds from end of speech to text)"""
+        reader = self.mic_capture.reader(pre_roll_ms=MIC_PRE_ROLL_MS)
+        if self.vad is not None:
+            self.vad.reset()
+        self.endpointer.start()
+        partial = ""
+        utterance = []  # audio given to VOSK, replayed to the other engines in hybrid mode
         
         print("🎤 Listening (VOSK offline)...")
         print("💡 Speak clearly and wait for the 'convert' sound...")
         
+        # Cues play in the background; their audio is silenced in the recognizer input
         try:
-            self.play_sound(LISTEN_SOUND_PATH)
+            cue = self.play_sound(LISTEN_SOUND_PATH, wait=False)
+            reader.mute_for(cue.length)
         except:
             print("⚠️ Could not play listen sound, continuing...")
         
         while True:
             try:
-                data = stream.read(buffer_size, exception_on_overflow=False)
+                data = reader.read()
                 if len(data) == 0:
                     continue
-                    
-                if self.vosk_recognizer.AcceptWaveform(data):
+                
+                segment_ended = False
+                if self.vad is not None:
+                    data, segment_ended = self.vad.process(data)  # b"" during silence
+                
+                if data and self.stt_race is not None:
+                    utterance.append(data)
+                accepted = bool(data) and self.vosk_recognizer.AcceptWaveform(data)
+                endpoint = False
+                if not accepted and self.vad is not None:
+                    if data:
+                        partial = json.loads(self.vosk_recognizer.PartialResult())["partial"]
+                    endpoint = (self.endpointer.update(self.vad.trailing_silence_ms, self.vad.utterance_ms, partial)
+                                or (segment_ended and not partial.strip()))
+                if accepted or endpoint:
+                    ended = time.monotonic()
                     try:
-                        self.play_sound(CONVERT_SOUND_PATH)
+                        cue = self.play_sound(CONVERT_SOUND_PATH, wait=False)
+                        reader.mute_for(cue.length)
                     except:
                         print("⚠️ Could not play convert sound, continuing...")
                     
-                    result = self.vosk_recognizer.Result()
-                    text = json.loads(result)["text"]
+                    if self.stt_race is not None and utterance:
+                        text = self._race_transcript(b"".join(utterance), accepted)
+                    else:
+                        # FinalResult() when our endpointer fired before Vosk's own
+                        result = json.loads(self.vosk_recognizer.Result() if accepted else self.vosk_recognizer.FinalResult())
+                        text = result["text"]
+                    utterance = []
                     if text.strip():  # Only return non-empty text
+                        self.endpointer.finalized()
                         print(f"🎯 You said: {text}")
-                        stream.stop_stream()
-                        stream.close()
-                        mic.terminate()
-                        return text
+                        return text, time.monotonic() - ended
+                    partial = ""
+                    self.endpointer.start()
+                    if self.vad is not None:
+                        self.vad.reset()
             except Exception as e:
                 print(f"⚠️ Audio error: {e}")
                 continue
     
+    def _race_transcript(self, pcm, accepted):
+        """Pick between VOSK's transcript and Google's; Google starts while VOSK finishes decoding"""
+        from Software.stt_race import vosk_decoder
+        decode = vosk_decoder(self.vosk_recognizer, accepted)
+        decoded = threading.Event()
+        
+        def finish_vosk():
+            try:
+                return decode()
+            finally:
+                decoded.set()
+        
+        winner = self.stt_race.recognize(pcm, decoders={"vosk": finish_vosk})
+        # The recognizer is fed again on the next turn, so VOSK must be done with it even if Google won
+        decoded.wait()
+        if winner is None:
+            return ""
+        print(f"🔀 {winner.engine} transcript (confidence {winner.confidence:.2f}, {winner.latency_s * 1000:.0f} ms)")
+        return winner.text
+    
     def _listen_google(self):
-        """Listen using Google (online)"""
+        """Listen using Google (online); returns (text, seconds from end of speech to text)"""
         import speech_recognition as sr
         
         with sr.Microphone() as source:
             print("🎤 Listening (Google online)...")
+            # Waits for the cue: speech_recognition records from the moment listen() starts
             self.play_sound(LISTEN_SOUND_PATH)
             
             audio = self.google_recognizer.listen(source)
-            self.play_sound(CONVERT_SOUND_PATH)
+            self.play_sound(CONVERT_SOUND_PATH, wait=False)
             
-            text = self.google_recognizer.recognize_google(audio)
+            ended = time.monotonic()
+            try:
+                text = self.google_recognizer.recognize_google(audio)
+            except sr.UnknownValueError:
+                # Nothing intelligible: not a backend failure
+                print("⚠️ Could not understand audio")
+                return "", time.monotonic() - ended
             print(f"🎯 You said: {text}")
-            return text
+            return text, time.monotonic() - ended
     
     def speak(self, text):
         """Convert text to speech"""
         print(f"🗣️ Emma says: {text}")
-        
-        if self.use_offline_tts:
-            self._speak_pyttsx3(text)
-        else:
-            self._speak_openai(text)
+        self.backends.call("tts", text)
     
     def _speak_pyttsx3(self, text):
-        """Speak using pyttsx3 (offline)"""
-        self.tts_engine.say(text)
-        self.tts_engine.runAndWait()
+        """Speak using pyttsx3 (offline); returns (None, seconds to first audio)"""
+        return None, self.offline_tts.speak(text, self.audio_output, timeout=OFFLINE_TTS_TIMEOUT_S)
     
     def _speak_openai(self, text):
-        """Speak using OpenAI (online)"""
-        import io
-        
-        response = self.openai_client.audio.speech.create(
-            model=OPENAI_TTS_MODEL,
-            voice=OPENAI_TTS_VOICE,
-            input=text
-        )
+        """Speak using OpenAI (online); returns (None, seconds to first audio)"""
+        started = time.monotonic()
+        if self.streaming_player is not None:
+            from Software.audio_streaming import stream_openai_speech
+            playback = stream_openai_speech(self.openai_client, text, OPENAI_TTS_MODEL, OPENAI_TTS_VOICE,
+                                            self.streaming_player, cache=self.tts_cache)
+            return None, playback["time_to_first_audio"]
         
-        audio_content = response.read()
+        if self.tts_cache is not None:
+            from Software.tts_cache import openai_synthesizer
+            audio_content = self.tts_cache.get_or_create(
+                "openai", OPENAI_TTS_MODEL, OPENAI_TTS_VOICE, text,
+                openai_synthesizer(self.openai_client, OPENAI_TTS_MODEL, OPENAI_TTS_VOICE))
+        else:
+            response = self.openai_client.audio.speech.create(
+                model=OPENAI_TTS_MODEL,
+                voice=OPENAI_TTS_VOICE,
+                input=text
+            )
+            audio_content = response.read()
         
-        # Play audio using pygame
-        pygame.mixer.music.load(io.BytesIO(audio_content))
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
+        handle = self.audio_output.play(audio_content)
+        first_audio = time.monotonic() - started
+        handle.wait()
+        return None, first_audio
 
 # Example usage
 if __name__ == "__main__":
@@ -191,6 +306,9 @@ if __name__ == "__main__":
     # 3. Hybrid (offline STT + online TTS - good balance)
     speech_system = UnifiedSpeechSystem(use_offline_stt=True, use_offline_tts=False)
     
+    # 4. Racing STT (VOSK and Google on every utterance, VOSK alone without network)
+    # speech_system = UnifiedSpeechSystem(hybrid_stt=True, use_offline_tts=False)
+    
     # Test the system
     print("🎯 Say 'quit' or 'exit' to stop the program")
     while True:
@@ -200,6 +318,9 @@ if __name__ == "__main__":
         if text.lower() in ['quit', 'exit', 'stop', 'goodbye']:
             speech_system.speak("Goodbye! See you later!")
             print("👋 Program stopped by user")
+            if speech_system.stt_race is not None:
+                print(f"Speech recognition race: {speech_system.stt_race.stats()}")
+            print(f"Speech backends: {speech_system.backends.stats()}")
             break
             
         speech_system.speak(f"I heard you say: {text}")
@@ -0,0 +1,195 @@
+"""
+Voice activity detection for Emma Robot
+A cheap NumPy gate in front of Vosk: only audio around speech is passed to the
+Kaldi decoder, so it does not spend a CPU core decoding silence while Emma idles.
+
+Each 20 ms frame is classified by energy (against an adaptive noise floor) and
+zero-crossing rate (to keep quiet unvoiced sounds like "s" and "f"). Segments
+are extended by a hangover after speech and a pre-roll before it, so word
+edges are not clipped.
+"""
+
+import time
+from collections import deque
+
+import numpy as np
+
+SAMPLE_WIDTH = 2  # bytes per sample (paInt16)
+
+
+# ------------------- Frame Features -------------------
+
+def frame_features(samples, frame_size):
+    """
+    Computes per-frame energy and zero-crossing rate in one vectorized pass.
+
+    Args:
+        samples (np.ndarray): int16 mono samples; length is a multiple of frame_size.
+        frame_size (int): Samples per frame.
+
+    Returns:
+        tuple: (rms, zcr) arrays with one value per frame. zcr is the fraction
+        of adjacent samples that change sign (0 to 1).
+    """
+    frames = samples.reshape(-1, frame_size).astype(np.float32)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_size - 1)
+    return rms, zcr
+
+
+# ------------------- Voice Activity Detector -------------------
+
+class VoiceActivityDetector:
+    """
+    Streaming speech gate. Feed microphone chunks to `process()` and pass what it
+    returns to the recognizer.
+    """
+
+    def __init__(self, rate, frame_ms=20, energy_ratio=3.0, min_rms=150.0, zcr_threshold=0.25,
+                 hangover_ms=300, pre_roll_ms=200, noise_adapt=0.05):
+        """
+        Args:
+            rate (int): Sample rate in Hz (mono, 16-bit).
+            frame_ms (int): Frame length for the decision.
+            energy_ratio (float): Speech must be this much louder than the noise floor.
+            min_rms (float): Lowest speech level, for very quiet rooms.
+            zcr_threshold (float): Zero-crossing rate above which quieter frames
+                (down to half the energy threshold) still count as speech (fricatives).
+            hangover_ms (int): Audio still forwarded after the last speech frame.
+            pre_roll_ms (int): Audio forwarded from before the first speech frame.
+            noise_adapt (float): How fast the noise floor follows non-speech frames (0-1).
+        """
+        self.rate = rate
+        self.frame_size = int(rate * frame_ms / 1000)
+        self.frame_bytes = self.frame_size * SAMPLE_WIDTH
+        self.energy_ratio = energy_ratio
+        self.min_rms = min_rms
+        self.zcr_threshold = zcr_threshold
+        self.hangover_frames = max(0, hangover_ms // frame_ms)
+        self.noise_adapt = noise_adapt
+        self.noise_floor = None
+        self.in_speech = False
+        self._pending = b""
+        self._pre_roll = deque(maxlen=max(0, pre_roll_ms // frame_ms))
+        self._hangover = 0
+        self._heard_speech = False
+        self._silence_frames = 0  # since the last speech frame
+        self._utterance_frames = 0  # since the first speech frame after reset()
+        # Stats
+        self.frames = 0
+        self.speech_frames = 0
+        self.forwarded_frames = 0
+        self.segments = 0
+        self.processing_time = 0.0
+
+    def reset(self):
+        """Forgets the current segment (keeps the noise floor and stats)."""
+        self.in_speech = False
+        self._pending = b""
+        self._pre_roll.clear()
+        self._hangover = 0
+        self._heard_speech = False
+        self._silence_frames = 0
+        self._utterance_frames = 0
+
+    @property
+    def trailing_silence_ms(self):
+        """Silence since the last speech frame (0 while talking or before any speech)."""
+        return self._silence_frames * self.frame_size * 1000 / self.rate
+
+    @property
+    def utterance_ms(self):
+        """Audio since the first speech frame after reset() (0 before any speech)."""
+        return self._utterance_frames * self.frame_size * 1000 / self.rate
+
+    def classify(self, pcm):
+        """
+        Labels whole frames as speech or not (no hangover, no state besides the noise floor).
+
+        Args:
+            pcm (bytes): 16-bit mono audio, a multiple of `frame_bytes`.
+
+        Returns:
+            np.ndarray: One bool per frame.
+        """
+        samples = np.frombuffer(pcm, dtype="<i2")
+        rms, zcr = frame_features(samples, self.frame_size)
+        if self.noise_floor is None:
+            self.noise_floor = float(np.min(rms))
+        threshold = max(self.min_rms, self.noise_floor * self.energy_ratio)
+        speech = (rms >= threshold) | ((rms >= threshold / 2) & (zcr >= self.zcr_threshold))
+        quiet = rms[~speech]
+        if quiet.size:
+            # Follow slow changes in room noise, using frames that are not speech
+            self.noise_floor += self.noise_adapt * (float(np.median(quiet)) - self.noise_floor)
+        return speech
+
+    def process(self, chunk):
+        """
+        Gates one chunk of microphone audio.
+
+        Args:
+            chunk (bytes): 16-bit mono audio of any length.
+
+        Returns:
+            tuple: (audio, segment_ended). `audio` is what should be passed to the
+            recognizer (b"" during silence); `segment_ended` is True when a speech
+            segment finished in this chunk (hangover expired).
+        """
+        started = time.perf_counter()
+        data = self._pending + chunk
+        usable = len(data) - len(data) % self.frame_bytes
+        self._pending = data[usable:]
+        if usable == 0:
+            return b"", False
+
+        speech = self.classify(data[:usable])
+        forwarded = []
+        segment_ended = False
+        for index, is_speech in enumerate(speech):
+            frame = data[index * self.frame_bytes:(index + 1) * self.frame_bytes]
+            if is_speech:
+                self._heard_speech = True
+                self._silence_frames = 0
+            elif self._heard_speech:
+                self._silence_frames += 1
+            if self._heard_speech:
+                self._utterance_frames += 1
+            if is_speech:
+                if not self.in_speech:
+                    self.in_speech = True
+                    self.segments += 1
+                    forwarded.extend(self._pre_roll)
+                    self._pre_roll.clear()
+                self._hangover = self.hangover_frames
+                forwarded.append(frame)
+            elif self.in_speech and self._hangover > 0:
+                self._hangover -= 1
+                forwarded.append(frame)
+            else:
+                if self.in_speech:
+                    self.in_speech = False
+                    segment_ended = True
+                self._pre_roll.append(frame)
+
+        self.frames += len(speech)
+        self.speech_frames += int(np.count_nonzero(speech))
+        self.forwarded_frames += len(forwarded)
+        self.processing_time += time.perf_counter() - started
+        return b"".join(forwarded), segment_ended
+
+    def stats(self):
+        """
+        Returns:
+            dict: Frames seen, speech ratio, forwarded ratio (share of audio the
+            recognizer still has to decode), segments and VAD time per audio second.
+        """
+        audio_seconds = self.frames * self.frame_size / self.rate
+        return {
+            "frames": self.frames,
+            "speech_ratio": self.speech_frames / self.frames if self.frames else 0.0,
+            "forwarded_ratio": self.forwarded_frames / self.frames if self.frames else 0.0,
+            "segments": self.segments,
+            "vad_ms_per_audio_second": 1000 * self.processing_time / audio_seconds if audio_seconds else 0.0,
+        }
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the long-lived API client layer
+Compares a fresh OpenAI client per turn against the shared ClientPool client,
+using a local stub server that charges a fixed delay for every new connection
+(standing in for the TCP + TLS handshake of the real API).
+
+Usage: python3 bench_llm_connections.py [turns] [handshake_ms]
+"""
+
+import sys
+import os
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.llm_clients import ClientPool
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers /v1/models and counts connections; new connections pay `handshake_delay`."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive
+    handshake_delay = 0.05
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        # Avoid Nagle/delayed-ACK stalls between the header and body writes
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        type(self).connections += 1
+        time.sleep(self.handshake_delay)
+
+    def do_GET(self):
+        body = json.dumps({"object": "list", "data": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_turns(get_client, turns):
+    """Runs one cheap request per turn and returns per-turn latencies in ms."""
+    latencies = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        get_client().models.list()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main():
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    StubHandler.handshake_delay = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+
+    print("Emma Robot - API Connection Benchmark")
+    print("=" * 50)
+    print(f"Turns: {turns}, simulated handshake: {StubHandler.handshake_delay * 1000:.0f} ms")
+
+    # Before: a new client (and connection) for every turn
+    StubHandler.connections = 0
+    fresh = run_turns(lambda: ClientPool(openai_api_key="stub", openai_base_url=base_url).openai, turns)
+    fresh_connections = StubHandler.connections
+
+    # After: one pooled client, warmed up before the first turn
+    StubHandler.connections = 0
+    pool = ClientPool(openai_api_key="stub", openai_base_url=base_url)
+    pool.prewarm(background=False)
+    pooled = run_turns(lambda: pool.openai, turns)
+    pooled_connections = StubHandler.connections
+
+    server.shutdown()
+
+    for name, latencies, connections in [("fresh client/turn", fresh, fresh_connections),
+                                         ("pooled + prewarm", pooled, pooled_connections)]:
+        ordered = sorted(latencies)
+        print(f"{name:>18}: first {latencies[0]:7.1f} ms | median {ordered[len(ordered) // 2]:7.1f} ms"
+              f" | max {ordered[-1]:7.1f} ms | connections {connections}")
+
+    saved = (sum(fresh) - sum(pooled)) / turns
+    print(f"\nConnection setup saved per turn: {saved:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark for hedged LLM requests
+Runs the same questions against local OpenAI-compatible stub servers with
+injected latency, hangs and errors, once with the primary backend alone and
+once through the HedgedDispatcher with a fallback backend, and compares the
+time to first text and the number of failed turns.
+
+Usage: python3 bench_llm_hedging.py [requests] [seed]
+"""
+
+import sys
+import os
+import json
+import random
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.llm_dispatcher import HedgedDispatcher, LLMUnavailable, openai_chat_backend
+
+
+class StubChatServer:
+    """
+    OpenAI-compatible /v1/chat/completions stub (streaming) with injected faults.
+
+    Each request waits a log-normal delay before the first chunk; `hang_rate`
+    of the requests hang for `hang_s` instead, and `error_rate` answer HTTP 500.
+    """
+
+    def __init__(self, median_s=0.05, sigma=0.5, hang_rate=0.0, hang_s=5.0, error_rate=0.0,
+                 answer="Hello from the stub. How can I help?", seed=0):
+        self.median_s = median_s
+        self.sigma = sigma
+        self.hang_rate = hang_rate
+        self.hang_s = hang_s
+        self.error_rate = error_rate
+        self.answer = answer
+        self.random = random.Random(seed)
+        self.requests = []  # parsed request bodies
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                delay, fail = stub._draw()
+                with stub._lock:
+                    stub.requests.append(body)
+                time.sleep(delay)
+                if fail:
+                    payload = json.dumps({"error": {"message": "injected failure"}}).encode()
+                    self.send_response(500)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                try:
+                    for word in stub.answer.split(" "):
+                        chunk = {"id": "stub", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+                                 "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                        self.wfile.flush()
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client cancelled
+                self.close_connection = True
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def _draw(self):
+        with self._lock:
+            roll = self.random.random()
+            delay = self.median_s * self.random.lognormvariate(0, self.sigma)
+        if roll < self.hang_rate:
+            return self.hang_s, False
+        if roll < self.hang_rate + self.error_rate:
+            return delay, True
+        return delay, False
+
+    def backend(self, model="stub-model", timeout=None, history=None):
+        """Returns an openai_chat_backend talking to this stub."""
+        from openai import OpenAI
+        client = OpenAI(api_key="stub", base_url=self.base_url)
+        return openai_chat_backend(client, model, history=history, timeout=timeout)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def run(dispatcher, requests):
+    """Returns (times to first text in s, failed turns)."""
+    times, failures = [], 0
+    for turn in range(requests):
+        started = time.monotonic()
+        try:
+            stream = dispatcher.stream(f"question {turn}")
+            next(stream)
+            times.append(time.monotonic() - started)
+            stream.close()
+        except (LLMUnavailable, StopIteration):
+            failures += 1
+    return times, failures
+
+
+def describe(name, times, failures):
+    ordered = sorted(times)
+    pick = lambda q: 1000 * ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else float("nan")
+    print(f"{name:>16}: p50 {pick(0.5):6.0f} ms | p90 {pick(0.9):6.0f} ms | p99 {pick(0.99):6.0f} ms"
+          f" | max {1000 * max(ordered, default=0):6.0f} ms | failed turns {failures}")
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    deadline = 2.0
+
+    # Primary: usually fast, with a heavy tail, hangs and errors; fallback: a bit slower but steady
+    primary = StubChatServer(median_s=0.08, sigma=0.8, hang_rate=0.03, hang_s=5.0, error_rate=0.03, seed=seed)
+    fallback = StubChatServer(median_s=0.15, sigma=0.3, seed=seed + 1)
+
+    print("Emma Robot - Hedged LLM Benchmark")
+    print("=" * 50)
+    print(f"Requests: {requests}, primary: 3% hangs + 3% errors, deadline {deadline:g}s")
+
+    alone = HedgedDispatcher([("primary", primary.backend(timeout=deadline))], first_output_deadline_s=deadline)
+    describe("primary only", *run(alone, requests))
+
+    hedged = HedgedDispatcher([("primary", primary.backend(timeout=deadline)),
+                               ("fallback", fallback.backend(timeout=deadline))],
+                              hedge_percentile=90, initial_hedge_s=0.5, min_hedge_s=0.1,
+                              first_output_deadline_s=deadline)
+    describe("hedged", *run(hedged, requests))
+    stats = hedged.stats()
+    print(f"\nHedges fired: {stats['hedges']} ({stats['hedges'] / requests:.0%}), wins: {stats['wins']},"
+          f" hedge threshold now {stats['hedge_threshold_s'] * 1000:.0f} ms")
+
+    primary.close()
+    fallback.close()
+
+
+if __name__ == "__main__":
+    main()
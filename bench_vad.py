@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the voice-activity gate in front of Vosk
+Runs WAV files (16-bit mono) through the VAD in microphone-sized chunks and
+reports how much audio still reaches the recognizer. With Vosk and a model
+installed it also measures decoder CPU time with and without the gate.
+
+Usage: python3 bench_vad.py [wav files...]
+       python3 bench_vad.py --make-fixtures   (rewrites test_fixtures/vad)
+"""
+
+import sys
+import os
+import json
+import time
+import wave
+
+import numpy as np
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.vad import VoiceActivityDetector
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_fixtures", "vad")
+CHUNK_FRAMES = 2048  # AUDIO_CHUNK_SIZE
+
+
+def read_wav(path):
+    """Returns (pcm bytes, sample rate) of a 16-bit mono WAV file."""
+    with wave.open(path, "rb") as wav:
+        assert wav.getsampwidth() == 2 and wav.getnchannels() == 1, "need 16-bit mono"
+        return wav.readframes(wav.getnframes()), wav.getframerate()
+
+
+def write_wav(path, samples, rate):
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.clip(samples, -32768, 32767).astype("<i2").tobytes())
+
+
+def make_fixtures(rate=16000):
+    """
+    Writes the WAV fixtures used by test_vad.py: room noise only, and two
+    utterances in the same noise with their labelled speech spans. The
+    utterances are synthetic (harmonic vowels with a syllable envelope and
+    fricative onsets) so the fixtures are reproducible and license-free.
+    """
+    rng = np.random.default_rng(7)
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+
+    def room_noise(seconds):
+        count = int(seconds * rate)
+        t = np.arange(count) / rate
+        hiss = np.convolve(rng.normal(0, 60, count), np.ones(4) / 4, mode="same")  # soft fan noise
+        hum = 40 * np.sin(2 * np.pi * 50 * t)  # mains hum
+        return hiss + hum
+
+    def utterance(seconds):
+        count = int(seconds * rate)
+        t = np.arange(count) / rate
+        f0 = 140 + 40 * np.sin(2 * np.pi * 0.7 * t)  # gliding pitch
+        phase = 2 * np.pi * np.cumsum(f0) / rate
+        voiced = sum(np.sin(k * phase) / k for k in range(1, 12))
+        syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 0.5  # ~4 syllables per second
+        signal = 2500 * voiced * (0.3 + 0.7 * syllables)
+        fricative = np.diff(rng.normal(0, 900, int(0.08 * rate) + 1))  # "s"-like onset
+        signal[:fricative.size] = fricative
+        return signal
+
+    write_wav(os.path.join(FIXTURE_DIR, "room_noise.wav"), room_noise(5.0), rate)
+
+    noise = room_noise(6.0)
+    spans = [(1.0, 2.2), (3.5, 4.6)]
+    for start, end in spans:
+        segment = utterance(end - start)
+        noise[int(start * rate):int(start * rate) + segment.size] += segment
+    write_wav(os.path.join(FIXTURE_DIR, "speech_in_noise.wav"), noise, rate)
+    with open(os.path.join(FIXTURE_DIR, "speech_in_noise.json"), "w") as f:
+        json.dump({"speech": spans}, f, indent=2)
+    print(f"Fixtures written to {FIXTURE_DIR}")
+
+
+def run_vad(pcm, rate, **kwargs):
+    """Feeds audio in microphone chunks; returns (detector, forwarded chunks)."""
+    vad = VoiceActivityDetector(rate, **kwargs)
+    chunk_bytes = CHUNK_FRAMES * 2
+    forwarded = []
+    for offset in range(0, len(pcm), chunk_bytes):
+        audio, _ = vad.process(pcm[offset:offset + chunk_bytes])
+        if audio:
+            forwarded.append(audio)
+    return vad, forwarded
+
+
+def decoder_seconds(chunks, rate):
+    """CPU seconds Vosk spends on the chunks, or None without Vosk or a model."""
+    try:
+        import vosk
+        from config import VOSK_MODEL_PATH
+        model = vosk.Model(VOSK_MODEL_PATH)
+    except Exception:
+        return None
+    recognizer = vosk.KaldiRecognizer(model, rate)
+    started = time.process_time()
+    for chunk in chunks:
+        recognizer.AcceptWaveform(chunk)
+    recognizer.FinalResult()
+    return time.process_time() - started
+
+
+def main():
+    if "--make-fixtures" in sys.argv:
+        make_fixtures()
+        return
+    paths = sys.argv[1:] or sorted(
+        os.path.join(FIXTURE_DIR, name) for name in os.listdir(FIXTURE_DIR) if name.endswith(".wav"))
+
+    for path in paths:
+        pcm, rate = read_wav(path)
+        vad, forwarded = run_vad(pcm, rate)
+        stats = vad.stats()
+        print(f"\n{os.path.basename(path)} ({len(pcm) / 2 / rate:.1f} s)")
+        print(f"  speech frames:     {stats['speech_ratio']:.0%}")
+        print(f"  sent to Vosk:      {stats['forwarded_ratio']:.0%} ({stats['segments']} segments)")
+        print(f"  VAD cost:          {stats['vad_ms_per_audio_second']:.2f} ms per audio second")
+
+        all_chunks = [pcm[i:i + CHUNK_FRAMES * 2] for i in range(0, len(pcm), CHUNK_FRAMES * 2)]
+        full = decoder_seconds(all_chunks, rate)
+        if full is None:
+            print(f"  decoder CPU saved: ~{1 - stats['forwarded_ratio']:.0%} (Vosk model not available to measure)")
+            continue
+        gated = decoder_seconds(forwarded, rate)
+        print(f"  Vosk CPU:          {full * 1000:.0f} ms ungated, {gated * 1000:.0f} ms gated "
+              f"({1 - gated / full:.0%} saved)")
+
+
+if __name__ == "__main__":
+    main()
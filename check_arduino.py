@@ -38,7 +38,7 @@ def check_arduino_connection():
     # Try to connect
     try:
         print(f"🔌 Attempting to connect to {ARDUINO_PORT}...")
-        arduino = SerialObject(digits=3, portNo=ARDUINO_PORT)
+        arduino = SerialObject(digits=3, portNo=ARDUINO_PORT, baudRate=115200)
         print("✅ Arduino is CONNECTED and responding!")
         
         # Test communication
@@ -17,7 +17,7 @@ def check_arduino_connection():
     
     try:
         import serial
-        ser = serial.Serial('/dev/tty.usbmodem2101', 9600, timeout=1)
+        ser = serial.Serial('/dev/tty.usbmodem2101', 115200, timeout=1)
         time.sleep(2)
         
         # Check for startup message
@@ -43,7 +43,7 @@ def check_servo_communication():
     try:
         from cvzone.SerialModule import SerialObject
         
-        arduino = SerialObject(digits=3)
+        arduino = SerialObject(digits=3, baudRate=115200)
         print("✅ Serial communication established")
         
         # Test each servo individually
@@ -6,31 +6,108 @@ import os
 # Google Gemini API Configuration
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY_HERE")
 GEMINI_MODEL = "gemini-1.5-flash-latest"
+LLM_SENTENCE_PIPELINE = True                 # Stream the answer and speak it sentence by sentence
+LLM_PREWARM = True                           # Open API connections at startup with a cheap request
+LLM_SPECULATIVE = False                      # Start Gemini from stable Vosk partials (may waste some requests)
+LLM_SPECULATIVE_STABLE_FRAMES = 3            # Identical partial results in a row before speculating
+LLM_SPECULATIVE_MIN_WORDS = 3                # Shortest partial transcript worth speculating on
+CONVERSATION_MEMORY = True                   # Send earlier turns with each question
+CONVERSATION_TOKEN_BUDGET = 1500             # Max history tokens per request; older turns are summarized
+CONVERSATION_SUMMARY_WORDS = 80              # Length of the running summary of older turns
+LLM_HEDGING = True                           # Also ask OpenAI chat when Gemini is slow or fails; first answer wins
+OPENAI_CHAT_MODEL = "gpt-4o-mini"            # Fallback chat model (None disables the fallback)
+LLM_HEDGE_PERCENTILE = 90                    # Hedge once Gemini is slower than this percentile of its recent turns
+LLM_HEDGE_MAX_S = 4.0                        # ...but never wait longer than this before hedging
+LLM_DEADLINE_S = 10                          # Give up (and apologize) if no backend has answered by then
+LLM_UNAVAILABLE_REPLY = "Sorry, I can't answer that right now."
+LLM_LATENCY_BUDGET_S = 1.5                   # Filler + thinking gesture if Gemini is silent this long (None disables)
+LLM_THINKING_GESTURE = True                  # Tilt the head while waiting for Gemini
+LLM_FILLER_PHRASES = ["Let me think...", "Hmm, good question.", "One moment..."]
+LOCAL_INTENTS_ENABLED = True                 # Answer time/date/name/"repeat that" on the robot instead of Gemini
 
 # OpenAI Text-to-Speech Configuration (ChatGPT Quality)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "YOUR_OPENAI_API_KEY_HERE")
 OPENAI_TTS_MODEL = "tts-1"                   # OpenAI TTS model
 OPENAI_TTS_VOICE = "nova"                    # Voice options: alloy, echo, fable, onyx, nova, shimmer
+OPENAI_TTS_STREAMING = True                  # Play audio while it is still downloading
+OPENAI_TTS_STREAM_PREFILL_MS = 200           # Audio buffered before playback starts (absorbs network jitter)
+TTS_CACHE_ENABLED = True                     # Keep synthesized phrases on disk and replay them offline
+TTS_CACHE_DIR = "Resources/tts_cache"        # Cache folder (safe to delete)
+TTS_CACHE_MAX_MB = 50                        # Least recently used audio is evicted beyond this size
+TTS_PREWARM_PHRASES = [                      # Synthesized in the background at startup
+    "Hello! How can I assist you today?",
+    "Goodbye!",
+]
+OFFLINE_TTS_VOICE = None                     # pyttsx3 voice id or name (None: female English voice if available)
+OFFLINE_TTS_TIMEOUT_S = 30                   # Max wait for the pyttsx3 worker to render a sentence
 
 # VOSK Speech Recognition Configuration
 VOSK_MODEL_PATH = "Resources/vosk-model-en-us-0.22"
 VOSK_SAMPLE_RATE = 16000
+VOSK_TWO_TIER = True                                        # Small keyword model while idle, large model only in conversation
+VOSK_SMALL_MODEL_PATH = "Resources/vosk-model-small-en-us-0.15"  # Always loaded; must support grammars
+VOSK_WAKE_WORDS = ["hello emma", "hello", "emma"]           # Wake Emma up (exit keywords count only on their own)
+VOSK_LARGE_MODEL_UNLOAD_S = 300                             # Free the large model after this long asleep (None keeps it)
+CONVERSATION_TIMEOUT_S = 30                                 # Go back to sleep after this much silence
+
+# Hybrid speech recognition (UnifiedSpeechSystem(hybrid_stt=True)): VOSK and Google race on each utterance
+GOOGLE_STT_LANGUAGE = "en-US"
+STT_RACE_MIN_CONFIDENCE = 0.6    # Transcripts below this only win when nothing better arrives
+STT_RACE_PREFER = "google"       # Engine worth a short wait ("vosk", "google" or None for the fastest)
+STT_RACE_GRACE_MS = 400          # How long a confident VOSK transcript waits for the preferred engine (added latency when Google is slow)
+STT_RACE_TIMEOUT_S = 3           # Slower engines are ignored after this
+STT_RACE_OFFLINE_RETRY_S = 60    # After a network error Google is skipped (VOSK only) this long
+
+# Backend selection (UnifiedSpeechSystem): use the other STT/TTS backend while the preferred one is too slow
+BACKEND_SELECTION_ENABLED = True
+BACKEND_LATENCY_TARGETS = {"stt": 1.5, "tts": 1.5}   # Seconds (end of speech to text, text to first audio)
+BACKEND_LATENCY_PERCENTILE = 95                      # Recent latency percentile compared to the target
+BACKEND_MAX_ERROR_RATE = 0.2                         # Share of failed calls that also triggers a switch
+BACKEND_RETRY_AFTER_S = 120                          # Try the preferred backend again after this long
 
 # Audio Configuration
 AUDIO_CHUNK_SIZE = 2048
 AUDIO_CHANNELS = 1
 AUDIO_FORMAT = "paInt16"
+MIC_BUFFER_SECONDS = 10        # Audio kept by the always-on capture ring buffer
+MIC_PRE_ROLL_MS = 300          # Audio from just before each listen call that is still recognized
+
+# Voice activity gate in front of Vosk (saves decoder CPU while idle)
+VAD_ENABLED = True
+VAD_ENERGY_RATIO = 3.0    # Speech must be this much louder than the room noise
+VAD_HANGOVER_MS = 300     # Audio still sent to Vosk after speech stops (endpointing decides when it is final)
+VAD_PRE_ROLL_MS = 200     # Audio sent from just before speech starts
+
+# Endpointing (when the user has finished talking)
+ENDPOINT_TRAILING_SILENCE_MS = 500        # Silence after speech that ends an utterance
+ENDPOINT_MAX_UTTERANCE_MS = 15000         # Longer utterances are finalized anyway
+ENDPOINT_ADAPTIVE = True                  # Shorter timeout for short commands
+ENDPOINT_SHORT_COMMAND_SILENCE_MS = 250   # Trailing silence for short commands
+ENDPOINT_SHORT_COMMANDS = ["hello emma", "hello", "goodbye", "bye", "stop", "quit", "exit"]
+
+# Barge-in (interrupt Emma by talking while she speaks)
+BARGE_IN_ENABLED = True
+BARGE_IN_THRESHOLD_RATIO = 2.0   # User must be this much louder than Emma's echo in the mic
+BARGE_IN_MIN_RMS = 500           # Lowest detection level (16-bit RMS)
+BARGE_IN_MIN_SPEECH_MS = 200     # Voice needed before Emma stops talking
+BARGE_IN_CALIBRATION_MS = 300    # Playback time used to measure the echo level
 
 # Servo Configuration
-SERVO_DELAY = 0.001  # Delay between servo movements
-SERVO_DIGITS = 3     # Precision for servo positions
+SERVO_DIGITS = 3     # Precision for servo positions (ASCII protocol)
+SERVO_PROTOCOL = "binary"              # "binary" (7-byte frames with CRC) or "ascii" (cvzone format)
+SERVO_FRAME_RATE_HZ = 50               # Frames sent per second while moving
+SERVO_MAX_SPEED = 180                  # Average speed (degrees/second) when no duration is given
+SERVO_MOTION_PROFILE = "minimum_jerk"  # "linear", "trapezoidal" or "minimum_jerk"
+SERVO_FIRMWARE_INTERPOLATION = True    # Send target + duration and let the Arduino interpolate (binary only)
 
 # File Paths
 LISTEN_SOUND_PATH = "Resources/listen.mp3"
 CONVERT_SOUND_PATH = "Resources/convert.mp3"
 
 # Serial Communication
-SERIAL_BAUDRATE = 9600
+SERIAL_BAUDRATE = 115200  # Must match SERIAL_BAUD in emma_servo_control.ino
+SERVO_QUIET_MODE = True   # Firmware only reports when asked instead of acknowledging every move
+SERVO_STATUS_INTERVAL = 0.5  # Seconds between status requests in quiet mode
 SERIAL_TIMEOUT = 1
 ARDUINO_PORT = "/dev/cu.usbmodem2101"  # Arduino port (update if different)
 
@@ -38,6 +115,8 @@ ARDUINO_PORT = "/dev/cu.usbmodem2101"  # Arduino port (update if different)
 DEFAULT_LEFT_SERVO_POS = 180   # Left arm default position
 DEFAULT_RIGHT_SERVO_POS = 0    # Right arm default position
 DEFAULT_HEAD_SERVO_POS = 90    # Head default position
+HEAD_LOOK_LEFT_POS = 150       # Head angle for "look left"
+HEAD_LOOK_RIGHT_POS = 30       # Head angle for "look right"
 
 # Hello Gesture Configuration
 HELLO_WAVE_COUNT = 3           # Number of waves in hello gesture
@@ -33,7 +33,7 @@ def test_port_connection(port):
     print(f"\n🔌 Testing connection to {port}...")
     
     try:
-        ser = serial.Serial(port, 9600, timeout=2)
+        ser = serial.Serial(port, 115200, timeout=2)
         time.sleep(2)
         
         # Clear buffers
@@ -51,7 +51,7 @@ def test_port_connection(port):
         
         # Test sending command
         print(f"📤 Sending test command to {port}...")
-        ser.write(b"090090090")
+        ser.write(b"$090090090")
         time.sleep(1)
         
         # Read response
@@ -75,7 +75,7 @@ def test_cvzone_with_port(port):
         from cvzone.SerialModule import SerialObject
         
         # Try with explicit port
-        arduino = SerialObject(digits=3, port=port)
+        arduino = SerialObject(digits=3, portNo=port, baudRate=115200)
         print(f"✅ cvzone connected to {port}!")
         
         # Test sending data
@@ -129,6 +129,6 @@ if __name__ == "__main__":
         test_cvzone_with_port(best_port)
         
         print(f"\n✅ RECOMMENDED PORT: {best_port}")
-        print(f"Use this in your code: SerialObject(digits=3, port='{best_port}')")
+        print(f"Use this in config.py: ARDUINO_PORT = '{best_port}'")
     else:
         print("\n❌ No working Arduino ports found!")
@@ -38,8 +38,8 @@ def test_arduino_connection():
     
     try:
         # Try to connect with proper baud rate
-        print("🔌 Attempting to connect at 9600 baud...")
-        ser = serial.Serial(arduino_port, 9600, timeout=2)
+        print("🔌 Attempting to connect at 115200 baud...")
+        ser = serial.Serial(arduino_port, 115200, timeout=2)
         time.sleep(2)  # Wait for Arduino to initialize
         
         # Clear any existing data
@@ -60,7 +60,7 @@ def test_arduino_connection():
         
         # Test sending a simple command
         print("📤 Testing command: [90,90,90]")
-        ser.write(b"090090090")  # Send 3-digit format
+        ser.write(b"$090090090")  # Send cvzone ASCII format
         time.sleep(1)
         
         # Check for response
@@ -89,7 +89,7 @@ def test_cvzone_connection():
         from cvzone.SerialModule import SerialObject
         
         # Try to create SerialObject
-        arduino = SerialObject(digits=3)
+        arduino = SerialObject(digits=3, baudRate=115200)
         
         # Test if we can actually send data
         print("📤 Sending test command: [90,90,90]")
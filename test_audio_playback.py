@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Test script for the audio playback engine
+Uses a fake pygame.mixer whose sounds "play" for their length in real time
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.audio_playback import PlaybackEngine
+
+
+class FakeSound:
+    def __init__(self, file=None, buffer=None):
+        if buffer is not None:
+            self.length = len(buffer) / (24000 * 2)  # 24 kHz 16-bit mono
+        else:
+            data = file.read() if hasattr(file, "read") else file.encode()
+            self.length = len(data) / 1000  # 1 byte = 1 ms, to keep tests short
+
+    def get_length(self):
+        return self.length
+
+
+class FakeChannel:
+    def __init__(self):
+        self.sound = None
+        self.ends_at = 0
+
+    def play(self, sound):
+        self.sound = sound
+        self.ends_at = time.monotonic() + sound.get_length()
+
+    def stop(self):
+        self.sound = None
+
+    def get_busy(self):
+        if self.sound is not None and time.monotonic() >= self.ends_at:
+            self.sound = None
+        return self.sound is not None
+
+    def get_sound(self):
+        self.get_busy()
+        return self.sound
+
+
+class FakeMixer:
+    """Stands in for pygame.mixer"""
+
+    def __init__(self):
+        self.inits = 0
+        self.channels = [FakeChannel() for _ in range(8)]
+        self.Sound = FakeSound
+
+    def get_init(self):
+        return self.inits > 0
+
+    def init(self, **kwargs):
+        self.inits += 1
+
+    def set_num_channels(self, count):
+        pass
+
+    def set_reserved(self, count):
+        self.reserved = count
+
+    def Channel(self, index):
+        return self.channels[index]
+
+    def find_channel(self, force=False):
+        for channel in self.channels[self.reserved:]:
+            if not channel.get_busy():
+                return channel
+        return self.channels[self.reserved]
+
+    def stop(self):
+        for channel in self.channels:
+            channel.stop()
+
+    def quit(self):
+        self.inits = 0
+
+
+def test_completion_is_signalled_promptly():
+    """wait() returns within a few ms of the end of the sound, not on a 5-10 Hz poll"""
+    print("Testing completion signal...")
+    mixer = FakeMixer()
+    engine = PlaybackEngine(mixer=mixer)
+    start = time.monotonic()
+    handle = engine.play(b"x" * 120)  # 120 ms
+    assert time.monotonic() - start < 0.02, "play() should not block"
+    assert handle.wait(timeout=2)
+    elapsed = time.monotonic() - start
+    assert 0.12 <= elapsed < 0.16, elapsed
+    assert not handle.cancelled
+    engine.play(bytes(24000 * 2 // 10), audio_format="pcm").wait(timeout=2)  # 100 ms of PCM
+    assert mixer.inits == 1, "mixer must be initialized once"
+    print(f"✓ Playback end signalled after {elapsed * 1000:.0f} ms")
+
+
+def test_cancel_mid_utterance():
+    """stop() cuts the utterance off and releases waiters right away"""
+    print("\nTesting cancel...")
+    engine = PlaybackEngine(mixer=FakeMixer())
+    handle = engine.play(b"x" * 2000)
+    called = []
+    handle.add_done_callback(lambda h: called.append(h.cancelled))
+    time.sleep(0.05)
+    assert engine.speaking
+    start = time.monotonic()
+    engine.stop()
+    assert handle.wait(timeout=1)
+    assert time.monotonic() - start < 0.05
+    assert handle.cancelled and called == [True]
+    assert not engine.speaking
+    print("✓ Speech stops mid-utterance")
+
+
+def test_effects_overlap_speech():
+    """Preloaded effects play on their own channels while Emma talks"""
+    print("\nTesting effect channels...")
+    mixer = FakeMixer()
+    engine = PlaybackEngine(mixer=mixer)
+    engine.load_effect("listen", "x" * 50)
+    speech = engine.play(b"x" * 300)
+    effect = engine.play_effect("listen")
+    assert effect.wait(timeout=1) and not speech.done()
+    assert mixer.channels[0].sound is not None, "effect must not take the speech channel"
+    replaced = engine.play(b"x" * 10)
+    assert speech.wait(timeout=1) and speech.cancelled, "a new utterance interrupts the old one"
+    assert replaced.wait(timeout=1) and not replaced.cancelled
+    print("✓ Effects and speech use separate channels")
+
+
+def test_old_handle_never_stops_new_utterance():
+    """A cancelled utterance does not stop the one that replaced it on the speech channel"""
+    print("\nTesting channel ownership...")
+    mixer = FakeMixer()
+    engine = PlaybackEngine(mixer=mixer)
+    for _ in range(20):
+        old = engine.play(b"x" * 500)
+        new = engine.play(b"x" * 500)
+        old.cancel()  # late cancel while the new utterance already owns the channel
+        assert old.wait(timeout=1) and old.cancelled
+        time.sleep(0.01)
+        assert not new.done() and mixer.channels[0].sound is not None, "new utterance was stopped"
+        engine.stop()
+        assert new.wait(timeout=1)
+    print("✓ Only the handle that owns the channel stops it")
+
+
+def main():
+    """Run audio playback tests"""
+    print("Emma Robot - Audio Playback Test")
+    print("=" * 40)
+
+    tests = [
+        test_completion_is_signalled_promptly,
+        test_cancel_mid_utterance,
+        test_effects_overlap_speech,
+        test_old_handle_never_stops_new_utterance,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming TTS playback
+Tests the jitter buffer without requiring an audio device or API key
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.audio_streaming import JitterBuffer
+
+
+def test_prefill():
+    """Playback stays silent until the prefill target is buffered"""
+    print("Testing jitter buffer prefill...")
+    buffer = JitterBuffer(prefill_bytes=8)
+    buffer.write(b"\x01\x01\x01\x01")
+    assert buffer.read(4) == bytes(4), "played before prefill was reached"
+    buffer.write(b"\x02\x02\x02\x02")
+    assert buffer.read(4) == b"\x01\x01\x01\x01"
+    assert buffer.first_audio_at is not None
+    print("✓ Prefill holds playback back")
+
+
+def test_underrun_rebuffers():
+    """A dry buffer pads with silence and waits for the prefill again"""
+    print("\nTesting jitter buffer underrun...")
+    buffer = JitterBuffer(prefill_bytes=4)
+    buffer.write(b"\x01\x01\x01\x01\x02\x02")
+    assert buffer.read(4) == b"\x01\x01\x01\x01"
+    assert buffer.read(4) == b"\x02\x02\x00\x00"
+    assert buffer.underruns == 1
+    buffer.write(b"\x03\x03")
+    assert buffer.read(2) == bytes(2), "resumed before refilling"
+    print("✓ Underrun triggers rebuffering")
+
+
+def test_close_drains():
+    """Closing plays the remaining audio, then signals the end"""
+    print("\nTesting jitter buffer close...")
+    buffer = JitterBuffer(prefill_bytes=100)
+    buffer.write(b"\x05\x05")
+    buffer.close()
+    assert buffer.read(4) == b"\x05\x05\x00\x00", "short tail was not flushed"
+    assert buffer.read(4) is None
+    assert buffer.underruns == 0
+    print("✓ Closed stream drains and ends")
+
+
+def test_clear_cancels():
+    """Clearing drops buffered audio immediately"""
+    print("\nTesting jitter buffer cancel...")
+    buffer = JitterBuffer(prefill_bytes=2)
+    buffer.write(b"\x07" * 64)
+    buffer.clear()
+    assert buffer.read(4) is None
+    print("✓ Cancel drops pending audio")
+
+
+def main():
+    """Run streaming playback tests"""
+    print("Emma Robot - Streaming Playback Test")
+    print("=" * 40)
+
+    tests = [
+        test_prefill,
+        test_underrun_rebuffers,
+        test_close_drains,
+        test_clear_cancels,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Test script for the backend registry and latency-based selection
+Uses fake backends that report chosen latencies, so no audio device, model
+or API key is needed
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.backend_registry import BackendRegistry, LatencyPolicy
+
+
+class FakeBackend:
+    """Returns (name, latency) with a settable latency, or raises `error`"""
+
+    def __init__(self, name, latency=0.1, error=None):
+        self.name = name
+        self.latency = latency
+        self.error = error
+        self.loads = 0
+        self.calls = []
+
+    def load(self):
+        self.loads += 1
+
+    def run(self, text):
+        self.calls.append(text)
+        if self.error is not None:
+            raise self.error
+        return self.name, self.latency
+
+
+def make_registry(*fakes, policy=None):
+    registry = BackendRegistry()
+    for fake in fakes:
+        registry.register("tts", fake.name, fake.run, load=fake.load)
+    if policy is not None:
+        registry.set_policy("tts", policy)
+    return registry
+
+
+def test_backends_load_lazily():
+    """Only the backends that are used get loaded; a failed load is skipped"""
+    print("Testing lazy loading...")
+    openai, pyttsx3 = FakeBackend("openai"), FakeBackend("pyttsx3")
+    registry = make_registry(openai, pyttsx3, policy=LatencyPolicy(1.0))
+    assert registry.call("tts", "hello") == "openai"
+    assert registry.call("tts", "again") == "openai"
+    assert openai.loads == 1 and pyttsx3.loads == 0
+    assert registry.stats()["tts"]["backends"]["pyttsx3"]["loaded"] is False
+
+    def broken():
+        raise ImportError("no module named pyttsx3")
+
+    registry = BackendRegistry()
+    registry.register("tts", "pyttsx3", FakeBackend("pyttsx3").run, load=broken)
+    registry.register("tts", "openai", openai.run)
+    registry.set_policy("tts", LatencyPolicy(1.0))
+    assert registry.call("tts", "hi") == "openai"
+    assert [backend.name for backend in registry.candidates("tts")] == ["openai"]
+    print("✓ Backends load on first use")
+
+
+def test_slow_backend_is_replaced_and_retried():
+    """A backend whose p95 crosses the target is replaced, and tried again later"""
+    print("\nTesting switch on latency...")
+    now = [0.0]
+    openai, pyttsx3 = FakeBackend("openai", latency=0.4), FakeBackend("pyttsx3", latency=0.2)
+    registry = make_registry(openai, pyttsx3, policy=LatencyPolicy(1.0, percentile=95, min_samples=3,
+                                                                     retry_after_s=60, clock=lambda: now[0]))
+    for _ in range(3):
+        assert registry.call("tts", "fast") == "openai"
+    openai.latency = 2.5
+    results = [registry.call("tts", "slow") for _ in range(3)]
+    # One slow call already puts the p95 of a small window over the target
+    assert results[0] == "openai" and results[-1] == "pyttsx3", results
+    assert registry.stats()["tts"]["active"] == "pyttsx3" and registry.stats()["tts"]["switches"] == 1
+
+    # Recovered: used again once the retry period has passed
+    openai.latency = 0.3
+    now[0] = 61.0
+    assert registry.call("tts", "later") == "openai"
+    assert registry.stats()["tts"]["switches"] == 2
+    print("✓ Slow backend is demoted and retried after the retry period")
+
+
+def test_failures_fall_back():
+    """A failing call is retried on the next backend, and errors count against the backend"""
+    print("\nTesting failure fallback...")
+    openai = FakeBackend("openai", error=ConnectionError("no network"))
+    pyttsx3 = FakeBackend("pyttsx3")
+    registry = make_registry(openai, pyttsx3, policy=LatencyPolicy(1.0, max_error_rate=0.2, min_samples=3))
+    for turn in range(5):
+        assert registry.call("tts", f"turn {turn}") == "pyttsx3"
+    # After min_samples errors the failing backend is no longer tried first
+    assert len(openai.calls) == 3, openai.calls
+    stats = registry.stats()["tts"]["backends"]["openai"]
+    assert stats["errors"] == 3 and stats["error_rate"] == 1.0
+
+    # Without a policy only the preferred backend is used and its errors propagate
+    registry = make_registry(FakeBackend("openai", error=ConnectionError("no network")), FakeBackend("pyttsx3"))
+    try:
+        registry.call("tts", "hi")
+        raise AssertionError("expected ConnectionError")
+    except ConnectionError:
+        pass
+    print("✓ Failures fall back to the next backend")
+
+
+def test_all_slow_uses_fastest():
+    """When every backend misses the target the fastest one is used"""
+    print("\nTesting all backends slow...")
+    openai, pyttsx3 = FakeBackend("openai", latency=3.0), FakeBackend("pyttsx3", latency=2.0)
+    registry = make_registry(openai, pyttsx3, policy=LatencyPolicy(1.0, min_samples=2))
+    for _ in range(2):
+        registry.call("tts", "x")
+    registry.call("tts", "x")  # pyttsx3 is not judged yet
+    registry.call("tts", "x")
+    assert registry.select("tts").name == "pyttsx3"
+    assert [backend.name for backend in registry.candidates("tts")] == ["pyttsx3", "openai"]
+    try:
+        BackendRegistry().select("stt")
+        raise AssertionError("expected LookupError")
+    except LookupError:
+        pass
+    print(f"✓ Fastest backend used: {registry.stats()['tts']}")
+
+
+def main():
+    """Run backend registry tests"""
+    print("Emma Robot - Backend Registry Test")
+    print("=" * 40)
+
+    tests = [
+        test_backends_load_lazily,
+        test_slow_backend_is_replaced_and_retried,
+        test_failures_fall_back,
+        test_all_slow_uses_fastest,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
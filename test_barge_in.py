@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for barge-in detection
+Writes synthetic echo and voice into the capture ring buffer, no microphone needed
+"""
+
+import sys
+import os
+import math
+import struct
+import threading
+import time
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.barge_in import BargeInMonitor, frame_rms
+from Software.mic_capture import MicrophoneCapture
+
+RATE = 16000
+
+
+def tone(amplitude, ms, freq=220):
+    """16-bit mono sine wave"""
+    count = RATE * ms // 1000
+    return struct.pack(f"<{count}h", *(int(amplitude * math.sin(2 * math.pi * freq * i / RATE)) for i in range(count)))
+
+
+def make_monitor(**kwargs):
+    capture = MicrophoneCapture(rate=RATE, channels=1, chunk_size=320, buffer_seconds=5.0)
+    return capture, BargeInMonitor(capture, min_speech_ms=100, pre_roll_ms=0, **kwargs)
+
+
+def feed(monitor, capture, audio, playing=True):
+    """Runs audio through process() in 20 ms frames; returns True on barge-in"""
+    for offset in range(0, len(audio), monitor.frame_bytes):
+        pos = capture.ring.write_pos
+        frame = audio[offset:offset + monitor.frame_bytes]
+        capture.ring.write(frame)
+        if monitor.process(pos, frame, playing):
+            return True
+    return False
+
+
+def test_rms():
+    """RMS of a square wave and of silence"""
+    print("Testing RMS...")
+    assert frame_rms(struct.pack("<4h", 1000, -1000, 1000, -1000)) == 1000
+    assert frame_rms(bytes(640)) == 0
+    print("✓ RMS levels are correct")
+
+
+def test_echo_is_gated_out():
+    """Emma's own voice at the calibrated level never triggers barge-in"""
+    print("\nTesting echo gating...")
+    capture, monitor = make_monitor()
+    assert not feed(monitor, capture, tone(3000, 300))  # calibration on playback
+    assert monitor.threshold >= 2 * frame_rms(tone(3000, 20)) * 0.99
+    assert not feed(monitor, capture, tone(3000, 2000, freq=330))
+    print(f"✓ Echo stays below threshold ({monitor.threshold:.0f})")
+
+
+def test_quiet_start_then_louder_echo():
+    """Leading silence does not calibrate, and a reply that gets louder later stays gated"""
+    print("\nTesting quiet calibration window...")
+    capture, monitor = make_monitor()
+    assert not feed(monitor, capture, bytes(RATE * 2 * 400 // 1000))  # TTS leading silence
+    assert monitor.threshold is None, "silent frames must not calibrate"
+    assert not feed(monitor, capture, tone(1500, 300))
+    for amplitude in (2000, 2600, 3300, 4000):  # crescendo later in the reply
+        assert not feed(monitor, capture, tone(amplitude, 500)), f"echo at {amplitude} triggered"
+    assert monitor.threshold >= 2 * frame_rms(tone(4000, 20)) * 0.9
+    # Playback that stays quiet still ends calibration (at min_rms)
+    capture, monitor = make_monitor()
+    feed(monitor, capture, bytes(RATE * 2 * 2000 // 1000))
+    assert monitor.threshold == monitor.min_rms
+    print(f"✓ Echo estimate follows the playback ({monitor.threshold:.0f})")
+
+
+def test_user_voice_interrupts():
+    """A louder voice for min_speech_ms triggers, and the onset position is reported"""
+    print("\nTesting barge-in trigger...")
+    capture, monitor = make_monitor()
+    feed(monitor, capture, tone(2000, 400))
+    assert not feed(monitor, capture, tone(12000, 60))  # too short: a click or bump
+    feed(monitor, capture, tone(2000, 100))
+    onset = capture.ring.write_pos
+    assert feed(monitor, capture, tone(12000, 200))
+    assert monitor.speech_start_pos == onset
+    print("✓ User speech interrupts and keeps its first syllables")
+
+
+def test_only_playback_is_analysed():
+    """Audio captured while nothing plays neither calibrates nor triggers"""
+    print("\nTesting playback gating...")
+    capture, monitor = make_monitor()
+    assert not feed(monitor, capture, tone(12000, 500), playing=False)
+    assert monitor.threshold is None
+    print("✓ Only audio during playback is analysed")
+
+
+def test_monitor_thread_calls_handler():
+    """The background monitor stops playback and returns the resume position"""
+    print("\nTesting monitor thread...")
+    capture, monitor = make_monitor()
+    interrupted = threading.Event()
+    monitor.start(interrupted.set)
+    time.sleep(0.02)
+    capture.ring.write(tone(2000, 300))
+    capture.ring.write(tone(15000, 300))
+    assert interrupted.wait(timeout=2)
+    resume = monitor.stop()
+    assert resume is not None and resume >= RATE * 2 * 300 // 1000
+    monitor.start(lambda: None)
+    assert monitor.stop() is None, "no barge-in without speech"
+    print("✓ Handler fires and listening can resume at the onset")
+
+
+def main():
+    """Run barge-in tests"""
+    print("Emma Robot - Barge-in Test")
+    print("=" * 40)
+
+    tests = [
+        test_rms,
+        test_echo_is_gated_out,
+        test_quiet_start_then_louder_echo,
+        test_user_voice_interrupts,
+        test_only_playback_is_analysed,
+        test_monitor_thread_calls_handler,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
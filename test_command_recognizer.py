@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Test script for local voice commands
+Uses a fake grammar recognizer, so no Vosk model is needed
+"""
+
+import sys
+import os
+import json
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.command_recognizer import CommandRecognizer, DEFAULT_COMMANDS
+
+
+class FakeVosk:
+    """Grammar recognizer that "hears" scripted results, one per utterance"""
+
+    def __init__(self, utterances):
+        vosk = self
+        self.utterances = list(utterances)
+        self.recognizer = None
+
+        class KaldiRecognizer:
+            def __init__(self, model, rate, grammar):
+                self.grammar = json.loads(grammar)
+                self.chunks = 0
+                self.resets = 0
+                vosk.recognizer = self
+
+            def AcceptWaveform(self, data):
+                self.chunks += 1
+                return False
+
+            def FinalResult(self):
+                return json.dumps({"text": vosk.utterances.pop(0)})
+
+            def Reset(self):
+                self.resets += 1
+
+        self.KaldiRecognizer = KaldiRecognizer
+
+
+def test_grammar_contains_all_phrases():
+    """Every phrase of the intent table is in the grammar, plus [unk]"""
+    print("Testing command grammar...")
+    vosk = FakeVosk([])
+    configured = []
+    commands = CommandRecognizer("small-model", 16000, configure=configured.append, vosk_module=vosk)
+    grammar = vosk.recognizer.grammar
+    phrases = [phrase for phrases in DEFAULT_COMMANDS.values() for phrase in phrases]
+    assert sorted(grammar[:-1]) == sorted(phrases) and grammar[-1] == "[unk]"
+    assert configured == [vosk.recognizer] and commands.recognizer is vosk.recognizer
+    print(f"✓ Grammar has {len(grammar)} entries")
+
+
+def test_exact_matches_only():
+    """Only whole utterances match, so "maybe" is not a goodbye"""
+    print("\nTesting intent matching...")
+    commands = CommandRecognizer(None, 16000)
+    assert commands.match("Hello, Emma!") == "hello"
+    assert commands.match("goodbye") == "goodbye"
+    assert commands.match("look to the left") == "look_left"
+    assert commands.match("Raise your hand.") == "raise_hand"
+    assert commands.match("maybe") is None
+    assert commands.match("hello emma how are you today") is None
+    assert commands.match("[unk] goodbye") is None
+    assert commands.match("") is None
+    print("✓ Only complete command phrases match")
+
+
+def test_grammar_recognizer_decides():
+    """The grammar result is used even when dictation heard something slightly different"""
+    print("\nTesting grammar decoding...")
+    vosk = FakeVosk(["look left", "[unk] [unk] left [unk]"])
+    commands = CommandRecognizer("small-model", 16000, vosk_module=vosk)
+    for _ in range(3):
+        commands.accept(b"\x00" * 640)
+    assert vosk.recognizer.chunks == 3
+    assert commands.finalize("look lift") == ("look_left", "look left")
+    assert commands.finalize("what is on the left side") == (None, "[unk] [unk] left [unk]")
+    commands.reset()
+    assert vosk.recognizer.resets == 1
+    assert commands.stats() == {"utterances": 2, "matches": {"look_left": 1}}
+    print("✓ Commands are decided by the grammar recognizer")
+
+
+def test_custom_table_without_model():
+    """Without a small model, dictation transcripts are matched against a custom table"""
+    print("\nTesting custom command table...")
+    commands = CommandRecognizer(None, 16000, commands={"dance": ["dance", "do a dance"]})
+    assert commands.finalize("Do a dance!") == ("dance", "Do a dance!")
+    assert commands.finalize("hello") == (None, "hello")
+    commands.reset()  # no recognizer: nothing to do
+    print("✓ Custom tables work without a grammar model")
+
+
+def main():
+    """Run local command tests"""
+    print("Emma Robot - Local Command Test")
+    print("=" * 40)
+
+    tests = [
+        test_grammar_contains_all_phrases,
+        test_exact_matches_only,
+        test_grammar_recognizer_decides,
+        test_custom_table_without_model,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
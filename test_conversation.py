@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test script for conversation memory
+Uses a fake Gemini model, so no API key is needed
+"""
+
+import sys
+import os
+import threading
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.conversation import ConversationSession, estimate_tokens
+
+
+class FakeModel:
+    """Records the chat histories it was given; answers with a fixed-size reply"""
+
+    def __init__(self, answer="This is a reasonably long answer from the model. " * 3):
+        self.answer = answer
+        self.histories = []
+        model = self
+
+        class Chunk:
+            def __init__(self, text):
+                self.text = text
+
+        class Chat:
+            def __init__(self, history):
+                model.histories.append(history)
+
+            def send_message(self, text, stream=False):
+                if stream:
+                    return [Chunk(piece) for piece in model.answer.split(". ")]
+                return Chunk(model.answer)
+
+        self.Chat = Chat
+
+    def start_chat(self, history):
+        return self.Chat(history)
+
+
+def short_summary(summary, turns, max_words):
+    """Fake summarizer: keeps a bounded list of the questions asked"""
+    questions = (summary.split("; ") if summary else []) + [user for user, _ in turns]
+    return "; ".join(questions)[-max_words * 6:]
+
+
+def test_history_is_sent():
+    """Earlier turns are sent with the next question"""
+    print("Testing multi-turn history...")
+    model = FakeModel("Nice to meet you, Sam.")
+    session = ConversationSession(model, summarize=short_summary, background=False)
+    session.send("My name is Sam")
+    assert model.histories[-1] == []
+    session.record("My name is Sam", "Nice to meet you, Sam.")
+    assert "".join(session.stream("What is my name?")) == "Nice to meet you, Sam."
+    assert model.histories[-1] == [
+        {"role": "user", "parts": ["My name is Sam"]},
+        {"role": "model", "parts": ["Nice to meet you, Sam."]},
+    ]
+    print("✓ Previous turns are part of the chat history")
+
+
+def test_prompt_stays_flat():
+    """Over a long session the prompt size stays under the budget instead of growing"""
+    print("\nTesting token budget over 60 turns...")
+    model = FakeModel()
+    session = ConversationSession(model, token_budget=300, summary_words=40,
+                                  summarize=short_summary, background=False)
+    for turn in range(60):
+        question = f"Question number {turn} about something interesting?"
+        answer = session.send(question)
+        session.record(question, answer)
+    stats = session.stats()
+    assert stats["turns"] == 60 and stats["summaries"] > 0
+    early = session.turn_tokens[5][0]
+    late = [prompt for prompt, _ in session.turn_tokens[-20:]]
+    assert max(late) <= 300 + 60 + estimate_tokens("Question number 59 about something interesting?")
+    assert max(late) - min(late) < 80, late
+    assert stats["max_turn_prompt_tokens"] < 2 * early + 100
+    history = model.histories[-1]
+    assert history[0]["parts"][0].startswith("Summary of our conversation so far:")
+    assert "Question number 0 " not in str(history)  # long gone from the verbatim history
+    print(f"✓ Prompt tokens stay flat: turn 6 {early}, last turns {min(late)}-{max(late)}")
+
+
+def test_background_summary_does_not_block():
+    """Summaries run after the turn; turns being summarized are still sent meanwhile"""
+    print("\nTesting background summarization...")
+    release = threading.Event()
+    calls = []
+
+    def slow_summary(summary, turns, max_words):
+        calls.append([user for user, _ in turns])
+        release.wait(2)
+        return short_summary(summary, turns, max_words)
+
+    session = ConversationSession(FakeModel(), token_budget=40, summarize=slow_summary)
+    for turn in range(4):
+        session.record(f"question {turn}", "An answer that takes up a fair number of tokens in the history.")
+    history_text = str(session.history())
+    assert "question 0" in history_text  # still being summarized: sent verbatim
+    release.set()
+    session.wait(2)
+    assert session.summary and "question 0" in session.summary
+    assert "question 0" not in str(session.history()[2:])
+    assert len(calls) >= 1
+    print(f"✓ Summarized in the background ({len(calls)} batches)")
+
+
+def test_failed_summary_keeps_turns():
+    """If the summary request fails, the turns stay verbatim instead of being lost"""
+    print("\nTesting summary failure...")
+
+    def broken(summary, turns, max_words):
+        raise RuntimeError("network down")
+
+    session = ConversationSession(FakeModel(), token_budget=50, summarize=broken, background=False)
+    for turn in range(3):
+        session.record(f"question {turn}", "An answer that takes up a fair number of tokens.")
+    assert [user for user, _ in session.turns] == ["question 0", "question 1", "question 2"]
+    session.record("ignored", "")  # nothing was said
+    assert session.stats()["turns"] == 3
+    session.reset()
+    assert session.history() == [] and session.stats()["turns"] == 0
+    print("✓ Turns are kept when summarizing fails")
+
+
+def test_reset_discards_running_summary():
+    """A summary still running when the conversation is reset never reaches the new one"""
+    print("\nTesting reset during a summary...")
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow_summary(summary, turns, max_words):
+        started.set()
+        release.wait(2)
+        return short_summary(summary, turns, max_words)
+
+    session = ConversationSession(FakeModel(), token_budget=40, summarize=slow_summary)
+    for turn in range(4):
+        session.record(f"old question {turn}", "An answer that takes up a fair number of tokens in the history.")
+    assert started.wait(2)
+    old_summarizer = session._summarizer
+    session.reset()
+    # The new conversation overflows while the old summary is still running
+    for turn in range(4):
+        session.record(f"new question {turn}", "An answer that takes up a fair number of tokens in the history.")
+    assert session._summarizer is not old_summarizer, "record() must not wait for the old summary"
+    release.set()
+    old_summarizer.join(2)
+    session.wait(2)
+    assert "old question" not in str(session.history())
+    assert "new question 0" in session.summary
+    print("✓ The old summary is discarded and the new conversation is summarized")
+
+
+def main():
+    """Run conversation memory tests"""
+    print("Emma Robot - Conversation Memory Test")
+    print("=" * 40)
+
+    tests = [
+        test_history_is_sent,
+        test_prompt_stays_flat,
+        test_background_summary_does_not_block,
+        test_failed_summary_keeps_turns,
+        test_reset_discards_running_summary,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
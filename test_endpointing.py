@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Test script for endpointing
+Drives the endpointer with a fake clock and synthetic audio, so no microphone or Vosk model is needed
+"""
+
+import sys
+import os
+
+import numpy as np
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.endpointing import Endpointer
+from Software.vad import VoiceActivityDetector
+
+RATE = 16000
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRecognizer:
+    """Records the delays passed to Vosk's endpointer"""
+
+    def __init__(self):
+        self.delays = None
+
+    def SetEndpointerDelays(self, t_start_max, t_end, t_max):
+        self.delays = (t_start_max, t_end, t_max)
+
+
+def run_silence(endpointer, clock, partial, step_ms=20, limit_ms=2000, utterance_ms=1000):
+    """Feeds growing trailing silence until the endpointer fires; returns the silence in ms"""
+    silence = 0
+    while silence < limit_ms:
+        clock.now += step_ms / 1000
+        silence += step_ms
+        if endpointer.update(silence, utterance_ms + silence, partial):
+            return silence
+    return None
+
+
+def test_trailing_silence():
+    """Ordinary utterances end after the configured trailing silence"""
+    print("Testing trailing silence...")
+    clock = FakeClock()
+    endpointer = Endpointer(trailing_silence_ms=500, short_commands=["hello emma"], clock=clock)
+    assert not endpointer.update(0, 0, "")  # nothing heard yet
+    assert not endpointer.update(0, 800, "what is the weather")  # still talking
+    assert run_silence(endpointer, clock, "what is the weather today") == 500
+    assert endpointer.reason == "trailing_silence"
+    print("✓ Finalized after 500 ms of silence")
+
+
+def test_short_command_is_faster():
+    """Short commands use the shorter adaptive timeout, unless adaptive is off"""
+    print("\nTesting adaptive timeout...")
+    clock = FakeClock()
+    endpointer = Endpointer(trailing_silence_ms=500, short_command_silence_ms=250,
+                            short_commands=["hello emma", "goodbye"], clock=clock)
+    assert endpointer.is_short_command("Hello, Emma!")
+    assert not endpointer.is_short_command("hello emma can you tell me a joke")
+    # Whole words only: normal speech that merely starts like a command keeps the normal timeout
+    words = Endpointer(short_commands=["quit", "stop", "exit", "bye"], clock=clock)
+    assert not words.is_short_command("quite honestly")
+    assert not words.is_short_command("stopwatch please")
+    assert not words.is_short_command("exiting the")
+    assert not words.is_short_command("maybe")
+    assert words.is_short_command("Stop.") and words.is_short_command("Bye!")
+    assert not words.is_short_command("ok stop")
+    greeting = Endpointer(short_commands=["hello", "hello emma", "stop"], clock=clock)
+    for partial in ("hello can you", "stop the music", "don't stop"):
+        assert not greeting.is_short_command(partial), partial
+        assert run_silence(greeting, clock, partial) == 500, partial
+    assert run_silence(words, clock, "quite honestly") == 500
+    assert run_silence(endpointer, clock, "hello emma") == 260  # first 20 ms step past 250
+    assert endpointer.reason == "short_command"
+
+    fixed = Endpointer(trailing_silence_ms=500, short_command_silence_ms=250, adaptive=False,
+                       short_commands=["goodbye"], clock=clock)
+    assert run_silence(fixed, clock, "goodbye") == 500
+    print("✓ Short commands finalize after 250 ms")
+
+
+def test_max_utterance():
+    """Long monologues are cut at the maximum length"""
+    print("\nTesting max utterance length...")
+    endpointer = Endpointer(max_utterance_ms=15000, clock=FakeClock())
+    assert not endpointer.update(0, 14980, "and then")
+    assert endpointer.update(0, 15000, "and then")
+    assert endpointer.reason == "max_utterance"
+    print("✓ Utterances are capped at 15 s")
+
+
+def test_latency_stats():
+    """Finalization latency is measured from the end of speech"""
+    print("\nTesting latency metrics...")
+    clock = FakeClock()
+    endpointer = Endpointer(trailing_silence_ms=500, short_commands=["goodbye"], clock=clock)
+    run_silence(endpointer, clock, "tell me a joke")
+    clock.now += 0.1  # Vosk's FinalResult()
+    assert abs(endpointer.finalized() - 600) < 1e-6
+    run_silence(endpointer, clock, "goodbye")
+    assert abs(endpointer.finalized() - 260) < 1e-6
+    assert endpointer.finalized() is None  # nothing measured since the last turn
+    stats = endpointer.stats()
+    assert stats["turns"] == 2 and abs(stats["mean_ms"] - 430) < 1e-6
+    assert stats["reasons"] == {"trailing_silence": 1, "short_command": 1}
+
+    recognizer = FakeRecognizer()
+    assert endpointer.configure_recognizer(recognizer)
+    assert recognizer.delays == (5.0, 0.5, 15.0)
+    assert not endpointer.configure_recognizer(object())  # older Vosk
+    print(f"✓ Latency stats: {stats}")
+
+
+def test_with_vad():
+    """The VAD's silence counters drive the endpointer on real audio"""
+    print("\nTesting endpointing on synthetic audio...")
+    t = np.arange(int(RATE * 0.6)) / RATE
+    speech = (6000 * np.sin(2 * np.pi * 300 * t)).astype("<i2")
+    silence = np.zeros(RATE, dtype="<i2")
+    audio = np.concatenate([silence[:RATE // 2], speech, silence]).tobytes()
+
+    clock = FakeClock()
+    vad = VoiceActivityDetector(RATE, min_rms=150)
+    endpointer = Endpointer(trailing_silence_ms=500, clock=clock)
+    chunk = 640  # 20 ms
+    fired_at = None
+    for offset in range(0, len(audio), chunk):
+        clock.now += 0.02
+        vad.process(audio[offset:offset + chunk])
+        if endpointer.update(vad.trailing_silence_ms, vad.utterance_ms, "tell me a joke"):
+            fired_at = offset / 2 / RATE
+            break
+    assert fired_at is not None
+    assert abs(fired_at - 1.6) < 0.03, fired_at  # 0.5 s lead-in + 0.6 s speech + 0.5 s silence
+    assert abs(endpointer.finalized() - 500) < 25
+    print(f"✓ Finalized {fired_at:.2f} s into the recording")
+
+
+def main():
+    """Run endpointing tests"""
+    print("Emma Robot - Endpointing Test")
+    print("=" * 40)
+
+    tests = [
+        test_trailing_silence,
+        test_short_command_is_faster,
+        test_max_utterance,
+        test_latency_stats,
+        test_with_vad,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
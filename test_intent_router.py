@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for the local intent router
+Checks which transcripts are answered on the robot and which go to Gemini
+"""
+
+import sys
+import os
+import datetime
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.intent_router import IntentRouter, default_router
+
+NOW = datetime.datetime(2024, 3, 5, 15, 7)
+
+
+def test_time_and_date():
+    """Time and date questions are answered from the clock"""
+    print("Testing time and date...")
+    router = default_router(clock=lambda: NOW)
+    for question in ["What time is it?", "what's the time", "Emma, can you tell me what time is it please"]:
+        assert router.route(question) == ("time", "It's 3:07 PM."), question
+    assert router.route("what is the date today") == ("date", "Today is Tuesday, March 5, 2024.")
+    assert router.route("what day is it") == ("date", "Today is Tuesday, March 5, 2024.")
+    print("✓ Time and date are answered locally")
+
+
+def test_questions_for_gemini_fall_through():
+    """Anything that is not exactly a known question goes to the LLM"""
+    print("\nTesting fall-through...")
+    router = default_router(clock=lambda: NOW)
+    for question in ["what time is it in Tokyo", "tell me about the history of time", "what is your name for the dog",
+                     "who are you going to vote for", ""]:
+        assert router.route(question) == (None, None), question
+    print("✓ Other questions go to Gemini")
+
+
+def test_static_answers_and_repeat():
+    """Name and capabilities are fixed (so they can be pre-warmed); repeat uses the last answer"""
+    print("\nTesting static answers and repeat...")
+    said = []
+    router = default_router(name="Emma", last_response=lambda: said[-1] if said else None)
+    assert router.route("What's your name?") == ("name", "I'm Emma, a talking robot.")
+    assert router.route("who are you")[0] == "name"
+    assert router.route("what can you do")[0] == "capabilities"
+    assert "I'm Emma, a talking robot." in router.static_responses()
+    assert len(router.static_responses()) == 2
+    assert router.route("repeat that") == (None, None)  # nothing said yet: let Gemini handle it
+    said.append("Why don't scientists trust atoms?")
+    assert router.route("Sorry, what did you say?") == ("repeat", "Why don't scientists trust atoms?")
+    assert router.route("say that again please")[0] == "repeat"
+    print("✓ Static answers and repeat work")
+
+
+def test_custom_routes_and_stats():
+    """Routes are pluggable, matched in order, and hit/miss counts are kept"""
+    print("\nTesting custom routes and stats...")
+    router = IntentRouter()
+    router.add("battery", [r"how is your battery", r"battery (?:level|status)"], "My battery is fine.")
+    router.add("echo", [r"say (?P<word>\w+)"], lambda match: match.group("word").capitalize() + "!")
+    assert router.route("Battery level?") == ("battery", "My battery is fine.")
+    assert router.route("say cheese") == ("echo", "Cheese!")
+    assert router.route("tell me a joke") == (None, None)
+    assert router.route("how is the weather") == (None, None)
+    stats = router.stats()
+    assert stats == {"turns": 4, "hits": {"battery": 1, "echo": 1}, "misses": 2, "local_rate": 0.5}
+    print(f"✓ Router stats: {stats}")
+
+
+def main():
+    """Run intent router tests"""
+    print("Emma Robot - Intent Router Test")
+    print("=" * 40)
+
+    tests = [
+        test_time_and_date,
+        test_questions_for_gemini_fall_through,
+        test_static_answers_and_repeat,
+        test_custom_routes_and_stats,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test script for the answer latency budget
+Uses fake fillers and gestures with short budgets, so no audio or servos are needed
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.latency_supervisor import LatencySupervisor
+
+
+class FakeFiller:
+    """Records played fillers and whether they were cut off"""
+
+    def __init__(self):
+        self.played = []
+        self.cancelled = 0
+
+    def __call__(self, phrase):
+        filler = self
+
+        class Handle:
+            def cancel(self):
+                filler.cancelled += 1
+
+        self.played.append(phrase)
+        return Handle()
+
+
+class FakeGesture:
+    """Counts gesture loop iterations until stopped"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.stopped = threading.Event()
+        self.loops = 0
+
+    def __call__(self, stop_event):
+        self.started.set()
+        while not stop_event.wait(0.01):
+            self.loops += 1
+        self.stopped.set()
+
+
+def slow_stream(delay, pieces=("Hello", " there.")):
+    time.sleep(delay)
+    for piece in pieces:
+        yield piece
+
+
+def test_fast_answer_has_no_filler():
+    """Answers within the budget do not trigger anything"""
+    print("Testing fast answer...")
+    filler, gesture = FakeFiller(), FakeGesture()
+    supervisor = LatencySupervisor(0.2, play_filler=filler, start_gesture=gesture)
+    assert "".join(supervisor.wrap_stream(slow_stream(0.01))) == "Hello there."
+    assert supervisor.call(lambda: "quick") == "quick"
+    time.sleep(0.3)  # the timers must have been cancelled
+    assert filler.played == [] and not gesture.started.is_set()
+    stats = supervisor.stats()
+    assert stats["turns"] == 2 and stats["overruns"] == 0 and stats["fillers"] == 0
+    print(f"✓ No filler for fast answers ({stats['max_first_output_ms']:.0f} ms)")
+
+
+def test_slow_stream_plays_filler_until_first_token():
+    """A slow first token starts the filler and gesture; the first token stops both"""
+    print("\nTesting slow streamed answer...")
+    filler, gesture = FakeFiller(), FakeGesture()
+    supervisor = LatencySupervisor(0.05, play_filler=filler, start_gesture=gesture, fillers=["Let me think..."])
+    stream = supervisor.wrap_stream(slow_stream(0.2))
+    first = next(stream)
+    assert first == "Hello"
+    assert filler.played == ["Let me think..."] and filler.cancelled == 1
+    assert gesture.started.is_set() and gesture.stopped.wait(1) and gesture.loops > 0
+    assert list(stream) == [" there."]
+    turn = supervisor.turns[0]
+    assert turn["overrun"] and turn["filler"] == "Let me think..." and turn["latency_s"] >= 0.2
+    print(f"✓ Filler and gesture stopped at the first token ({turn['latency_s'] * 1000:.0f} ms)")
+
+
+def test_blocking_call_and_filler_rotation():
+    """Blocking requests are supervised too, and fillers are used in rotation"""
+    print("\nTesting blocking calls...")
+    filler = FakeFiller()
+    supervisor = LatencySupervisor(0.02, play_filler=filler, fillers=["Let me think...", "One moment..."])
+    for _ in range(3):
+        assert supervisor.call(lambda: time.sleep(0.08) or "answer") == "answer"
+    assert filler.played == ["Let me think...", "One moment...", "Let me think..."]
+    assert filler.cancelled == 3
+    assert supervisor.stats()["overruns"] == 3 and supervisor.stats()["fillers"] == 3
+    print("✓ Fillers rotate between turns")
+
+
+def test_missing_filler_and_errors():
+    """Overruns are recorded even without filler audio; errors still end the turn"""
+    print("\nTesting missing filler and failed requests...")
+    supervisor = LatencySupervisor(0.02, play_filler=lambda phrase: None)
+
+    def failing():
+        time.sleep(0.05)
+        raise RuntimeError("API error")
+
+    try:
+        supervisor.call(failing)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("the error should propagate")
+    stats = supervisor.stats()
+    assert stats["turns"] == 1 and stats["overruns"] == 1 and stats["fillers"] == 0
+
+    empty = LatencySupervisor(0.5)
+    assert list(empty.wrap_stream(iter([]))) == []
+    assert empty.stats()["turns"] == 1
+    print(f"✓ Turn records: {stats}")
+
+
+def main():
+    """Run latency supervisor tests"""
+    print("Emma Robot - Latency Budget Test")
+    print("=" * 40)
+
+    tests = [
+        test_fast_answer_has_no_filler,
+        test_slow_stream_plays_filler_until_first_token,
+        test_blocking_call_and_filler_rotation,
+        test_missing_filler_and_errors,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
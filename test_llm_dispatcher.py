@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test script for hedged LLM requests
+Uses fake backends with injected delays and failures, plus a local
+OpenAI-compatible stub server, so no API key is needed
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_llm_hedging import StubChatServer
+from Software.llm_dispatcher import HedgedDispatcher, LLMUnavailable, gemini_backend
+
+
+def fake_backend(delay=0.0, pieces=("Hello", " there."), error=None, log=None):
+    """Backend that waits `delay`, then yields `pieces` or raises `error`; records cancellation"""
+    def run(text, cancel_event):
+        if log is not None:
+            log.append(text)
+        if cancel_event.wait(delay):
+            return
+        if error is not None:
+            raise error
+        for piece in pieces:
+            yield piece
+    return run
+
+
+def test_fast_primary_is_not_hedged():
+    """A primary that answers in time is used alone"""
+    print("Testing fast primary...")
+    fallback_calls = []
+    dispatcher = HedgedDispatcher([("gemini", fake_backend(0.01)),
+                                   ("openai", fake_backend(0.0, log=fallback_calls))],
+                                  initial_hedge_s=0.2, min_hedge_s=0.05)
+    assert dispatcher.ask("hi") == "Hello there."
+    assert fallback_calls == [] and dispatcher.stats()["hedges"] == 0
+    assert dispatcher.stats()["wins"] == {"gemini": 1, "openai": 0}
+    print("✓ No hedge when the primary is fast")
+
+
+def test_slow_primary_is_hedged():
+    """A slow primary triggers the fallback; the first answer wins and the other is cancelled"""
+    print("\nTesting hedge on a slow primary...")
+    cancelled = threading.Event()
+
+    def slow_primary(text, cancel_event):
+        if cancel_event.wait(2):
+            cancelled.set()
+            return
+        yield "too late"
+
+    dispatcher = HedgedDispatcher([("gemini", slow_primary), ("openai", fake_backend(0.02, ("Fallback.",)))],
+                                  initial_hedge_s=0.1, min_hedge_s=0.05)
+    started = time.monotonic()
+    assert dispatcher.ask("hi") == "Fallback."
+    assert time.monotonic() - started < 0.5
+    assert cancelled.wait(1)
+    stats = dispatcher.stats()
+    assert stats["hedges"] == 1 and stats["wins"]["openai"] == 1
+    print(f"✓ Fallback answered in {stats['max_ms']:.0f} ms, primary cancelled")
+
+
+def test_failures_switch_immediately():
+    """Errors and blocked (empty) answers go to the fallback without waiting for the hedge"""
+    print("\nTesting failures and blocked answers...")
+    for primary in (fake_backend(error=RuntimeError("500 from Gemini")), fake_backend(pieces=())):
+        dispatcher = HedgedDispatcher([("gemini", primary), ("openai", fake_backend(0.0, ("OK",)))],
+                                      initial_hedge_s=1.0)
+        started = time.monotonic()
+        assert dispatcher.ask("hi") == "OK"
+        assert time.monotonic() - started < 0.3
+        assert dispatcher.stats()["errors"]["gemini"] == 1 and dispatcher.stats()["hedges"] == 0
+
+    broken = HedgedDispatcher([("gemini", fake_backend(error=RuntimeError("down"))),
+                               ("openai", fake_backend(5.0))], first_output_deadline_s=0.2)
+    try:
+        broken.ask("hi")
+    except LLMUnavailable:
+        pass
+    else:
+        raise AssertionError("expected LLMUnavailable")
+    assert broken.stats()["unavailable"] == 1
+    print("✓ Failures fall back at once; a deadline ends hopeless turns")
+
+
+def test_threshold_follows_percentile():
+    """The hedge threshold is the primary's recent latency percentile, within bounds"""
+    print("\nTesting percentile threshold...")
+    dispatcher = HedgedDispatcher([("gemini", gemini_backend(lambda text: iter(["ok"])))],
+                                  hedge_percentile=90, initial_hedge_s=2.0, min_hedge_s=0.1,
+                                  max_hedge_s=4.0, min_samples=5)
+    assert dispatcher.hedge_threshold() == 2.0
+    dispatcher._latencies.extend([0.2, 0.3, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 3.0])
+    assert dispatcher.hedge_threshold() == 3.0
+    dispatcher._latencies.extend([0.2] * 40)
+    assert abs(dispatcher.hedge_threshold() - 0.6) < 1e-9
+    dispatcher._latencies.extend([9.0] * 50)
+    assert dispatcher.hedge_threshold() == 4.0
+    assert dispatcher.ask("hi") == "ok"
+    print("✓ Threshold tracks the 90th percentile")
+
+
+def test_stub_servers():
+    """Against local stub servers, hedging turns hangs and errors into answers"""
+    print("\nTesting against stub servers...")
+    primary = StubChatServer(median_s=0.02, sigma=0.1, hang_rate=0.5, hang_s=3.0, seed=3)
+    fallback = StubChatServer(median_s=0.05, sigma=0.1, seed=4)
+    history = [{"role": "user", "parts": ["My name is Sam"]}, {"role": "model", "parts": ["Hi Sam!"]}]
+    try:
+        dispatcher = HedgedDispatcher([("primary", primary.backend(timeout=2.0, history=lambda: history)),
+                                       ("fallback", fallback.backend(timeout=2.0))],
+                                      initial_hedge_s=0.3, min_hedge_s=0.1, first_output_deadline_s=2.0)
+        for turn in range(6):
+            assert dispatcher.ask(f"question {turn}").strip() == "Hello from the stub. How can I help?"
+        stats = dispatcher.stats()
+        assert stats["unavailable"] == 0 and stats["hedges"] >= 1 and stats["wins"]["fallback"] == stats["hedges"]
+        messages = primary.requests[0]["messages"]
+        assert messages == [{"role": "user", "content": "My name is Sam"},
+                            {"role": "assistant", "content": "Hi Sam!"},
+                            {"role": "user", "content": "question 0"}]
+        assert primary.requests[0]["stream"] is True
+    finally:
+        primary.close()
+        fallback.close()
+    print(f"✓ All turns answered: {stats['wins']}, {stats['hedges']} hedges")
+
+
+def main():
+    """Run hedged LLM tests"""
+    print("Emma Robot - Hedged LLM Test")
+    print("=" * 40)
+
+    tests = [
+        test_fast_primary_is_not_hedged,
+        test_slow_primary_is_hedged,
+        test_failures_switch_immediately,
+        test_threshold_follows_percentile,
+        test_stub_servers,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test script for the non-blocking motion engine
+Records frames instead of sending them, so no Arduino is needed
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Hardware.motion_engine import MotionEngine
+
+
+class FrameRecorder:
+    """Stands in for arduino.sendData and records every frame"""
+
+    def __init__(self, frame_time=0.0):
+        self.frames = []
+        self.frame_time = frame_time
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, positions):
+        self.gate.wait()
+        self.frames.append(list(positions))
+        time.sleep(self.frame_time)
+
+
+def test_move_does_not_block():
+    """move() returns a future immediately and resolves after the motion"""
+    print("Testing non-blocking moves...")
+    recorder = FrameRecorder(frame_time=0.002)
+    engine = MotionEngine(recorder, [180, 0, 90], rate_hz=1000)
+    start = time.perf_counter()
+    future = engine.move([180, 60, 90])
+    assert time.perf_counter() - start < 0.05, "move() blocked the caller"
+    assert future.result(timeout=5) == [180, 60, 90]
+    assert recorder.frames[-1] == [180, 60, 90]
+    assert engine.positions == [180, 60, 90]
+    engine.stop()
+    print("✓ Moves run in the background")
+
+
+def test_none_keeps_axis_at_execution_time():
+    """Queued moves resolve None from the position when they start"""
+    print("\nTesting queued relative moves...")
+    recorder = FrameRecorder()
+    recorder.gate.clear()
+    engine = MotionEngine(recorder, [180, 0, 90], rate_hz=1000)
+    engine.move([None, 10, None])
+    last = engine.move([None, None, 80])
+    recorder.gate.set()
+    assert last.result(timeout=5) == [180, 10, 80]
+    engine.stop()
+    print("✓ None uses the real position, not a stale snapshot")
+
+
+def test_gesture_submit_and_cancel():
+    """Whole gestures run in order; pending work can be cancelled"""
+    print("\nTesting gestures and cancel...")
+    recorder = FrameRecorder()
+    recorder.gate.clear()
+    engine = MotionEngine(recorder, [180, 0, 90], rate_hz=1000)
+
+    def wave():
+        engine.move([None, 5, None])
+        return engine.move([None, 0, None]).result()
+
+    first = engine.submit(wave)
+    time.sleep(0.05)  # let the gesture start so only later work is pending
+    pending = engine.move([0, None, None])
+    engine.cancel_pending()
+    recorder.gate.set()
+    assert first.result(timeout=5) == [180, 0, 90]
+    assert pending.cancelled()
+    engine.wait_idle(timeout=5)
+    assert engine.positions == [180, 0, 90]
+    engine.stop()
+    print("✓ Gestures compose and pending moves cancel")
+
+
+def test_errors_reach_the_future():
+    """A failing serial write is reported through the future"""
+    print("\nTesting motion errors...")
+
+    def broken(positions):
+        raise IOError("serial unplugged")
+
+    engine = MotionEngine(broken, [180, 0, 90], rate_hz=1000)
+    future = engine.move([170, 0, 90])
+    try:
+        future.result(timeout=5)
+    except IOError:
+        pass
+    else:
+        raise AssertionError("error was swallowed")
+    engine.stop()
+    print("✓ Errors are raised from result()")
+
+
+def main():
+    """Run motion engine tests"""
+    print("Emma Robot - Motion Engine Test")
+    print("=" * 40)
+
+    tests = [
+        test_move_does_not_block,
+        test_none_keeps_axis_at_execution_time,
+        test_gesture_submit_and_cancel,
+        test_errors_reach_the_future,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
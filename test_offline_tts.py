@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline TTS worker
+Runs the real worker protocol with a fake pyttsx3 engine in the child process,
+so no speech driver or audio device is needed
+"""
+
+import sys
+import os
+import io
+import tempfile
+import threading
+import time
+import wave
+from collections import namedtuple
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.offline_tts import OfflineTTS, OfflineTTSError, choose_voice
+from Software.tts_cache import TTSCache
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Worker with a fake engine: writes one WAV frame per character, fails on "fail", dies on "crash"
+FAKE_WORKER = f"""
+import json, os, sys, wave
+sys.path.insert(0, {ROOT!r})
+from Software.offline_tts import serve
+
+class FakeEngine:
+    def __init__(self):
+        self.jobs = []
+    def save_to_file(self, text, path):
+        self.jobs.append((text, path))
+    def runAndWait(self):
+        for text, path in self.jobs:
+            if text == "crash":
+                os._exit(1)
+            if text == "fail":
+                self.jobs = []
+                raise RuntimeError("driver failed")
+            with wave.open(path, "wb") as out:
+                out.setnchannels(1)
+                out.setsampwidth(2)
+                out.setframerate(16000)
+                out.writeframes(b"\\x01\\x00" * len(text))
+        self.jobs = []
+
+settings = json.loads(sys.argv[1])
+print(json.dumps({{"ready": True, "voice": "fake-" + str(settings["rate"])}}), flush=True)
+serve(sys.stdin, sys.stdout, FakeEngine())
+"""
+
+Voice = namedtuple("Voice", ["id", "name"])
+
+
+def fake_tts(**kwargs):
+    return OfflineTTS(command=[sys.executable, "-c", FAKE_WORKER], **kwargs)
+
+
+def frames(audio):
+    with wave.open(io.BytesIO(audio)) as wav:
+        return wav.getnframes()
+
+
+class FakeHandle:
+    def __init__(self, cancelled=False):
+        self.cancelled = cancelled
+
+    def wait(self):
+        time.sleep(0.01)
+
+
+class FakePlayback:
+    """Records what would be played; cancels after `cancel_after` sounds"""
+
+    def __init__(self, cancel_after=None):
+        self.played = []
+        self.cancel_after = cancel_after
+
+    def play(self, audio, audio_format="mp3"):
+        self.played.append((audio, audio_format))
+        return FakeHandle(cancelled=len(self.played) == self.cancel_after)
+
+
+def test_choose_voice():
+    """A named voice wins, else a female English voice, else any English voice"""
+    print("Testing voice choice...")
+    voices = [Voice("de-1", "German"), Voice("en-us-m", "English Male"), Voice("en-gb-f", "English Female")]
+    assert choose_voice(voices).id == "en-gb-f"
+    assert choose_voice(voices[:2]).id == "en-us-m"
+    assert choose_voice(voices, "german").id == "de-1"
+    assert choose_voice(voices[:1]) is None
+    print("✓ Voices chosen as before")
+
+
+def test_worker_renders_in_order():
+    """One worker renders queued sentences to WAV without restarting"""
+    print("\nTesting rendering...")
+    tts = fake_tts(rate=180)
+    try:
+        assert tts.voice == "fake-180"
+        futures = [tts.submit(text) for text in ("Hello.", "How are you today?", "Bye")]
+        audio = [future.result(5) for future in futures]
+        assert [frames(a) for a in audio] == [6, 18, 3]
+        assert tts.render("again") and tts.stats()["restarts"] == 0
+        assert tts.stats()["requests"] == 4
+    finally:
+        tts.close()
+    print(f"✓ Rendered in one worker: {tts.stats()}")
+
+
+def test_errors_and_restart():
+    """A failed sentence raises; a dead worker fails its requests and is restarted"""
+    print("\nTesting errors...")
+    tts = fake_tts()
+    try:
+        try:
+            tts.render("fail", timeout=5)
+            raise AssertionError("expected OfflineTTSError")
+        except OfflineTTSError:
+            pass
+        assert frames(tts.render("still works", timeout=5)) == 11
+        try:
+            tts.render("crash", timeout=5)
+            raise AssertionError("expected OfflineTTSError")
+        except OfflineTTSError:
+            pass
+        assert frames(tts.render("back", timeout=5)) == 4
+        assert tts.stats()["restarts"] == 1
+    finally:
+        tts.close()
+    print("✓ Errors are reported and the worker is restarted")
+
+
+def test_cache():
+    """Rendered sentences are cached per voice and rate"""
+    print("\nTesting cache...")
+    with tempfile.TemporaryDirectory() as folder:
+        cache = TTSCache(folder)
+        tts = fake_tts(cache=cache)
+        try:
+            first = tts.render("Goodbye!")
+            deadline = time.monotonic() + 2
+            while cache.stats()["entries"] == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert tts.render("Goodbye!") == first
+            assert tts.stats()["cache_hits"] == 1
+        finally:
+            tts.close()
+    print("✓ Repeated sentences come from the cache")
+
+
+def test_speak_pipelines_sentences():
+    """Sentences are played in order through the playback engine and stop on cancel"""
+    print("\nTesting speak...")
+    tts = fake_tts()
+    try:
+        playback = FakePlayback()
+        first_audio = tts.speak("This is the first sentence. And this is the second one.", playback)
+        assert first_audio is not None
+        assert [frames(audio) for audio, _ in playback.played] == [27, 27]
+        assert playback.played[0][1] == tts.audio_format
+        playback = FakePlayback(cancel_after=1)
+        tts.speak("This is the first sentence. And this is the second one.", playback)
+        assert len(playback.played) == 1
+        cancel = threading.Event()
+        cancel.set()
+        playback = FakePlayback()
+        assert tts.speak("Never played.", playback, cancel_event=cancel) is None
+        assert playback.played == []
+        assert tts.speak("", FakePlayback()) is None
+    finally:
+        tts.close()
+    print("✓ Sentences played in order")
+
+
+def main():
+    """Run offline TTS tests"""
+    print("Emma Robot - Offline TTS Worker Test")
+    print("=" * 40)
+
+    tests = [
+        test_choose_voice,
+        test_worker_renders_in_order,
+        test_errors_and_restart,
+        test_cache,
+        test_speak_pipelines_sentences,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
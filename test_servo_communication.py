@@ -16,12 +16,12 @@ def test_servo_communication():
     print("Testing servo communication with PCA9685...")
     
     try:
-        from cvzone.SerialModule import SerialObject
-        from config import ARDUINO_PORT, SERVO_DIGITS
+        from Hardware.servo_protocol import open_servo_transport
+        from config import ARDUINO_PORT, SERVO_DIGITS, SERVO_PROTOCOL, SERIAL_BAUDRATE
         
-        # Create serial object with explicit port
-        arduino = SerialObject(digits=SERVO_DIGITS, portNo=ARDUINO_PORT)
-        print("✓ SerialObject created successfully")
+        # Open the servo link with explicit port
+        arduino = open_servo_transport(ARDUINO_PORT, SERVO_PROTOCOL, SERIAL_BAUDRATE, digits=SERVO_DIGITS)
+        print(f"✓ Servo link opened ({SERVO_PROTOCOL} protocol, {SERIAL_BAUDRATE} baud)")
         
         # Test positions
         test_positions = [
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Test script for the servo serial protocol
+Checks framing, CRC and resynchronization without an Arduino
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Hardware.servo_protocol import (
+    CMD_REPORTING, CMD_SET_ANGLES, CMD_STATUS, SYNC_BYTE, AsciiSerialTransport,
+    BinarySerialTransport, FrameParser, crc8, encode_angles, encode_ascii,
+)
+
+
+class FakeSerial:
+    """Collects written bytes like a pyserial port"""
+
+    def __init__(self):
+        self.written = bytearray()
+
+    def write(self, data):
+        self.written.extend(data)
+        return len(data)
+
+    def readline(self):
+        time.sleep(0.01)
+        return b""
+
+    def close(self):
+        pass
+
+
+def test_crc8_reference():
+    """CRC-8/0x07 matches the standard check value"""
+    print("Testing CRC-8...")
+    assert crc8(b"123456789") == 0xF4
+    print("✓ CRC-8 matches reference value")
+
+
+def test_frame_layout():
+    """A SET_ANGLES frame is sync, ver/cmd, L, R, H, seq, CRC"""
+    print("\nTesting frame layout...")
+    frame = encode_angles([180, 0, 90], seq=7)
+    assert len(frame) == 7
+    assert frame[0] == SYNC_BYTE and frame[1] == 0x11
+    assert list(frame[2:6]) == [180, 0, 90, 7]
+    assert frame[6] == crc8(frame[1:6])
+    assert encode_angles([200, -5, 90], 0)[2:5] == bytes([180, 0, 90]), "angles not clamped"
+    assert encode_ascii([180, 0, 90]) == b"$180000090"
+    print("✓ Binary and ASCII frames are well formed")
+
+
+def test_parser_handles_splits_and_noise():
+    """Frames split across reads and surrounded by noise still decode"""
+    print("\nTesting parser resync...")
+    stream = b"Moved to: 1,2,3\r\n" + encode_angles([10, 20, 30], 1) + b"\x00\xa5" + encode_angles([40, 50, 60], 2)
+    parser = FrameParser()
+    frames = []
+    for i in range(0, len(stream), 3):
+        frames += parser.feed(stream[i:i + 3])
+    assert frames == [(CMD_SET_ANGLES, bytes([10, 20, 30]), 1), (CMD_SET_ANGLES, bytes([40, 50, 60]), 2)]
+    print("✓ Parser resynchronizes on the sync byte")
+
+
+def test_parser_rejects_corruption():
+    """A flipped bit fails the CRC and the frame is dropped"""
+    print("\nTesting corrupted frames...")
+    bad = bytearray(encode_angles([90, 90, 90], 3))
+    bad[3] ^= 0x01
+    parser = FrameParser()
+    assert parser.feed(bytes(bad) + encode_angles([1, 2, 3], 4)) == [(CMD_SET_ANGLES, bytes([1, 2, 3]), 4)]
+    assert parser.crc_errors == 1
+    print("✓ Corrupted frames are rejected")
+
+
+def test_transport_sequence_numbers():
+    """The binary transport numbers frames and wraps at 256"""
+    print("\nTesting transport...")
+    port = FakeSerial()
+    link = BinarySerialTransport(None, serial_port=port, start_reader=False)
+    link.seq = 255
+    link.sendData([1, 2, 3])
+    link.sendData([4, 5, 6])
+    frames = FrameParser().feed(bytes(port.written))
+    assert [seq for _, _, seq in frames] == [255, 0]
+    print("✓ Sequence numbers wrap")
+
+
+def test_duplicate_frames_are_dropped():
+    """Frames identical to the previous one are not written"""
+    print("\nTesting frame deduplication...")
+    port = FakeSerial()
+    link = BinarySerialTransport(None, serial_port=port, start_reader=False)
+    assert link.sendData([180, 0, 90]) is True
+    assert link.sendData([180, 0, 90]) is False
+    assert link.sendData([180, 1, 90]) is True
+    assert len(port.written) == 14
+    assert link.stats()["frames_sent"] == 2 and link.stats()["frames_deduplicated"] == 1
+    print("✓ Redundant frames are skipped")
+
+
+def test_telemetry_acks():
+    """Acks update the hardware state, acked counter and latency"""
+    print("\nTesting telemetry parsing...")
+    link = BinarySerialTransport(None, serial_port=FakeSerial(), start_reader=False)
+    for angles in ([1, 0, 0], [2, 0, 0], [3, 0, 0]):
+        link.sendData(angles)
+    link.handle_line("Moved to: 2,0,0 seq=1")
+    stats = link.stats()
+    assert stats["hardware_positions"] == [2, 0, 0]
+    assert stats["frames_acked"] == 2 and stats["ack_latency_ms"] is not None
+    link.handle_line("Moved to: 2,0,0 seq=1")  # repeated ack changes nothing
+    assert link.stats()["frames_acked"] == 2
+    link.handle_line("Emma Robot Servo Control Ready with PCA9685")
+    assert link.stats()["frames_acked"] == 2
+
+    ascii_link = AsciiSerialTransport(None, serial_port=FakeSerial(), start_reader=False)
+    ascii_link.sendData([5, 5, 5])
+    ascii_link.sendData([6, 6, 6])
+    ascii_link.handle_line("Moved to: 5,5,5")
+    assert ascii_link.stats()["frames_acked"] == 1
+    print("✓ Acks are parsed into state and counters")
+
+
+def test_quiet_mode_status_polling():
+    """In quiet mode a status reply acknowledges everything sent before the request"""
+    print("\nTesting quiet mode...")
+    port = FakeSerial()
+    link = BinarySerialTransport(None, serial_port=port, start_reader=False)
+    link.set_reporting(False)
+    link.status_interval = 60
+    link.sendData([10, 10, 10])  # first frame triggers a status request
+    link.sendData([11, 10, 10])
+    commands = [cmd for cmd, _, _ in FrameParser().feed(bytes(port.written))]
+    assert commands == [CMD_REPORTING, CMD_SET_ANGLES, CMD_STATUS, CMD_SET_ANGLES]
+    link.handle_line("Status: 10,10,10 seq=0 rx=1 crc=2")
+    stats = link.stats()
+    assert stats["frames_acked"] == 1 and stats["crc_errors"] == 2
+    # The board reset when the port was opened and dropped the quiet command: it is sent again
+    port.written.clear()
+    link.handle_line("Emma Robot Servo Control Ready with PCA9685")
+    assert [cmd for cmd, _, _ in FrameParser().feed(bytes(port.written))] == [CMD_REPORTING]
+    assert link.stats()["firmware_resets"] == 1
+    ascii_port = FakeSerial()
+    ascii_link = AsciiSerialTransport(None, serial_port=ascii_port, start_reader=False)
+    ascii_link.handle_line("Emma Robot Servo Control Ready with PCA9685")
+    assert ascii_port.written == b"", "nothing to restore before set_reporting()"
+    ascii_link.set_reporting(False)
+    ascii_link.handle_line("Emma Robot Servo Control Ready with PCA9685")
+    assert ascii_port.written == b"qq"
+    print("✓ Quiet mode polls status instead of per-frame acks")
+
+
+def test_reader_thread():
+    """The background reader feeds lines from the port into the parser"""
+    print("\nTesting reader thread...")
+
+    class LinePort(FakeSerial):
+        def __init__(self, lines):
+            super().__init__()
+            self.lines = list(lines)
+
+        def readline(self):
+            return self.lines.pop(0) if self.lines else super().readline()
+
+    link = BinarySerialTransport(None, serial_port=LinePort([b"Moved to: 7,8,9 seq=0\r\n"]))
+    for _ in range(100):
+        if link.hardware_positions is not None:
+            break
+        time.sleep(0.01)
+    link.close()
+    assert link.hardware_positions == [7, 8, 9]
+    print("✓ Reader thread updates hardware state")
+
+
+def main():
+    """Run servo protocol tests"""
+    print("Emma Robot - Servo Protocol Test")
+    print("=" * 40)
+
+    tests = [
+        test_crc8_reference,
+        test_frame_layout,
+        test_parser_handles_splits_and_noise,
+        test_parser_rejects_corruption,
+        test_transport_sequence_numbers,
+        test_duplicate_frames_are_dropped,
+        test_telemetry_acks,
+        test_quiet_mode_status_polling,
+        test_reader_thread,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test script for firmware-side interpolation
+Runs the host transport and motion engine against the simulated firmware
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Hardware.motion_engine import MotionEngine
+from Hardware.servo_protocol import BinarySerialTransport, encode_angles, encode_ascii, encode_move
+from Hardware.simulated_firmware import SimulatedFirmware
+
+
+class FakeClock:
+    """Monotonic clock that is advanced by hand"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_move_frame_is_interpolated():
+    """One CMD_MOVE frame produces a smooth motion ending on the target"""
+    print("Testing firmware interpolation...")
+    clock = FakeClock()
+    firmware = SimulatedFirmware([0, 0, 90], clock=clock)
+    frame = encode_move([180, 0, 90], 1.0, "minimum_jerk", seq=5)
+    assert len(frame) == 10
+    firmware.write(frame)
+    while clock.now < 1.0:
+        clock.now += 0.01
+        firmware.tick()
+    assert firmware.positions == [180, 0, 90]
+    assert not firmware.moving
+    assert firmware.frames_received == 1
+    assert firmware.pwm_writes > 50, "motion should be interpolated on the firmware"
+    steps = [b[0] - a[0] for (_, a), (_, b) in zip(firmware.history, firmware.history[1:])]
+    assert all(step >= 0 for step in steps)
+    assert firmware.readline() == b"Moved to: 180,0,90 seq=5\r\n"
+    print("✓ Firmware reaches the target on its own clock")
+
+
+def test_frames_and_status():
+    """Binary, ASCII and status frames behave like the sketch"""
+    print("\nTesting frame handling...")
+    firmware = SimulatedFirmware()
+    firmware.write(b"noise" + encode_angles([10, 20, 30], 1) + encode_ascii([40, 50, 60]))
+    assert firmware.readline() == b"Moved to: 10,20,30 seq=1\r\n"
+    assert firmware.readline() == b"Moved to: 40,50,60\r\n"
+    bad = bytearray(encode_angles([1, 1, 1], 2))
+    bad[3] ^= 0xFF
+    firmware.write(bytes(bad) + b"q?")
+    assert firmware.readline() == b"Status: 40,50,60 seq=1 rx=2 crc=1 moving=0\r\n"
+    print("✓ Frames, quiet mode and status match the firmware")
+
+
+def test_engine_sends_one_frame_per_move():
+    """With send_move the engine sends one frame and resolves after the duration"""
+    print("\nTesting motion engine with firmware interpolation...")
+    firmware = SimulatedFirmware([180, 0, 90])
+    link = BinarySerialTransport(None, serial_port=firmware)
+    engine = MotionEngine(link.sendData, [180, 0, 90], send_move=link.sendMove)
+    start = time.monotonic()
+    future = engine.move([180, 120, 90], duration=0.3)
+    time.sleep(0.15)
+    midway = engine.positions
+    assert 0 < midway[1] < 120, midway
+    assert future.result(timeout=5) == [180, 120, 90]
+    assert time.monotonic() - start >= 0.3
+    engine.stop()
+    time.sleep(0.05)  # let the reader pick up the final ack
+    link.close()
+    stats = link.stats()
+    assert stats["frames_sent"] == 1
+    assert firmware.positions == [180, 120, 90]
+    assert stats["hardware_positions"] == [180, 120, 90]
+    assert firmware.pwm_writes > 5
+    print("✓ One frame per move, motion finishes on time")
+
+
+def main():
+    """Run simulated firmware tests"""
+    print("Emma Robot - Firmware Interpolation Test")
+    print("=" * 40)
+
+    tests = [
+        test_move_frame_is_interpolated,
+        test_frames_and_status,
+        test_engine_sends_one_frame_per_move,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Test script for speculative LLM dispatch
+Replays partial transcripts with fake requests, so no API key or microphone is needed
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.speculative_llm import (
+    PrefetchedStream, SpeculativeDispatcher, background_call, normalize_transcript,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RequestLog:
+    """Fake request starter that records texts and cancellations"""
+
+    def __init__(self):
+        self.started = []
+        self.cancelled = []
+
+    def __call__(self, text):
+        log = self
+
+        class Handle:
+            def result(self):
+                return f"answer to {text}"
+
+            def cancel(self):
+                log.cancelled.append(text)
+
+        self.started.append(text)
+        return Handle()
+
+
+def test_normalization():
+    """Case and punctuation do not matter"""
+    print("Testing transcript normalization...")
+    assert normalize_transcript("What's the  Weather, today?") == "what's the weather today"
+    print("✓ Transcripts are normalized")
+
+
+def test_hit_reuses_early_request():
+    """A stable partial fires the request once; a matching final reuses it"""
+    print("\nTesting speculative hit...")
+    clock, requests = FakeClock(), RequestLog()
+    speculator = SpeculativeDispatcher(requests, stable_frames=3, min_words=3, clock=clock)
+    for partial in ["what", "what is the", "what is the weather", "what is the weather", "what is the weather"]:
+        speculator.observe(partial)
+        clock.now += 0.128
+    assert requests.started == ["what is the weather"]
+    speculator.observe("what is the weather")  # still stable: no second request
+    clock.now += 0.4
+    handle, hit, saved = speculator.finalize("What is the weather?")
+    assert hit and handle.result() == "answer to what is the weather"
+    assert abs(saved - 0.528) < 1e-6
+    assert requests.started == ["what is the weather"] and requests.cancelled == []
+    stats = speculator.stats()
+    assert stats["hit_rate"] == 1.0 and abs(stats["avg_saved_ms"] - 528) < 1e-3
+    print(f"✓ Hit saved {saved * 1000:.0f} ms")
+
+
+def test_miss_cancels_and_reissues():
+    """A different final transcript cancels the speculation and sends a new request"""
+    print("\nTesting speculative miss...")
+    requests = RequestLog()
+    speculator = SpeculativeDispatcher(requests, stable_frames=2, min_words=2, clock=FakeClock())
+    for partial in ["turn on the", "turn on the"]:
+        speculator.observe(partial)
+    handle, hit, _ = speculator.finalize("turn on the lights")
+    assert not hit and handle.result() == "answer to turn on the lights"
+    assert requests.cancelled == ["turn on the"]
+    assert speculator.hit_rate() == 0.0
+    print("✓ Misses cancel and reissue")
+
+
+def test_changed_partial_respeculates():
+    """When a stable partial later grows, the old speculation is replaced"""
+    print("\nTesting re-speculation...")
+    requests = RequestLog()
+    speculator = SpeculativeDispatcher(requests, stable_frames=2, min_words=2, clock=FakeClock())
+    for partial in ["tell me", "tell me", "tell me a joke", "tell me a joke"]:
+        speculator.observe(partial)
+    assert requests.started == ["tell me", "tell me a joke"]
+    assert requests.cancelled == ["tell me"]
+    assert speculator.finalize("tell me a joke")[1]
+    speculator.observe("hello emma")
+    speculator.observe("hello emma")
+    speculator.discard()  # a command, not a question
+    assert requests.cancelled == ["tell me", "hello emma"]
+    print("✓ Outdated speculations are cancelled")
+
+
+def test_prefetched_stream_and_background_call():
+    """Early requests keep running in the background until they are read"""
+    print("\nTesting background requests...")
+    release = threading.Event()
+
+    def slow_stream():
+        yield "Hello. "
+        release.wait(2)
+        yield "How are you?"
+
+    stream = PrefetchedStream(slow_stream)
+    time.sleep(0.05)
+    release.set()
+    assert "".join(stream) == "Hello. How are you?"
+
+    cancelled = PrefetchedStream(lambda: iter(["a", "b", "c"]))
+    cancelled.cancel()
+    assert len(list(cancelled)) <= 3
+
+    call = background_call(lambda text: text.upper())("hi")
+    assert call.result(timeout=1) == "HI"
+    print("✓ Streams and calls run ahead of the final transcript")
+
+
+def main():
+    """Run speculative LLM tests"""
+    print("Emma Robot - Speculative LLM Test")
+    print("=" * 40)
+
+    tests = [
+        test_normalization,
+        test_hit_reuses_early_request,
+        test_miss_cancels_and_reissues,
+        test_changed_partial_respeculates,
+        test_prefetched_stream_and_background_call,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
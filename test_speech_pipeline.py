@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test script for the sentence-pipelined think -> speak mode
+Uses fake LLM/TTS/playback stages, no API keys or audio device needed
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.speech_pipeline import SentenceSegmenter, SpeechPipeline
+
+
+def test_segmenter_splits_streamed_text():
+    """Sentences are emitted once complete, even when split across chunks"""
+    print("Testing sentence segmenter...")
+    segmenter = SentenceSegmenter(min_chars=5)
+    assert segmenter.feed("An API is a contr") == []
+    assert segmenter.feed("act between programs. It def") == ["An API is a contract between programs."]
+    assert segmenter.feed("ines requests!  Dr. Smith agrees. ") == ["It defines requests!", "Dr. Smith agrees."]
+    assert segmenter.feed("Version 3.5 is out") == []
+    assert segmenter.flush() == "Version 3.5 is out"
+    assert segmenter.flush() == ""
+    # "no" is an abbreviation only before a number
+    segmenter = SentenceSegmenter(min_chars=5)
+    assert segmenter.feed("No. I don't think so. ") == ["No. I don't think so."]
+    assert segmenter.feed("The answer is no. ") == []  # "No. 5" or a new sentence?
+    assert segmenter.feed("Try again later. ") == ["The answer is no.", "Try again later."]
+    assert segmenter.feed("Read page no. 5 first. ") == ["Read page no. 5 first."]
+    print("✓ Segmenter handles chunk boundaries, abbreviations and decimals")
+
+
+def test_segmenter_joins_short_sentences():
+    """Very short sentences are merged into the next one"""
+    print("\nTesting short sentence merging...")
+    segmenter = SentenceSegmenter(min_chars=20)
+    assert segmenter.feed("Sure. Here is the answer you wanted. ") == ["Sure. Here is the answer you wanted."]
+    print("✓ Short sentences are merged")
+
+
+def test_pipeline_overlaps_stages():
+    """Playback of sentence 1 starts before generation has finished"""
+    print("\nTesting pipeline overlap...")
+    events = []
+    generation_done = threading.Event()
+
+    def chunks():
+        for piece in ["First sentence is here. ", "Second sentence is here. ", "Third one."]:
+            yield piece
+            time.sleep(0.05)
+        generation_done.set()
+
+    def synthesize(sentence):
+        events.append(("synth", sentence))
+        return sentence.upper()
+
+    def play(audio):
+        events.append(("play", audio, generation_done.is_set()))
+
+    pipeline = SpeechPipeline(synthesize, play, segmenter=SentenceSegmenter(min_chars=5))
+    pipeline.start(chunks())
+    text = pipeline.play_all()
+
+    plays = [e for e in events if e[0] == "play"]
+    assert [p[1] for p in plays] == ["FIRST SENTENCE IS HERE.", "SECOND SENTENCE IS HERE.", "THIRD ONE."]
+    assert plays[0][2] is False, "first sentence waited for the full answer"
+    assert text == "First sentence is here. Second sentence is here. Third one."
+    print("✓ Sentences play in order while generation continues")
+
+
+def test_pipeline_propagates_errors():
+    """A failing stage surfaces its exception from play_all"""
+    print("\nTesting pipeline error handling...")
+
+    def synthesize(sentence):
+        raise RuntimeError("tts down")
+
+    pipeline = SpeechPipeline(synthesize, lambda audio: None)
+    pipeline.start(iter(["Something long enough to speak. ", "More text follows here."]))
+    try:
+        pipeline.play_all()
+    except RuntimeError as e:
+        assert str(e) == "tts down"
+    else:
+        raise AssertionError("error was swallowed")
+    print("✓ Errors are raised to the caller")
+
+
+def test_cancel_returns_immediately():
+    """After a barge-in play_all returns without waiting for the LLM stream"""
+    print("\nTesting cancel...")
+    release = threading.Event()
+
+    def chunks():
+        yield "First sentence is here. "
+        release.wait(5)  # a stalled stream
+        yield "Never spoken."
+
+    played = []
+    pipeline = SpeechPipeline(lambda sentence: sentence, played.append, segmenter=SentenceSegmenter(min_chars=5),
+                              max_pending=1)
+    pipeline.start(chunks())
+    threading.Timer(0.2, pipeline.cancel).start()
+    started = time.monotonic()
+    pipeline.play_all()
+    assert time.monotonic() - started < 1.0, "play_all waited for the stream"
+    assert played == ["First sentence is here."]
+    assert pipeline.played == ["First sentence is here."]
+    release.set()
+    # Sentences synthesized ahead of a barge-in are not part of what Emma said
+    pipeline = SpeechPipeline(lambda sentence: sentence, lambda audio: pipeline.cancel(),
+                              segmenter=SentenceSegmenter(min_chars=5))
+    pipeline.start(iter(["First sentence is here. Second sentence is here. Third one is here too. "]))
+    time.sleep(0.1)  # let synthesis run ahead
+    assert pipeline.play_all() == "First sentence is here."
+    assert len(pipeline.sentences) > 1
+    print("✓ play_all returns as soon as it is cancelled")
+
+
+def main():
+    """Run speech pipeline tests"""
+    print("Emma Robot - Speech Pipeline Test")
+    print("=" * 40)
+
+    tests = [
+        test_segmenter_splits_streamed_text,
+        test_segmenter_joins_short_sentences,
+        test_pipeline_overlaps_stages,
+        test_pipeline_propagates_errors,
+        test_cancel_returns_immediately,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
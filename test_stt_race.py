@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Test script for hybrid speech recognition
+Uses fake engines with injected delays and a fake speech_recognition module,
+so no microphone, model or network is needed
+"""
+
+import sys
+import os
+import threading
+import time
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.stt_race import EngineOffline, STTRace, google_engine, vosk_confidence, vosk_decoder
+
+
+def fake_engine(delay, text, confidence, error=None, log=None):
+    """Engine that waits `delay`, then returns (text, confidence) or raises `error`"""
+    def run(pcm):
+        if log is not None:
+            log.append(pcm)
+        time.sleep(delay)
+        if error is not None:
+            raise error
+        return text, confidence
+    return run
+
+
+class FakeSpeechRecognition:
+    """Stands in for the speech_recognition module"""
+
+    class RequestError(Exception):
+        pass
+
+    class AudioData:
+        def __init__(self, frame_data, sample_rate, sample_width):
+            self.frame_data = frame_data
+
+    class Recognizer:
+        def __init__(self, response=None, error=None):
+            self.response = response
+            self.error = error
+            self.calls = 0
+
+        def recognize_google(self, audio, language="en-US", show_all=False):
+            self.calls += 1
+            if self.error is not None:
+                raise self.error
+            return self.response
+
+
+def test_earliest_confident_result_wins():
+    """Without a preference the first confident transcript is used"""
+    print("Testing earliest confident result...")
+    race = STTRace([("vosk", fake_engine(0.01, "turn left", 0.9)),
+                    ("google", fake_engine(0.3, "turn left please", 0.95))])
+    started = time.monotonic()
+    result = race.recognize(b"\x00" * 320)
+    assert result.engine == "vosk" and result.text == "turn left", result
+    assert time.monotonic() - started < 0.2
+    # An unconfident early result does not win when a confident one follows
+    race = STTRace([("vosk", fake_engine(0.01, "burn laughed", 0.3)),
+                    ("google", fake_engine(0.05, "turn left", 0.9))], min_confidence=0.6)
+    assert race.recognize(b"").text == "turn left"
+    print("✓ First confident transcript wins")
+
+
+def test_preferred_engine_within_grace():
+    """A confident result waits for the preferred engine, but only for the grace window"""
+    print("\nTesting preferred engine and grace window...")
+    race = STTRace([("vosk", fake_engine(0.0, "what is the whether", 0.8)),
+                    ("google", fake_engine(0.05, "what is the weather", 0.9))],
+                   prefer="google", grace_s=0.3)
+    assert race.recognize(b"").engine == "google"
+
+    race = STTRace([("vosk", fake_engine(0.0, "what is the whether", 0.8)),
+                    ("google", fake_engine(1.0, "what is the weather", 0.9))],
+                   prefer="google", grace_s=0.1)
+    started = time.monotonic()
+    result = race.recognize(b"")
+    assert result.engine == "vosk" and time.monotonic() - started < 0.5
+    # A decoder replaces the engine (the recognizer fed while listening) and runs alongside the others
+    calls = []
+    google_started = threading.Event()
+
+    def google(pcm):
+        google_started.set()
+        time.sleep(0.02)
+        return "", 0.0
+
+    def finish_vosk():
+        assert google_started.wait(1), "google must not wait for vosk"
+        time.sleep(0.05)
+        return "hello emma", 0.9
+
+    race = STTRace([("vosk", fake_engine(0.0, "never", 1.0, log=calls)), ("google", google)],
+                   prefer="google", grace_s=0.3)
+    result = race.recognize(b"", decoders={"vosk": finish_vosk})
+    assert result.text == "hello emma" and calls == []
+    assert race.stats()["latency_ms"]["vosk"]["p50"] >= 40, "vosk's own decode time is recorded"
+    print("✓ Preferred engine wins inside the grace window, not after it")
+
+
+def test_offline_engine_is_skipped():
+    """A network error makes the race fall back to VOSK alone for a while"""
+    print("\nTesting offline fallback...")
+    sr = FakeSpeechRecognition
+    recognizer = sr.Recognizer(error=sr.RequestError("connection failed"))
+    now = [0.0]
+    race = STTRace([("vosk", fake_engine(0.0, "goodbye", 0.5)),
+                    ("google", google_engine(recognizer, 16000, sr_module=sr))],
+                   prefer="google", offline_retry_s=60, clock=lambda: now[0])
+    assert race.recognize(b"\x00\x00").text == "goodbye"
+    assert not race.available("google") and recognizer.calls == 1
+    assert race.recognize(b"\x00\x00").engine == "vosk"
+    assert recognizer.calls == 1, "google should be skipped while offline"
+    now[0] = 61.0
+    assert race.available("google")
+    stats = race.stats()
+    assert stats["errors"]["google"] == 1 and stats["skipped"]["google"] == 1
+    print("✓ Google is skipped after a network error and retried later")
+
+
+def test_engine_results():
+    """Google alternatives and VOSK word confidences become (text, confidence)"""
+    print("\nTesting engine results...")
+    sr = FakeSpeechRecognition
+    google = google_engine(sr.Recognizer({"alternative": [{"transcript": "hello there", "confidence": 0.93},
+                                                          {"transcript": "hello their"}], "final": True}),
+                           16000, sr_module=sr)
+    assert google(b"") == ("hello there", 0.93)
+    assert google_engine(sr.Recognizer([]), 16000, sr_module=sr)(b"") == ("", 0.0)
+    with_missing = google_engine(sr.Recognizer({"alternative": [{"transcript": "hi"}]}), 16000,
+                                 missing_confidence=0.7, sr_module=sr)
+    assert with_missing(b"") == ("hi", 0.7)
+    try:
+        google_engine(sr.Recognizer(error=sr.RequestError("down")), 16000, sr_module=sr)(b"")
+        raise AssertionError("expected EngineOffline")
+    except EngineOffline:
+        pass
+    assert abs(vosk_confidence({"text": "a b", "result": [{"word": "a", "conf": 1.0}, {"word": "b", "conf": 0.5}]}) - 0.75) < 1e-9
+    assert vosk_confidence({"text": ""}) == 0.0
+
+    class FakeKaldi:
+        def Result(self):
+            return '{"text": "stop", "result": [{"word": "stop", "conf": 0.8}]}'
+
+        def FinalResult(self):
+            return '{"text": ""}'
+
+    assert vosk_decoder(FakeKaldi(), accepted=True)() == ("stop", 0.8)
+    assert vosk_decoder(FakeKaldi())() == ("", 0.0)
+    print("✓ Engine results are parsed")
+
+
+def test_stats():
+    """Win rates and latencies are kept per engine"""
+    print("\nTesting stats...")
+    race = STTRace([("vosk", fake_engine(0.0, "yes", 0.9)), ("google", fake_engine(0.05, "yes", 0.9))],
+                   timeout_s=1.0)
+    for _ in range(4):
+        race.recognize(b"")
+    time.sleep(0.1)  # losing engines finish in the background
+    stats = race.stats()
+    assert stats["races"] == 4 and stats["wins"] == {"vosk": 4, "google": 0}
+    assert stats["win_rate"]["vosk"] == 1.0
+    assert stats["latency_ms"]["google"]["p50"] >= 40
+    empty = STTRace([("vosk", fake_engine(0.0, "", 0.0))])
+    assert empty.recognize(b"") is None
+    print(f"✓ Stats: {stats}")
+
+
+def main():
+    """Run hybrid speech recognition tests"""
+    print("Emma Robot - Hybrid Speech Recognition Test")
+    print("=" * 40)
+
+    tests = [
+        test_earliest_confident_result_wins,
+        test_preferred_engine_within_grace,
+        test_offline_engine_is_skipped,
+        test_engine_results,
+        test_stats,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the time-based trajectory planner
+Uses a fake clock, so it runs instantly and without hardware
+"""
+
+import sys
+import os
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Hardware.trajectory import PROFILES, default_duration, plan_trajectory, play_trajectory
+
+
+class FakeClock:
+    """Monotonic clock that only advances when sleep() is called (plus optional send cost)"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_profiles_are_normalized():
+    """Every profile starts at 0, ends at 1 and never goes backwards"""
+    print("Testing velocity profiles...")
+    for name, shape in PROFILES.items():
+        values = [shape(k / 100) for k in range(101)]
+        assert abs(values[0]) < 1e-9 and abs(values[-1] - 1) < 1e-9, name
+        assert all(b >= a - 1e-9 for a, b in zip(values, values[1:])), name
+    print("✓ Profiles are monotonic from 0 to 1")
+
+
+def test_axes_are_synchronized():
+    """All axes reach the target on the last frame, frame count = rate x duration"""
+    print("\nTesting synchronized planning...")
+    frames = plan_trajectory([180, 0, 90], [0, 10, 45], duration=1.0, rate_hz=50, profile="linear")
+    assert len(frames) == 50
+    assert frames[-1] == [0, 10, 45]
+    halfway = frames[24]
+    assert halfway == [90, 5, 68] or halfway == [90, 5, 67], halfway
+    assert plan_trajectory([1, 2, 3], [1, 2, 3], 1.0, 50) == []
+    assert len(plan_trajectory([0, 0, 0], [1, 0, 0], 2.0, 25)) == 50, "frames depend on degrees"
+    print("✓ Axes move together and finish on time")
+
+
+def test_minimum_jerk_eases_in_and_out():
+    """Minimum-jerk moves slowly at both ends and fast in the middle"""
+    print("\nTesting minimum-jerk profile...")
+    frames = plan_trajectory([0, 0, 0], [180, 0, 0], duration=1.0, rate_hz=20, profile="minimum_jerk")
+    steps = [b[0] - a[0] for a, b in zip([[0, 0, 0]] + frames, frames)]
+    assert steps[0] < steps[10] and steps[-1] < steps[10]
+    print("✓ Minimum-jerk eases in and out")
+
+
+def test_deadline_schedule_does_not_drift():
+    """Frames are sent on k / rate deadlines; late frames are skipped, not delayed"""
+    print("\nTesting deadline schedule...")
+    fake = FakeClock()
+    sent = []
+
+    def send(frame):
+        sent.append((round(fake.now, 6), frame))
+        fake.now += 0.001  # serial write cost must not accumulate
+
+    frames = plan_trajectory([0, 0, 0], [100, 0, 0], duration=0.5, rate_hz=10, profile="linear")
+    play_trajectory(frames, send, 10, clock=fake.clock, sleep=fake.sleep)
+    assert [t for t, _ in sent] == [0.1, 0.2, 0.3, 0.4, 0.5]
+
+    fake, sent = FakeClock(), []
+
+    def slow_send(frame):
+        sent.append(frame)
+        fake.now += 0.25  # each write takes 2.5 periods
+
+    play_trajectory(frames, slow_send, 10, clock=fake.clock, sleep=fake.sleep)
+    assert sent[-1] == [100, 0, 0] and len(sent) < len(frames)
+    print("✓ Schedule holds and late frames are skipped")
+
+
+def test_default_duration():
+    """Moves without a duration use the configured average speed"""
+    print("\nTesting default duration...")
+    assert default_duration([180, 0, 90], [0, 0, 90], 180) == 1.0
+    print("✓ Default duration follows max speed")
+
+
+def main():
+    """Run trajectory planner tests"""
+    print("Emma Robot - Trajectory Planner Test")
+    print("=" * 40)
+
+    tests = [
+        test_profiles_are_normalized,
+        test_axes_are_synchronized,
+        test_minimum_jerk_eases_in_and_out,
+        test_deadline_schedule_does_not_drift,
+        test_default_duration,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
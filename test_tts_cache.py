@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test script for the TTS audio cache
+Uses a temporary folder and a fake synthesizer, so no API key is needed
+"""
+
+import sys
+import os
+import tempfile
+import threading
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.audio_streaming import stream_openai_speech
+from Software.tts_cache import TTSCache, normalize_text
+
+
+class FakeSynthesizer:
+    """Counts synthesis calls and returns deterministic audio"""
+
+    def __init__(self, size=100):
+        self.calls = []
+        self.size = size
+
+    def __call__(self, text):
+        self.calls.append(text)
+        return text.encode().ljust(self.size, b"\0")
+
+
+def test_hits_skip_synthesis():
+    """A second request for the same phrase is served from disk"""
+    print("Testing cache hits...")
+    with tempfile.TemporaryDirectory() as folder:
+        cache = TTSCache(folder)
+        synth = FakeSynthesizer()
+        first = cache.get_or_create("openai", "tts-1", "nova", "Goodbye!", synth)
+        second = cache.get_or_create("openai", "tts-1", "nova", "  Goodbye! ", synth)
+        assert first == second
+        assert synth.calls == ["Goodbye!"]
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+        cache.get_or_create("openai", "tts-1", "alloy", "Goodbye!", synth)
+        assert len(synth.calls) == 2, "voice must be part of the key"
+    print("✓ Repeated phrases are not synthesized again")
+
+
+def test_key_normalization():
+    """Whitespace differences share a key; different formats do not"""
+    print("\nTesting key normalization...")
+    assert normalize_text(" Hello!\n How  are you? ") == "Hello! How are you?"
+    assert TTSCache.key("openai", "tts-1", "nova", "Hi  there") == TTSCache.key("openai", "tts-1", "nova", "Hi there")
+    assert TTSCache.key("openai", "tts-1", "nova", "Hi", "pcm") != TTSCache.key("openai", "tts-1", "nova", "Hi", "mp3")
+    print("✓ Keys are content-addressed")
+
+
+def test_lru_eviction_and_persistence():
+    """The size cap evicts least recently used entries, across restarts too"""
+    print("\nTesting LRU eviction...")
+    with tempfile.TemporaryDirectory() as folder:
+        cache = TTSCache(folder, max_bytes=250)
+        synth = FakeSynthesizer(size=100)
+        for phrase in ("one", "two"):
+            cache.get_or_create("openai", "m", "v", phrase, synth)
+        cache.get_or_create("openai", "m", "v", "one", synth)  # "two" is now least recent
+        cache.get_or_create("openai", "m", "v", "three", synth)
+        assert cache.stats()["entries"] == 2 and cache.stats()["bytes"] == 200
+        assert len(os.listdir(folder)) == 2
+
+        reopened = TTSCache(folder, max_bytes=250)
+        calls = len(synth.calls)
+        reopened.get_or_create("openai", "m", "v", "one", synth)
+        reopened.get_or_create("openai", "m", "v", "three", synth)
+        assert len(synth.calls) == calls, "entries should survive a restart"
+        reopened.get_or_create("openai", "m", "v", "two", synth)
+        assert synth.calls[-1] == "two", "evicted entry should be synthesized again"
+    print("✓ Size cap evicts the least recently used audio")
+
+
+def test_prewarm_in_background():
+    """Pre-warming fills the cache without blocking and skips cached phrases"""
+    print("\nTesting pre-warm...")
+    with tempfile.TemporaryDirectory() as folder:
+        cache = TTSCache(folder)
+        synth = FakeSynthesizer()
+        gate = threading.Event()
+
+        def slow_synth(text):
+            gate.wait()
+            return synth(text)
+
+        thread = cache.prewarm(["Hello! How can I assist you today?", "Goodbye!"], "openai", "m", "v", slow_synth)
+        assert thread.is_alive(), "pre-warm should not block startup"
+        gate.set()
+        thread.join(timeout=5)
+        cache.prewarm(["Goodbye!"], "openai", "m", "v", synth, background=False)
+        assert len(synth.calls) == 2
+        cache.get_or_create("openai", "m", "v", "Goodbye!", synth)
+        assert len(synth.calls) == 2 and cache.stats()["hits"] == 1
+    print("✓ Canned phrases are ready before they are needed")
+
+
+def test_streaming_hit_makes_no_request():
+    """Streaming TTS plays cached PCM without calling the API"""
+    print("\nTesting streaming cache...")
+
+    class FakeResponse:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def iter_bytes(self, chunk_size):
+            yield b"\1" * 10
+            yield b"\2" * 10
+
+    class FakeClient:
+        def __init__(self):
+            self.requests = 0
+            self.audio = self
+            self.speech = self
+            self.with_streaming_response = self
+
+        def create(self, **kwargs):
+            self.requests += 1
+            return FakeResponse()
+
+    class FakePlayer:
+        def __init__(self):
+            self.played = []
+
+        def play(self, chunks, cancel_event=None):
+            self.played.append(b"".join(chunks))
+            return {}
+
+    with tempfile.TemporaryDirectory() as folder:
+        cache, client, player = TTSCache(folder), FakeClient(), FakePlayer()
+        stream_openai_speech(client, "Hi", "tts-1", "nova", player, cache=cache)
+        stream_openai_speech(client, "Hi", "tts-1", "nova", player, cache=cache)
+        assert client.requests == 1
+        assert player.played == [b"\1" * 10 + b"\2" * 10] * 2
+    print("✓ Cached phrases play with no network round trip")
+
+
+def main():
+    """Run TTS cache tests"""
+    print("Emma Robot - TTS Cache Test")
+    print("=" * 40)
+
+    tests = [
+        test_hits_skip_synthesis,
+        test_key_normalization,
+        test_lru_eviction_and_persistence,
+        test_prewarm_in_background,
+        test_streaming_hit_makes_no_request,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Test script for two-tier speech recognition
+Uses a fake vosk module, so no models need to be downloaded
+"""
+
+import sys
+import os
+import json
+import time
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from Software.two_tier_recognizer import TwoTierRecognizer
+
+
+class FakeVosk:
+    """Stands in for the vosk module and records what was loaded"""
+
+    def __init__(self, load_delay=0.0):
+        self.load_delay = load_delay
+        self.loaded = []
+        self.recognizers = []
+        vosk = self
+
+        class Model:
+            def __init__(self, path):
+                time.sleep(vosk.load_delay if "small" not in path else 0)
+                if "missing" in path:
+                    raise IOError(f"no model at {path}")
+                self.path = path
+                vosk.loaded.append(path)
+
+        class KaldiRecognizer:
+            def __init__(self, model, rate, grammar=None):
+                self.model = model
+                self.rate = rate
+                self.grammar = json.loads(grammar) if grammar else None
+                self.resets = 0
+                vosk.recognizers.append(self)
+
+            def Reset(self):
+                self.resets += 1
+
+        self.Model = Model
+        self.KaldiRecognizer = KaldiRecognizer
+
+
+KEYWORDS = ["hello emma", "hello", "emma"]
+EXIT_PHRASES = ["goodbye", "stop", "bye"]
+
+
+def test_only_small_model_at_startup():
+    """The large model is not touched until Emma is woken up"""
+    print("Testing startup...")
+    vosk = FakeVosk()
+    configured = []
+    speech = TwoTierRecognizer("small-model", "large-model", 16000, KEYWORDS, EXIT_PHRASES,
+                               configure=configured.append, vosk_module=vosk)
+    assert vosk.loaded == ["small-model"] and not speech.large_loaded
+    grammar = speech.spotter.grammar
+    assert "hello emma" in grammar and "goodbye" in grammar and grammar[-1] == "[unk]"
+    assert len(grammar) == len(set(grammar))
+    assert configured == [speech.spotter]
+    print(f"✓ Spotter grammar: {grammar}")
+
+
+def test_keyword_spotting():
+    """Wake words are found in spotter output, exit phrases only as the whole result"""
+    print("\nTesting keyword spotting...")
+    speech = TwoTierRecognizer("small-model", "large-model", 16000, KEYWORDS, EXIT_PHRASES, vosk_module=FakeVosk())
+    assert speech.spot("[unk] hello emma") == "hello emma"
+    assert speech.spot("Emma!") == "emma"
+    assert speech.spot("Goodbye!") == "goodbye"
+    assert speech.spot("stop") == "stop"
+    assert speech.spot("[unk] stop [unk]") is None  # "don't stop" in room chatter
+    assert speech.spot("[unk] stop") is None
+    assert speech.spot("bye [unk] [unk]") is None  # "by the way"
+    assert speech.spot("hello emma stop") == "hello emma"
+    assert speech.spot("[unk] [unk]") is None
+    assert speech.spot("") is None
+    assert speech.spot("stopwatch") is None  # whole words only
+    print("✓ Wake words and exit phrases are spotted")
+
+
+def test_lazy_background_load():
+    """preload() loads the large model in the background; dictation() waits for it once"""
+    print("\nTesting lazy loading...")
+    vosk = FakeVosk(load_delay=0.1)
+    speech = TwoTierRecognizer("small-model", "large-model", 16000, KEYWORDS, vosk_module=vosk)
+    started = time.perf_counter()
+    speech.preload()
+    speech.preload()  # already loading
+    assert time.perf_counter() - started < 0.05  # the caller is not blocked
+    recognizer = speech.dictation()
+    assert recognizer.model.path == "large-model" and recognizer.grammar is None
+    assert speech.dictation() is recognizer  # reused across turns
+    assert vosk.loaded == ["small-model", "large-model"]
+    assert speech.stats()["large_loads"] == 1 and speech.stats()["large_load_s"] >= 0.1
+    print(f"✓ Large model loaded once in {speech.stats()['large_load_s']:.2f}s")
+
+
+def test_unload_after_idle():
+    """Going back to sleep frees the large model unless it is needed again soon"""
+    print("\nTesting idle unload...")
+    vosk = FakeVosk()
+    speech = TwoTierRecognizer("small-model", "large-model", 16000, KEYWORDS,
+                               unload_after_s=0.05, vosk_module=vosk)
+    speech.dictation()
+    speech.release()
+    speech.preload()  # woken up again before the timer: keep it
+    time.sleep(0.1)
+    assert speech.large_loaded
+
+    speech.release()
+    time.sleep(0.15)
+    assert not speech.large_loaded and speech.stats()["large_unloads"] == 1
+    assert speech.spotter.resets == 2
+    speech.dictation()
+    assert vosk.loaded.count("large-model") == 2
+    speech.close()
+    assert not speech.large_loaded
+    print("✓ Large model is unloaded after the idle timeout")
+
+
+def test_load_failure_surfaces():
+    """A missing large model is reported to the caller of dictation()"""
+    print("\nTesting load failure...")
+    speech = TwoTierRecognizer("small-model", "missing-model", 16000, KEYWORDS, vosk_module=FakeVosk())
+    speech.preload()
+    try:
+        speech.dictation()
+    except IOError:
+        pass
+    else:
+        raise AssertionError("dictation() should raise")
+    assert not speech.large_loaded
+    print("✓ Load errors are raised by dictation()")
+
+
+def main():
+    """Run two-tier recognition tests"""
+    print("Emma Robot - Two-Tier Recognition Test")
+    print("=" * 40)
+
+    tests = [
+        test_only_small_model_at_startup,
+        test_keyword_spotting,
+        test_lazy_background_load,
+        test_unload_after_idle,
+        test_load_failure_surfaces,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
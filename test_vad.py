@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test script for the voice-activity gate in front of Vosk
+Measures the detector against the WAV fixtures in test_fixtures/vad
+"""
+
+import sys
+import os
+import json
+
+import numpy as np
+
+# Add parent directory to path to import project modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bench_vad import FIXTURE_DIR, read_wav, run_vad
+from Software.vad import VoiceActivityDetector, frame_features
+
+
+def load_fixture(name):
+    pcm, rate = read_wav(os.path.join(FIXTURE_DIR, name + ".wav"))
+    labels_path = os.path.join(FIXTURE_DIR, name + ".json")
+    spans = json.load(open(labels_path))["speech"] if os.path.exists(labels_path) else []
+    return pcm, rate, spans
+
+
+def test_features():
+    """Energy and zero-crossing rate of simple signals"""
+    print("Testing frame features...")
+    square = np.tile(np.array([1000, 1000, -1000, -1000], dtype=np.int16), 80)
+    rms, zcr = frame_features(square, 160)
+    assert np.allclose(rms, 1000) and np.allclose(zcr, 79 / 159)
+    rms, zcr = frame_features(np.zeros(320, dtype=np.int16), 160)
+    assert np.all(rms == 0) and np.all(zcr == 0)
+    print("✓ Features are computed per frame")
+
+
+def test_labelled_speech_is_detected():
+    """Frame decisions match the labelled speech spans of the fixture"""
+    print("\nTesting against labelled fixture...")
+    pcm, rate, spans = load_fixture("speech_in_noise")
+    vad = VoiceActivityDetector(rate)
+    speech = vad.classify(pcm[:len(pcm) - len(pcm) % vad.frame_bytes])
+    centers = (np.arange(speech.size) + 0.5) * vad.frame_size / rate
+    labels = np.zeros(speech.size, dtype=bool)
+    for start, end in spans:
+        labels |= (centers >= start) & (centers < end)
+    accuracy = np.mean(speech == labels)
+    assert accuracy >= 0.95, accuracy
+    print(f"✓ {accuracy:.0%} of frames classified correctly")
+
+
+def test_room_noise_is_not_forwarded():
+    """Idle room noise never reaches the recognizer"""
+    print("\nTesting idle noise...")
+    pcm, rate, _ = load_fixture("room_noise")
+    vad, forwarded = run_vad(pcm, rate)
+    assert forwarded == [] and vad.stats()["segments"] == 0
+    print("✓ Silence is gated out")
+
+
+def test_segments_keep_edges():
+    """Each utterance is forwarded once, with pre-roll and hangover around it"""
+    print("\nTesting segments...")
+    pcm, rate, spans = load_fixture("speech_in_noise")
+    vad, forwarded = run_vad(pcm, rate, hangover_ms=300, pre_roll_ms=200)
+    stats = vad.stats()
+    assert stats["segments"] == len(spans)
+    speech_seconds = sum(end - start for start, end in spans)
+    forwarded_seconds = sum(len(chunk) for chunk in forwarded) / 2 / rate
+    assert speech_seconds < forwarded_seconds <= speech_seconds + len(spans) * 0.5 + 0.05
+    assert stats["forwarded_ratio"] < 0.6
+    print(f"✓ {stats['forwarded_ratio']:.0%} of the audio is decoded "
+          f"(speech {stats['speech_ratio']:.0%})")
+
+
+def test_segment_end_is_reported():
+    """process() flags the chunk in which the hangover runs out"""
+    print("\nTesting segment end...")
+    rate = 16000
+    vad = VoiceActivityDetector(rate, hangover_ms=100, pre_roll_ms=0)
+    t = np.arange(rate // 2) / rate
+    loud = (8000 * np.sin(2 * np.pi * 200 * t)).astype("<i2").tobytes()
+    quiet = bytes(len(loud))
+    assert vad.process(quiet) == (b"", False)
+    audio, ended = vad.process(loud)
+    assert audio == loud and not ended
+    audio, ended = vad.process(quiet)
+    assert ended and len(audio) == 5 * vad.frame_bytes
+    print("✓ End of speech is signalled after the hangover")
+
+
+def main():
+    """Run VAD tests"""
+    print("Emma Robot - Voice Activity Detection Test")
+    print("=" * 40)
+
+    tests = [
+        test_features,
+        test_labelled_speech_is_detected,
+        test_room_noise_is_not_forwarded,
+        test_segments_keep_edges,
+        test_segment_end_is_reported,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return passed == len(tests)
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)